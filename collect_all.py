@@ -6,14 +6,26 @@
 使用方法：
   python collect_all.py              # 采集所有平台
   python collect_all.py --platform douyin  # 采集指定平台
+  python collect_all.py --concurrency 2    # 限制同时采集的账号数量
+  python collect_all.py --max-pages 5      # 每个账号最多翻 5 页作品列表
+  python collect_all.py --full             # 强制全量刷新（忽略增量水位线）
+  python collect_all.py --cdp-endpoint http://localhost:9222  # 附加到已登录的 Chrome
+  python collect_all.py --record fixtures  # 采集并录制接口响应
+  python collect_all.py --replay fixtures  # 离线回放录制的响应
+  python collect_all.py --deadline 270     # 整次运行（含生成前端数据和推送）在 270 秒内结束
+  python collect_all.py --resume           # 从今天中断的运行继续，跳过已完成的账号
+  python collect_all.py --backfill 90      # 从趋势接口补齐最近 90 天缺失的每日账号数据
 """
 import json
 import os
+import time
+import asyncio
 import subprocess
 import argparse
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
 
 # ============================================================
 # 配置
@@ -21,28 +33,58 @@ from playwright.sync_api import sync_playwright
 ROOT_DIR = Path(__file__).parent
 CONFIG_FILE = ROOT_DIR / "config.json"
 DATA_FILE = ROOT_DIR / "data" / "all_data.json"
-LOG_FILE = ROOT_DIR / "logs" / "collect.log"
+LOG_FILE = ROOT_DIR / "logs" / "collect.jsonl"
+NETWORK_PROFILE_DIR = ROOT_DIR / "logs" / "network"
+LOGIN_LOCK_DIR = ROOT_DIR / "logs"
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+DEFAULT_CONCURRENCY = 3
+DEFAULT_RECENT_DAYS = 30        # 增量采集时仍刷新统计数据的近期作品窗口
+DEFAULT_FULL_REFRESH_DAYS = 7   # 全量刷新周期
 
 # 导入数据库模块
 import sys
 sys.path.insert(0, str(ROOT_DIR / "data"))
 from database import (
-    init_db, save_daily_account, save_works,
-    export_for_frontend, get_latest_account
+    init_db, use_db_path, save_daily_account, save_works,
+    export_for_frontend, get_latest_account,
+    get_account_work_totals, get_watermark, save_watermark,
+    save_checkpoint, get_checkpoints, find_resumable_run, copy_checkpoints,
+    get_stale_work_ids, save_work_details, get_account_snapshots, save_daily_accounts_bulk
 )
+from records import WorkBatch, AccountTotals
+sys.path.insert(0, str(ROOT_DIR / "collector"))
+from context_pool import ContextPool, DEFAULT_PAGES_PER_CONTEXT
+from capture import ResponseCapture, DEFAULT_WAIT_TIMEOUT
+from resource_policy import ResourcePolicy
+from http_client import ApiBlockedError, SESSION_POOL, FETCHERS, ENDPOINTS, REQUEST_TIMEOUT
+from pagination import iter_pages, iter_pages_async, DEFAULT_MAX_PAGES
+from browser_server import connect_browser_server
+from profiles import ProfileStore
+from replay import Recorder, Fixture
+from network_profile import NetworkProfiler, DEFAULT_TOP_N, write_profile, summarize, format_summary
+from timing import timer
+from cdp import CdpTabs, connect_cdp, cookie_header
+from runlog import get_logger, bind
+from session_check import LoginGuard, SessionExpiredError, probe_session, DEAD, ALIVE
+from deadline import (
+    Deadline, DeadlineExceeded, NO_DEADLINE, FINALIZE_RESERVE, OPTIONAL_RESERVE, CANCEL_GRACE, job_budget
+)
+from work_details import (
+    fetch_details, refresh_cutoff, DEFAULT_WORKERS, DEFAULT_REFRESH_HOURS, DEFAULT_MAX_WORKS
+)
+from trends import fetch_trend, backfill_rows, BACKFILL_DAYS
+import login_flow
+from login_flow import LOGIN_TIMEOUT
+
+LOGGER = get_logger("collect", LOG_FILE)
 
 
 # ============================================================
 # 工具函数
 # ============================================================
 def log(msg):
-    """记录日志"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    line = f"[{timestamp}] {msg}"
-    print(line)
-    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(line + "\n")
+    """记录日志（后台线程写入 logs/collect.jsonl，同时输出到终端）"""
+    LOGGER.info(msg)
 
 
 def safe_int(val):
@@ -67,9 +109,12 @@ def load_config():
 def save_frontend_json():
     """生成前端需要的 JSON 文件"""
     DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    data = export_for_frontend()
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with timer.stage("save_frontend_json") as stage:
+        data = export_for_frontend()
+        with open(DATA_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        stage.bytes = DATA_FILE.stat().st_size
+        stage.items = len(data.get("daily_snapshots", []))
     log(f"前端数据已更新: {DATA_FILE}")
 
 
@@ -108,387 +153,607 @@ def create_empty_account(platform):
     }
 
 
-def create_work(platform, work_id="", title="", publish_time="", cover_url="", url="",
-                views=0, likes=0, comments=0, shares=0, collects=0):
-    """创建作品数据结构"""
-    return {
-        "work_id": work_id,
-        "platform": platform,
-        "title": title[:80] if title else "",
-        "publish_time": publish_time,
-        "cover_url": cover_url,
-        "url": url,
-        "views": safe_int(views),
-        "likes": safe_int(likes),
-        "comments": safe_int(comments),
-        "shares": safe_int(shares),
-        "collects": safe_int(collects)
+def add_work(works, work_id="", title="", publish_time="", cover_url="", url="",
+             views=0, likes=0, comments=0, shares=0, collects=0):
+    """规整字段后追加到作品批次（records.WorkBatch）"""
+    works.add(work_id, title[:80] if title else "", publish_time, cover_url, url,
+              safe_int(views), safe_int(likes), safe_int(comments), safe_int(shares),
+              safe_int(collects))
+
+
+def calculate_account_totals(account, batches):
+    """从各页作品计算账号的汇总数据"""
+    totals = AccountTotals()
+    for batch in batches:
+        totals.add(batch)
+    return totals.apply(account)
+
+
+# ============================================================
+# 作品流式写入
+# ============================================================
+WRITE_CHUNK_SIZE = 200  # 每次写入数据库的作品数
+
+# 抖音作品管理页为无限滚动，滚动后等待下一页的上限
+SCROLL_WAIT_TIMEOUT = 5000
+
+SCROLL_TO_BOTTOM_JS = """() => {
+    window.scrollTo(0, document.body.scrollHeight);
+    for (const el of document.querySelectorAll('div')) {
+        if (el.scrollHeight > el.clientHeight + 50) el.scrollTop = el.scrollHeight;
     }
+}"""
+
+
+class WorkStream:
+    """逐页接收作品：立即写入数据库并累计账号汇总，不在内存中保留全部作品
+
+    增量模式下（job["stop_before"] 非空），翻到发布时间早于该时间的作品即停止，
+    账号汇总改为从作品表统计。账号时间预算不足时同样停止翻页（truncated），
+    已写入的作品保留，账号汇总从作品表统计，不记为全量刷新。
+    达到最大页数但接口仍有下一页时（capped）同样处理。
+
+    每页写入后把翻页游标和进度记入断点（run_checkpoints）；resume=True 且任务带有断点时，
+    沿用上次的页数、作品数和最新作品，从 self.cursor 继续翻页，账号汇总从作品表统计。
+    """
+
+    def __init__(self, job, account, resume=False):
+        self.job = job
+        self.platform = job["platform"]
+        self.parse_works = WORK_PARSERS[self.platform]
+        self.label = job["label"]
+        self.max_pages = job.get("max_pages", DEFAULT_MAX_PAGES)
+        self.stop_before = job.get("stop_before")
+        self.deadline = job.get("deadline", NO_DEADLINE)
+        self.account = account
+        self.pages = 0
+        self.count = 0
+        self.settled = False
+        self.truncated = False
+        self.capped = False
+        self.has_more = True    # 最近一页之后接口是否还有下一页（未知时按还有处理）
+        self.totals = AccountTotals()
+        self.newest = ("", "")  # (publish_time, work_id)
+        self.cursor = None      # 下一页的游标
+        self.work_ids = []      # 本次采集到的作品，供作品详情阶段挑选
+        self.resumed = False
+        self.parse_time = 0.0
+        self.save_time = 0.0
+        if resume and job.get("resume"):
+            self._resume(job["resume"])
+
+    def _resume(self, checkpoint):
+        self.resumed = True
+        self.cursor = checkpoint["cursor"]
+        self.pages = checkpoint["pages"]
+        self.count = checkpoint["works"]
+        self.newest = (checkpoint["newest_publish_time"], checkpoint["newest_work_id"])
+        # 断点记录的游标说明还有下一页，页数已用完时与翻到最大页数一样按部分刷新处理
+        self.capped = self.pages >= self.max_pages
+
+    @property
+    def remaining_pages(self):
+        if self.settled or self.truncated:
+            return 0
+        remaining = max(0, self.max_pages - self.pages)
+        if remaining and self.pages and self.deadline.expired(OPTIONAL_RESERVE):
+            # 第一页之后的翻页是可选步骤，时间不够时放弃
+            self.truncated = True
+            log(f"[{self.label}] 时间预算不足（{self.deadline}），停止翻页，保存已采集的 {self.count} 个作品")
+            return 0
+        return remaining
+
+    def push(self, items, cursor=None, has_more=None):
+        """解析并写入一页接口原始数据，按块写入数据库；cursor 为下一页的游标，has_more 为接口是否还有下一页"""
+        self.pages += 1
+        page_count = 0
+        started = time.perf_counter()
+        works = self.parse_works(items)
+        self.parse_time += time.perf_counter() - started
+        for start in range(0, len(works), WRITE_CHUNK_SIZE):
+            chunk = works[start:start + WRITE_CHUNK_SIZE]
+            started = time.perf_counter()
+            save_works(self.platform, chunk, account_id=self.account.get("account_id", ""))
+            self.save_time += time.perf_counter() - started
+            self.totals.add(chunk)
+            self.work_ids.extend(chunk.work_id)
+            page_count += len(chunk)
+            self._track_publish_times(chunk)
+        self.count += page_count
+        if cursor is not None:
+            self.cursor = cursor
+        if has_more is not None:
+            self.has_more = has_more
+        self._checkpoint()
+        log(f"[{self.label}] 第 {self.pages} 页: {page_count} 个作品，累计 {self.count}")
+        if self.settled:
+            log(f"[{self.label}] 已翻到 {self.stop_before} 之前的作品，停止翻页")
+        elif not self.remaining_pages and not self.truncated and self.has_more:
+            self.capped = True
+            log(f"[{self.label}] 已达到最大页数 {self.max_pages}，停止翻页，账号汇总从作品表统计")
+
+    def _track_publish_times(self, works):
+        times = [(t, work_id) for t, work_id in zip(works.publish_time, works.work_id) if t]
+        if not times:
+            return
+        self.newest = max(self.newest, max(times))
+        if self.stop_before and min(times)[0] < self.stop_before:
+            self.settled = True
+
+    def _checkpoint(self):
+        run_id = self.job.get("run_id")
+        if run_id:
+            save_checkpoint(run_id, self.platform, self.job["account_key"], cursor=self.cursor,
+                            pages=self.pages, works=self.count,
+                            newest=self.newest if self.newest[0] else None)
+
+    def finish(self):
+        """写入账号汇总、推进水位线并返回采集结果"""
+        account_id = self.account.get("account_id", "")
+        partial = self.stop_before or self.truncated or self.capped
+        if (partial or self.resumed) and account_id:
+            totals = get_account_work_totals(self.platform, account_id)
+            self.account.update(totals)
+        else:
+            self.totals.apply(self.account)
+
+        if self.newest[0]:
+            save_watermark(self.platform, self.job["account_key"], account_id,
+                           self.newest[0], self.newest[1],
+                           full_refresh=not partial)
+        timer.record("parse", self.parse_time, self.platform, self.job["account_key"], items=self.count)
+        timer.record("save_works", self.save_time, self.platform, self.job["account_key"], items=self.count)
+        return {"account": self.account, "works_count": self.count, "pages": self.pages,
+                "truncated": self.truncated, "work_ids": self.work_ids}
+
+
+async def goto(page, job, url, timeout=30000):
+    """打开采集页面并记录耗时
+
+    超时不超过账号剩余的时间预算，预算已用完时抛出 DeadlineExceeded；
+    被跳转到登录页时抛出 SessionExpiredError。
+    """
+    guard = job.get("login_guard")
+    timeout = job.get("deadline", NO_DEADLINE).timeout_ms(timeout)
+    with timer.stage("goto", job["platform"], job["account_key"], detail=url):
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+        except Exception:
+            if guard:
+                guard.check()  # 导航被登录页跳转打断
+            raise
+    if guard:
+        guard.check()
 
 
-def calculate_account_totals(account, works):
-    """从作品列表计算账号的汇总数据"""
-    account["total_views"] = sum(w["views"] for w in works)
-    account["total_likes"] = sum(w["likes"] for w in works)
-    account["total_comments"] = sum(w["comments"] for w in works)
-    account["total_shares"] = sum(w["shares"] for w in works)
-    account["total_collects"] = sum(w["collects"] for w in works)
-    account["total_works"] = len(works)
-    return account
+PAGE_LOAD_TIMEOUT = 30000  # 毫秒
+
+
+@asynccontextmanager
+async def extra_tabs(page, job, count):
+    """在采集页面所在的上下文中再打开 count 个标签页（挂上与主页面相同的拦截和监听），退出时关闭"""
+    tabs = []
+    try:
+        for _ in range(count):
+            open_page = job.get("open_page") or page.context.new_page
+            tab = await open_page()
+            tabs.append(tab)
+            await instrument_page(tab, job, record_har=False)
+        yield tabs
+    finally:
+        for tab in tabs:
+            if not tab.is_closed():
+                await tab.close()
+
+
+async def load_page(page, job, url):
+    """加载一个并行页面：登录失效和时间预算用完照常抛出，其余错误只记录（由接口数据是否到达决定结果）"""
+    try:
+        await goto(page, job, url, timeout=PAGE_LOAD_TIMEOUT)
+    except (SessionExpiredError, DeadlineExceeded):
+        raise
+    except Exception as e:
+        log(f"[{job['label']}] 页面加载失败 {url}: {e}")
+
+
+async def load_tabs(capture, names, loads):
+    """并行加载多个页面并等待 names 的接口数据，返回是否全部到达
+
+    数据到齐即结束，不再等仍在加载的页面（同一数据的备用页面由此变为竞速）；
+    页面都加载完数据仍未到齐时，最多再等 DEFAULT_WAIT_TIMEOUT。
+    """
+    tasks = [asyncio.ensure_future(load) for load in loads]
+    waiting = asyncio.ensure_future(capture.wait(names, timeout_ms=PAGE_LOAD_TIMEOUT + DEFAULT_WAIT_TIMEOUT))
+    loaded = asyncio.ensure_future(asyncio.wait(tasks))
+    try:
+        await asyncio.wait([waiting, loaded], return_when=asyncio.FIRST_COMPLETED)
+        for task in tasks:
+            if task.done() and not task.cancelled() and task.exception():
+                raise task.exception()
+        if waiting.done():
+            return waiting.result()
+        waiting.cancel()
+        return await capture.wait(names, timeout_ms=DEFAULT_WAIT_TIMEOUT)
+    finally:
+        for future in tasks + [waiting, loaded]:
+            future.cancel()
+        await asyncio.gather(*tasks, waiting, loaded, return_exceptions=True)
+
+
+async def stream_pages_in_browser(page, stream, first_items=None):
+    """在页面的浏览器上下文中翻页（共用 Cookie）；接口被拦截时退回页面已加载的第一页"""
+    try:
+        request_context = page_request_context(page, stream.job)
+        async for items, cursor, has_more in iter_pages_async(request_context, stream.platform,
+                                                              stream.remaining_pages, cursor=stream.cursor,
+                                                              deadline=stream.deadline):
+            stream.push(items, cursor, has_more)
+            if not stream.remaining_pages:
+                break
+    except ApiBlockedError as e:
+        log(f"[{stream.label}] 翻页中止: {e}")
+        if stream.pages == 0 and first_items:
+            stream.push(first_items)
 
 
 # ============================================================
 # 采集器：小红书
 # ============================================================
-def collect_xiaohongshu(page, cookie_str):
-    """采集小红书数据"""
-    log("[小红书] 开始采集...")
+def format_timestamp(ts, millis=False):
+    """时间戳转为 YYYY-MM-DD HH:MM，无效时返回空字符串"""
+    if not ts:
+        return ""
+    try:
+        return datetime.fromtimestamp(ts / 1000 if millis else ts).strftime("%Y-%m-%d %H:%M")
+    except (ValueError, OSError, TypeError):
+        return ""
 
-    cookies = parse_cookies(cookie_str)
-    for c in cookies:
-        c["domain"] = ".xiaohongshu.com"
-    page.context.add_cookies(cookies)
 
+def parse_xiaohongshu_account(api_data):
+    """解析小红书账号信息"""
     account = create_empty_account("xiaohongshu")
-    works = []
-    api_data = {"user": None, "notes": None, "overview": None}
 
-    def handle_response(response):
-        try:
-            url = response.url
-            if "/api/galaxy/user/info" in url:
-                data = response.json()
-                if data.get("code") == 0:
-                    api_data["user"] = data.get("data", {})
-            elif "/fans/overall" in url:
-                data = response.json()
-                if data.get("code") == 0 and data.get("data"):
-                    api_data["overview"] = data.get("data", {})
-            elif "/api/galaxy/creator/datacenter/note/analyze/list" in url:
-                data = response.json()
-                if data.get("code") == 0:
-                    api_data["notes"] = data.get("data", {}).get("note_infos", [])
-        except (json.JSONDecodeError, KeyError, TypeError):
-            pass  # 非目标响应，忽略
-
-    page.on("response", handle_response)
+    # 解析用户信息
+    if api_data.get("user"):
+        user = api_data["user"]
+        account["account_name"] = user.get("userName", "") or user.get("name", "")
+        account["account_id"] = user.get("redId", "") or user.get("userId", "")
+        account["avatar_url"] = user.get("userAvatar", "") or user.get("avatar", "")
+
+    # 从粉丝总览获取粉丝数
+    if api_data.get("overview"):
+        seven_data = api_data["overview"].get("seven", {})
+        account["followers"] = safe_int(seven_data.get("fans_count", 0))
+
+    return account
 
-    try:
-        page.goto("https://creator.xiaohongshu.com/statistics/fans-data",
-                  wait_until="networkidle", timeout=30000)
-        page.wait_for_timeout(2000)
-
-        page.goto("https://creator.xiaohongshu.com/statistics/data-analysis",
-                  wait_until="networkidle", timeout=30000)
-        page.wait_for_timeout(3000)
-
-        # 解析用户信息
-        if api_data["user"]:
-            user = api_data["user"]
-            account["account_name"] = user.get("userName", "") or user.get("name", "")
-            account["account_id"] = user.get("redId", "") or user.get("userId", "")
-            account["avatar_url"] = user.get("userAvatar", "") or user.get("avatar", "")
-
-        # 从粉丝总览获取粉丝数
-        if api_data["overview"]:
-            seven_data = api_data["overview"].get("seven", {})
-            account["followers"] = safe_int(seven_data.get("fans_count", 0))
-
-        # 解析笔记数据
-        if api_data["notes"]:
-            for note in api_data["notes"]:
-                publish_time = ""
-                if note.get("post_time"):
-                    try:
-                        publish_time = datetime.fromtimestamp(
-                            note["post_time"] / 1000
-                        ).strftime("%Y-%m-%d %H:%M")
-                    except (ValueError, OSError, TypeError):
-                        pass
-
-                work = create_work(
-                    platform="xiaohongshu",
-                    work_id=note.get("id", ""),
-                    title=note.get("title", ""),
-                    publish_time=publish_time,
-                    cover_url=note.get("cover_url", ""),
-                    url=f"https://www.xiaohongshu.com/explore/{note.get('id', '')}",
-                    views=note.get("read_count", 0),
-                    likes=note.get("like_count", 0),
-                    comments=note.get("comment_count", 0),
-                    shares=note.get("share_count", 0),
-                    collects=note.get("fav_count", 0)
-                )
-                works.append(work)
-
-        # 计算汇总
-        calculate_account_totals(account, works)
-
-        log(f"[小红书] 采集完成: {account['account_name']}, {len(works)} 个作品")
-        return {"account": account, "works": works}
 
+def parse_xiaohongshu_works(notes):
+    """解析一页小红书笔记"""
+    works = WorkBatch("xiaohongshu")
+    for note in notes:
+        add_work(
+            works,
+            work_id=note.get("id", ""),
+            title=note.get("title", ""),
+            publish_time=format_timestamp(note.get("post_time"), millis=True),
+            cover_url=note.get("cover_url", ""),
+            url=f"https://www.xiaohongshu.com/explore/{note.get('id', '')}",
+            views=note.get("read_count", 0),
+            likes=note.get("like_count", 0),
+            comments=note.get("comment_count", 0),
+            shares=note.get("share_count", 0),
+            collects=note.get("fav_count", 0)
+        )
+    return works
+
+
+async def collect_xiaohongshu(page, job):
+    """采集小红书数据"""
+    log("[小红书] 开始采集...")
+
+    capture = ResponseCapture("xiaohongshu", tag="[小红书]", logger=log, recorder=job.get("recorder"),
+                              account=job["account_key"], guard=job.get("login_guard"),
+                              deadline=job.get("deadline"))
+    capture.attach(page)
+
+    try:
+        # 粉丝数据页与数据分析页互不依赖，在两个标签页中同时加载
+        async with extra_tabs(page, job, 1) as (analysis_tab,):
+            capture.attach(analysis_tab)
+            await load_tabs(capture, ["user", "overview", "notes"], [
+                load_page(page, job, "https://creator.xiaohongshu.com/statistics/fans-data"),
+                load_page(analysis_tab, job, "https://creator.xiaohongshu.com/statistics/data-analysis"),
+            ])
+
+        api_data = capture.results
+        stream = WorkStream(job, parse_xiaohongshu_account(api_data), resume=True)
+        await stream_pages_in_browser(page, stream, api_data["notes"])
+
+        result = stream.finish()
+        log(f"[小红书] 采集完成: {result['account']['account_name']}, {result['works_count']} 个作品")
+        return result
+
+    except (SessionExpiredError, DeadlineExceeded):
+        raise
     except Exception as e:
         log(f"[小红书] 采集失败: {e}")
         return None
+    finally:
+        capture.detach()
+        capture.report()
 
 
 # ============================================================
 # 采集器：抖音
 # ============================================================
-def collect_douyin(page, cookie_str):
-    """采集抖音数据"""
-    log("[抖音] 开始采集...")
+def _apply_douyin_author(account, author):
+    """从作者信息填充账号字段"""
+    account["account_name"] = author.get("nickname", "")
+    account["account_id"] = str(author.get("uid", "") or author.get("unique_id", ""))
+    account["followers"] = safe_int(
+        author.get("follower_count", 0) or author.get("mplatform_followers_count", 0)
+    )
+    # 头像
+    for key in ["avatar_thumb", "avatar_medium", "avatar_larger"]:
+        if author.get(key, {}).get("url_list"):
+            account["avatar_url"] = author[key]["url_list"][0]
+            break
 
-    cookies = parse_cookies(cookie_str)
-    for c in cookies:
-        c["domain"] = ".douyin.com"
-    page.context.add_cookies(cookies)
 
+def parse_douyin_account(api_data):
+    """解析抖音账号信息；没有用户信息接口时，从第一个作品的作者获取"""
     account = create_empty_account("douyin")
-    works = []
-    api_data = {"works": []}
 
-    def handle_response(response):
-        try:
-            url = response.url
-            if "/janus/douyin/creator/pc/work_list" in url or "/work_list" in url:
-                data = response.json()
-                if data.get("status_code") == 0:
-                    aweme_list = data.get("aweme_list", [])
-                    api_data["works"].extend(aweme_list)
-        except (json.JSONDecodeError, KeyError, TypeError):
-            pass  # 非目标响应，忽略
+    if api_data.get("user"):
+        _apply_douyin_author(account, api_data["user"])
+    else:
+        for item in api_data.get("works") or []:
+            if item.get("author"):
+                _apply_douyin_author(account, item["author"])
+                break
+
+    return account
 
-    page.on("response", handle_response)
 
+def parse_douyin_works(items):
+    """解析一页抖音作品"""
+    works = WorkBatch("douyin")
+    for item in items:
+        stats = item.get("statistics", {})
+        cover_url = ""
+        if item.get("cover", {}).get("url_list"):
+            cover_url = item["cover"]["url_list"][0]
+
+        add_work(
+            works,
+            work_id=item.get("aweme_id", ""),
+            title=item.get("desc", ""),
+            publish_time=format_timestamp(item.get("create_time")),
+            cover_url=cover_url,
+            url=f"https://www.douyin.com/video/{item.get('aweme_id', '')}",
+            views=stats.get("play_count", 0),
+            likes=stats.get("digg_count", 0),
+            comments=stats.get("comment_count", 0),
+            shares=stats.get("share_count", 0),
+            collects=stats.get("collect_count", 0)
+        )
+    return works
+
+
+async def fetch_douyin_user(page, job):
+    """通过页面的 APIRequestContext 获取抖音用户信息（共用页面 Cookie），失败时返回 None"""
+    url = ENDPOINTS["douyin"]["user"]
+    resp = await page_request_context(page, job).fetch(
+        url, method="GET", timeout=job.get("deadline", NO_DEADLINE).timeout_ms(REQUEST_TIMEOUT * 1000))
+    if not resp.ok:
+        return None
     try:
-        page.goto("https://creator.douyin.com/creator-micro/home",
-                  wait_until="networkidle", timeout=30000)
-        page.wait_for_timeout(2000)
-
-        page.goto("https://creator.douyin.com/creator-micro/content/manage",
-                  wait_until="networkidle", timeout=30000)
-        page.wait_for_timeout(3000)
-        page.evaluate("window.scrollTo(0, 500)")
-        page.wait_for_timeout(2000)
-
-        if not api_data["works"]:
-            page.goto("https://creator.douyin.com/creator/content/manage",
-                      wait_until="networkidle", timeout=30000)
-            page.wait_for_timeout(3000)
-
-        # 解析作品数据
-        for item in api_data["works"]:
-            # 从第一个作品获取用户信息
-            if not account["account_name"] and item.get("author"):
-                author = item["author"]
-                account["account_name"] = author.get("nickname", "")
-                account["account_id"] = str(author.get("uid", "") or author.get("unique_id", ""))
-                account["followers"] = safe_int(
-                    author.get("follower_count", 0) or author.get("mplatform_followers_count", 0)
-                )
-                # 头像
-                for key in ["avatar_thumb", "avatar_medium", "avatar_larger"]:
-                    if author.get(key, {}).get("url_list"):
-                        account["avatar_url"] = author[key]["url_list"][0]
-                        break
-
-            stats = item.get("statistics", {})
-            publish_time = ""
-            if item.get("create_time"):
-                try:
-                    publish_time = datetime.fromtimestamp(item["create_time"]).strftime("%Y-%m-%d %H:%M")
-                except (ValueError, OSError, TypeError):
-                    pass
-
-            cover_url = ""
-            if item.get("cover", {}).get("url_list"):
-                cover_url = item["cover"]["url_list"][0]
-
-            work = create_work(
-                platform="douyin",
-                work_id=item.get("aweme_id", ""),
-                title=item.get("desc", ""),
-                publish_time=publish_time,
-                cover_url=cover_url,
-                url=f"https://www.douyin.com/video/{item.get('aweme_id', '')}",
-                views=stats.get("play_count", 0),
-                likes=stats.get("digg_count", 0),
-                comments=stats.get("comment_count", 0),
-                shares=stats.get("share_count", 0),
-                collects=stats.get("collect_count", 0)
-            )
-            works.append(work)
+        data = await resp.json()
+    except ValueError:
+        return None
+    return data.get("user") if data.get("status_code") == 0 else None
+
+
+async def collect_douyin(page, job):
+    """采集抖音数据（作品管理页滚动翻页）"""
+    log("[抖音] 开始采集...")
+
+    capture = ResponseCapture("douyin", tag="[抖音]", logger=log, recorder=job.get("recorder"),
+                              account=job["account_key"], guard=job.get("login_guard"),
+                              deadline=job.get("deadline"))
+    pages = capture.results["works"]
+    capture.attach(page)
 
-        # 计算汇总
-        calculate_account_totals(account, works)
+    try:
+        # 作品管理页和旧版作品管理页同时加载、竞速，
+        # 以先返回作品列表的标签页为准继续滚动，另一个的响应不再计入
+        async with extra_tabs(page, job, 1) as (legacy_tab,):
+            capture.attach(legacy_tab)
+            await load_tabs(capture, ["works"], [
+                load_page(page, job, "https://creator.douyin.com/creator-micro/content/manage"),
+                load_page(legacy_tab, job, "https://creator.douyin.com/creator/content/manage"),
+            ])
+            works_tab = capture.owners.get("works") or page
+
+            first_page = pages[0].get("aweme_list", []) if pages else []
+            account = parse_douyin_account({"works": first_page})
+            if not account["account_id"]:
+                # 没有作品就没有作者信息：在页面中请求用户信息接口，已登录的零作品账号不会被当作登录失效
+                account = parse_douyin_account({"user": await fetch_douyin_user(page, job)})
+            # 滚动加载只能从第一页开始，不沿用断点的游标（记录的游标仍可供直连续采）
+            stream = WorkStream(job, account)
+
+            has_more = True
+            while stream.remaining_pages:
+                while pages and stream.remaining_pages:
+                    data = pages.pop(0)
+                    has_more = bool(data.get("has_more"))
+                    stream.push(data.get("aweme_list", []), data.get("max_cursor"), has_more)
+                if not has_more or not stream.remaining_pages:
+                    break
+                # 滚动到底部触发下一页
+                capture.reset("works")
+                await works_tab.evaluate(SCROLL_TO_BOTTOM_JS)
+                await capture.wait(["works"], timeout_ms=SCROLL_WAIT_TIMEOUT)
+                if not pages:
+                    break
 
-        log(f"[抖音] 采集完成: {account['account_name']}, {len(works)} 个作品")
-        return {"account": account, "works": works}
+        result = stream.finish()
+        log(f"[抖音] 采集完成: {result['account']['account_name']}, {result['works_count']} 个作品")
+        return result
 
+    except (SessionExpiredError, DeadlineExceeded):
+        raise
     except Exception as e:
         log(f"[抖音] 采集失败: {e}")
         return None
+    finally:
+        capture.detach()
+        capture.report()
 
 
 # ============================================================
 # 采集器：视频号
 # ============================================================
-def collect_shipinhao(page, cookie_str, playwright_instance=None, allow_interactive_login=True):
-    """采集视频号数据"""
-    log("[视频号] 开始采集...")
+def parse_shipinhao_account(api_data):
+    """解析视频号账号信息"""
+    account = create_empty_account("shipinhao")
 
-    cookies = parse_cookies(cookie_str)
-    for c in cookies:
-        c["domain"] = ".weixin.qq.com"
-    page.context.add_cookies(cookies)
+    if api_data.get("auth"):
+        user = api_data["auth"].get("finderUser", {})
+        account["account_name"] = user.get("nickname", "")
+        account["account_id"] = user.get("uniqId", "") or user.get("finderUsername", "")
+        account["followers"] = safe_int(user.get("fansCount", 0))
+        account["avatar_url"] = user.get("headImgUrl", "")
 
-    account = create_empty_account("shipinhao")
-    works = []
-    api_data = {"auth": None, "posts": [], "need_login": False}
-    result_status = {"status": "success", "message": ""}
+    return account
+
+
+def parse_shipinhao_works(posts):
+    """解析一页视频号作品"""
+    works = WorkBatch("shipinhao")
+    for item in posts:
+        desc = item.get("desc", "")
+        if isinstance(desc, dict):
+            title = item.get("title", "") or "视频"
+        else:
+            title = str(desc)[:50] if desc else "视频"
+
+        add_work(
+            works,
+            work_id=item.get("objectId", ""),
+            title=title,
+            publish_time=format_timestamp(item.get("createTime")),
+            cover_url=item.get("coverUrl", ""),
+            url="",
+            views=item.get("readCount", 0),
+            likes=item.get("likeCount", 0),
+            comments=item.get("commentCount", 0),
+            shares=item.get("forwardCount", 0),
+            collects=item.get("favCount", 0)
+        )
+    return works
 
-    def handle_response(response):
-        try:
-            url = response.url
-            if "/auth/auth_data" in url:
-                data = response.json()
-                if data.get("errCode") == 0:
-                    api_data["auth"] = data.get("data", {})
-                elif data.get("errCode") == 300334:
-                    api_data["need_login"] = True
-            elif "/post/post_list" in url:
-                data = response.json()
-                if data.get("errCode") == 0:
-                    api_data["posts"].extend(data.get("data", {}).get("list", []))
-        except (json.JSONDecodeError, KeyError, TypeError):
-            pass  # 非目标响应，忽略
-
-    page.on("response", handle_response)
-    headed_browser = None
+
+SHIPINHAO_POST_LIST_URL = "https://channels.weixin.qq.com/platform/post/list"
+
+
+async def collect_shipinhao(page, job):
+    """采集视频号数据；需要登录时抛出 SessionExpiredError，扫码登录由独立进程完成（见 login_flow.py）"""
+    log("[视频号] 开始采集...")
+
+    capture = ResponseCapture("shipinhao", tag="[视频号]", logger=log, recorder=job.get("recorder"),
+                              account=job["account_key"], guard=job.get("login_guard"),
+                              deadline=job.get("deadline"))
+    capture.attach(page)
 
     try:
-        page.goto("https://channels.weixin.qq.com/platform/post/list",
-                  wait_until="domcontentloaded", timeout=60000)
-        page.wait_for_timeout(3000)
+        await goto(page, job, SHIPINHAO_POST_LIST_URL, timeout=60000)
+        await capture.wait(["auth"], timeout_ms=DEFAULT_WAIT_TIMEOUT)
 
-        need_login = "login" in page.url or api_data["need_login"] or not api_data["auth"]
+        if "login" in page.url or capture.login_required or not capture.results["auth"]:
+            raise SessionExpiredError("视频号需要登录")
 
-        if need_login and playwright_instance and allow_interactive_login:
-            log("[视频号] 需要登录，正在打开浏览器窗口...")
-            page.context.close()
+        await capture.wait(["posts"], timeout_ms=DEFAULT_WAIT_TIMEOUT)
+
+        first_posts = [post for chunk in capture.results["posts"] for post in chunk]
+        stream = WorkStream(job, parse_shipinhao_account(capture.results), resume=True)
+        await stream_pages_in_browser(page, stream, first_posts)
+        result = stream.finish()
+
+        log(f"[视频号] 采集完成: {result['account']['account_name']}, {result['works_count']} 个作品")
+        return {"status": "success", "message": "", **result}
+
+    except (SessionExpiredError, DeadlineExceeded):
+        raise
+    except Exception as e:
+        log(f"[视频号] 采集失败: {e}")
+        return {"status": "error", "message": str(e), "account": create_empty_account("shipinhao")}
+    finally:
+        capture.detach()
+        capture.report()
 
-            headed_browser = playwright_instance.chromium.launch(headless=False)
-            headed_context = headed_browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-            )
-            headed_page = headed_context.new_page()
 
-            api_data["auth"] = None
-            api_data["posts"] = []
-            headed_page.on("response", handle_response)
+async def shipinhao_login(account_key, timeout=LOGIN_TIMEOUT):
+    """打开有界面的浏览器等待扫码，成功后保存 Cookie，返回是否登录成功"""
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=False)
+        try:
+            context = await browser.new_context(user_agent=USER_AGENT)
+            page = await context.new_page()
+            capture = ResponseCapture("shipinhao", tag="[视频号登录]", logger=log, account=account_key)
+            capture.attach(page)
 
-            headed_page.goto("https://channels.weixin.qq.com/platform/post/list",
-                             wait_until="domcontentloaded", timeout=120000)
-            log("[视频号] 请扫码登录...")
+            await page.goto(SHIPINHAO_POST_LIST_URL, wait_until="domcontentloaded", timeout=120000)
+            log(f"[视频号] 请扫码登录（账号 {account_key}）...")
 
-            for _ in range(120):
-                headed_page.wait_for_timeout(1000)
-                if "login" not in headed_page.url and api_data["auth"]:
+            for _ in range(timeout):
+                await page.wait_for_timeout(1000)
+                if "login" not in page.url and capture.results["auth"]:
                     log("[视频号] 登录成功！")
                     break
             else:
                 log("[视频号] 登录超时")
-                headed_browser.close()
-                return {
-                    "status": "pending_login",
-                    "message": "登录超时",
-                    "account": account,
-                    "works": works
-                }
-
-            # 保存新 Cookie
-            new_cookies = headed_context.cookies()
-            cookie_parts = [f"{c['name']}={c['value']}" for c in new_cookies
-                           if c["domain"].endswith("weixin.qq.com")]
-            if cookie_parts:
-                _save_cookie_to_config("shipinhao", "; ".join(cookie_parts))
-
-            headed_page.wait_for_timeout(3000)
-            page = headed_page
-
-        elif need_login:
-            log("[视频号] Cookie无效，需要登录")
-            return {
-                "status": "pending_login",
-                "message": "等待登录",
-                "account": account,
-                "works": works
-            }
-
-        page.wait_for_timeout(5000)
-
-        # 解析用户信息
-        if api_data["auth"]:
-            user = api_data["auth"].get("finderUser", {})
-            account["account_name"] = user.get("nickname", "")
-            account["account_id"] = user.get("uniqId", "") or user.get("finderUsername", "")
-            account["followers"] = safe_int(user.get("fansCount", 0))
-            account["avatar_url"] = user.get("headImgUrl", "")
-
-        # 解析作品数据
-        for item in api_data["posts"]:
-            desc = item.get("desc", "")
-            if isinstance(desc, dict):
-                title = item.get("title", "") or "视频"
-            else:
-                title = str(desc)[:50] if desc else "视频"
+                return False
 
-            publish_time = ""
-            if item.get("createTime"):
-                try:
-                    publish_time = datetime.fromtimestamp(item["createTime"]).strftime("%Y-%m-%d %H:%M")
-                except (ValueError, OSError, TypeError):
-                    pass
-
-            work = create_work(
-                platform="shipinhao",
-                work_id=item.get("objectId", ""),
-                title=title,
-                publish_time=publish_time,
-                cover_url=item.get("coverUrl", ""),
-                url="",
-                views=item.get("readCount", 0),
-                likes=item.get("likeCount", 0),
-                comments=item.get("commentCount", 0),
-                shares=item.get("forwardCount", 0),
-                collects=item.get("favCount", 0)
-            )
-            works.append(work)
-
-        # 计算汇总
-        calculate_account_totals(account, works)
-
-        if headed_browser:
-            headed_browser.close()
+            new_cookies = await context.cookies()
+            cookie_parts = [f"{c['name']}={c['value']}" for c in new_cookies
+                            if c["domain"].endswith("weixin.qq.com")]
+            if not cookie_parts:
+                log("[视频号] 登录后没有读取到 Cookie")
+                return False
+            _save_cookie_to_config("shipinhao", "; ".join(cookie_parts), account_key)
+            return True
+        finally:
+            await browser.close()
 
-        log(f"[视频号] 采集完成: {account['account_name']}, {len(works)} 个作品")
-        return {"status": "success", "message": "", "account": account, "works": works}
 
+def login_main(account_key):
+    """独立的扫码登录进程：登录成功后单独采集一次该视频号账号"""
+    login_flow.acquire(LOGIN_LOCK_DIR, account_key)
+    try:
+        logged_in = asyncio.run(shipinhao_login(account_key))
     except Exception as e:
-        log(f"[视频号] 采集失败: {e}")
-        if headed_browser:
-            headed_browser.close()
-        return {"status": "error", "message": str(e), "account": account, "works": works}
+        log(f"[视频号] 扫码登录失败: {e}")
+        logged_in = False
+    finally:
+        login_flow.release(LOGIN_LOCK_DIR, account_key)
+
+    if logged_in:
+        log("[视频号] 开始登录后的补采")
+        main(target_platform="shipinhao", target_account=account_key, sync_cookies=False, start_login=False)
 
 
-def _save_cookie_to_config(platform, new_cookie):
-    """保存新 Cookie 到配置文件"""
+def _save_cookie_to_config(platform, new_cookie, account_key=None):
+    """保存新 Cookie 到配置文件（多账号模式下写回对应账号）"""
     try:
         with open(CONFIG_FILE, "r", encoding="utf-8") as f:
             config = json.load(f)
         if platform in config:
-            config[platform]["cookie"] = new_cookie
+            accounts = config[platform].get("accounts")
+            target = next((a for a in accounts or [] if a.get("name") == account_key), None)
+            (target if target is not None else config[platform])["cookie"] = new_cookie
         with open(CONFIG_FILE, "w", encoding="utf-8") as f:
             json.dump(config, f, ensure_ascii=False, indent=2)
         log(f"[{platform}] Cookie 已保存")
@@ -500,19 +765,14 @@ def _save_cookie_to_config(platform, new_cookie):
 # 保存采集结果到数据库
 # ============================================================
 def save_platform_data(platform, result):
-    """保存平台数据到 SQLite"""
+    """保存平台数据到 SQLite（流式采集的作品已逐页写入，这里只保存账号汇总）"""
     if not result:
         return
 
     account = result.get("account", {})
-    works = result.get("works", [])
-
-    # 保存每日账号数据
-    save_daily_account(platform, account)
 
-    # 保存作品数据
-    if works:
-        save_works(platform, works)
+    with timer.stage("save_platform_data", platform, account.get("account_id", "")):
+        save_daily_account(platform, account)
 
     log(f"[{platform}] 数据已保存到数据库")
 
@@ -554,92 +814,831 @@ def push_to_github():
             log("没有变更需要提交")
             return
         commit_msg = f"Auto update: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        subprocess.run(["git", "commit", "-m", commit_msg], check=True, capture_output=True)
-        subprocess.run(["git", "push"], check=True, capture_output=True)
+        with timer.stage("git_commit"):
+            subprocess.run(["git", "commit", "-m", commit_msg], check=True, capture_output=True)
+        with timer.stage("git_push"):
+            subprocess.run(["git", "push"], check=True, capture_output=True)
         log("已推送到 GitHub")
     except Exception as e:
         log(f"Git 推送失败: {e}")
 
 
 # ============================================================
-# 主函数
+# 采集引擎：单浏览器、上下文池、多账号并发采集
 # ============================================================
-def main(target_platform=None):
-    """主函数"""
-    log("=" * 50)
-    log(f"开始采集{'所有平台' if not target_platform else target_platform}数据")
-    log("=" * 50)
+COLLECTORS = {
+    "xiaohongshu": collect_xiaohongshu,
+    "douyin": collect_douyin,
+    "shipinhao": collect_shipinhao
+}
+
+ACCOUNT_PARSERS = {
+    "xiaohongshu": parse_xiaohongshu_account,
+    "douyin": parse_douyin_account,
+    "shipinhao": parse_shipinhao_account
+}
+
+WORK_PARSERS = {
+    "xiaohongshu": parse_xiaohongshu_works,
+    "douyin": parse_douyin_works,
+    "shipinhao": parse_shipinhao_works
+}
+
+COOKIE_DOMAINS = {
+    "xiaohongshu": ".xiaohongshu.com",
+    "douyin": ".douyin.com",
+    "shipinhao": ".weixin.qq.com"
+}
+
+# auto: 先直连接口，被拦截时回退浏览器；http: 只用直连；browser: 只用浏览器
+COLLECT_MODES = ("auto", "http", "browser")
+
+
+def iter_accounts(platform_config):
+    """列出平台配置下的账号；未配置 accounts 时兼容单 Cookie 写法"""
+    accounts = platform_config.get("accounts")
+    if not accounts:
+        return [{"name": "default", "cookie": platform_config.get("cookie", "")}]
+    return [
+        {**account, "name": account.get("name") or f"account{i + 1}"}
+        for i, account in enumerate(accounts)
+        if account.get("enabled", True)
+    ]
+
+
+def plan_incremental(platform, account_key, settings, force_full=False):
+    """根据水位线决定本次是增量还是全量，返回翻页截止时间（None 表示全量）"""
+    incremental = settings.get("incremental", {})
+    if force_full or not incremental.get("enabled", False):
+        return None
 
-    # 初始化数据库
-    init_db()
+    watermark = get_watermark(platform, account_key)
+    if not watermark or not watermark["newest_publish_time"] or not watermark["last_full_refresh"]:
+        return None
+
+    now = datetime.now()
+    full_refresh_days = safe_int(incremental.get("full_refresh_days", DEFAULT_FULL_REFRESH_DAYS))
+    last_full = datetime.strptime(watermark["last_full_refresh"], "%Y-%m-%d")
+    if (now - last_full).days >= full_refresh_days:
+        return None
+
+    recent_days = safe_int(incremental.get("recent_days", DEFAULT_RECENT_DAYS))
+    recent_cutoff = (now - timedelta(days=recent_days)).strftime("%Y-%m-%d %H:%M")
+    return min(recent_cutoff, watermark["newest_publish_time"])
+
+
+def build_jobs(platforms, config, max_pages=None, force_full=False, cdp=False, replay=False):
+    """展开为 (平台, 账号) 采集任务列表
+
+    cdp=True 时附加到运营者的 Chrome，每个平台只有浏览器里登录的那一个账号，
+    Cookie 稍后从浏览器读取；replay=True 时数据来自夹具，不检查 Cookie；
+    persistent profile 模式下没有 Cookie 的账号使用 profile 中的登录态，只在浏览器中采集。
+    """
+    settings = config.get("settings", {})
+    default_mode = settings.get("collect_mode", "auto")
+    persistent = settings.get("profiles", {}).get("mode") == "persistent"
+    if max_pages is None:
+        max_pages = safe_int(settings.get("max_pages", DEFAULT_MAX_PAGES)) or DEFAULT_MAX_PAGES
+    jobs = []
+    for platform in platforms:
+        platform_config = config.get(platform, {})
+        collect_mode = platform_config.get("collect_mode", default_mode)
+        if collect_mode not in COLLECT_MODES:
+            log(f"[{platform}] 未知的采集模式 {collect_mode}，使用 auto")
+            collect_mode = "auto"
+
+        if not replay and not platform_config.get("enabled", False):
+            log(f"[{platform}] 已禁用，跳过")
+            continue
+
+        accounts = iter_accounts(platform_config)
+        if cdp:
+            accounts = accounts[:1]
+        for account in accounts:
+            label = platform if len(accounts) == 1 else f"{platform}/{account['name']}"
+            cookie = account.get("cookie", "")
+            if cookie.startswith("在这里"):
+                cookie = ""
+            account_mode = collect_mode
+            if not (cdp or replay) and not cookie:
+                if not persistent:
+                    log(f"[{label}] Cookie 未配置，跳过")
+                    continue
+                # 没有 Cookie 时只能用 profile 中扫码登录的登录态，直连接口无法使用
+                log(f"[{label}] Cookie 未配置，使用 profile 登录态在浏览器中采集")
+                account_mode = "browser"
+
+            stop_before = plan_incremental(platform, account["name"], settings, force_full)
+            log(f"[{label}] {'增量采集，截止 ' + stop_before if stop_before else '全量采集'}")
+
+            jobs.append({
+                "platform": platform,
+                "account_key": account["name"],
+                "stop_before": stop_before,
+                "label": label,
+                "cookie": cookie,
+                "collect_mode": account_mode,
+                "max_pages": max_pages,
+                "resource_allowlist": platform_config.get("resource_allowlist", []),
+                "work_details": settings.get("work_details", {}),
+                "cdp": cdp
+            })
+    return jobs
+
+
+def http_session(job):
+    """直连使用的 Session：回放时读取夹具，录制时记录响应"""
+    if job.get("replay"):
+        return job["replay"].session()
+    session = SESSION_POOL.get(job["platform"], job["cookie"])
+    if job.get("recorder"):
+        return job["recorder"].wrap_session(session)
+    return session
+
+
+def page_request_context(page, job):
+    """页面内翻页使用的 APIRequestContext，回放与录制同上"""
+    if job.get("replay"):
+        return job["replay"].request_context()
+    if job.get("recorder"):
+        return job["recorder"].wrap_request_context(page.request)
+    return page.request
+
+
+def collect_via_http(job):
+    """直连接口逐页采集，被签名校验或风控拦截时抛出 ApiBlockedError"""
+    platform = job["platform"]
+    session = http_session(job)
+    deadline = job.get("deadline", NO_DEADLINE)
+
+    api_data = FETCHERS[platform](session, deadline)
+    checkpoint = job.get("resume") or {}
+    pages = iter_pages(session, platform, max(0, job["max_pages"] - checkpoint.get("pages", 0)),
+                       cursor=checkpoint.get("cursor"), deadline=deadline)
+    first_page = next(pages, None)  # 断点已达到最大页数时没有可翻的页
+    api_data["works"] = first_page[0] if first_page else []
+
+    stream = WorkStream(job, ACCOUNT_PARSERS[platform](api_data), resume=True)
+    if first_page:
+        stream.push(*first_page)
+    else:
+        log(f"[{job['label']}] 断点已达到最大页数 {stream.max_pages}，不再翻页，沿用断点的游标")
+    # 先检查预算再请求下一页：线程中的请求不会随任务取消而停止
+    while stream.remaining_pages:
+        page = next(pages, None)
+        if page is None:
+            break
+        stream.push(*page)
+
+    result = stream.finish()
+    result.update(status="success", message="")
+    return result
+
+
+async def inject_cookies(context, job):
+    """把配置中的 Cookie 写入浏览器上下文"""
+    cookies = parse_cookies(job["cookie"])
+    for c in cookies:
+        c["domain"] = COOKIE_DOMAINS[job["platform"]]
+    await context.add_cookies(cookies)
+
+
+async def instrument_page(page, job, record_har=True):
+    """为采集页面挂上资源拦截、回放/录制、网络记录和登录页检测
+
+    采集器另开的标签页同样调用（record_har=False：HAR 只录制主页面，避免多个页面写同一个文件）。
+    """
+    if job.get("resource_policy"):
+        await job["resource_policy"].attach(page)
+    if job.get("replay"):
+        # 后注册的路由先处理：回放时所有请求都由夹具应答，不访问网络
+        await job["replay"].attach(page)
+    elif job.get("recorder") and record_har:
+        await job["recorder"].record_har(page)
+    if job.get("network_profiler"):
+        job["network_profiler"].attach(page)
+    if job.get("login_guard"):
+        job["login_guard"].attach(page)
+
+
+async def run_collector(page, job, block_resources=True):
+    """在已准备好登录态的页面上运行平台采集器"""
+    platform = job["platform"]
+    if block_resources:
+        job["resource_policy"] = ResourcePolicy(platform, job["resource_allowlist"])
+    job["login_guard"] = LoginGuard(platform)
+    await instrument_page(page, job)
+    try:
+        return await COLLECTORS[platform](page, job)
+    finally:
+        if job.get("login_guard"):
+            job.pop("login_guard").detach()
 
-    # 同步视频号 Cookie
-    sync_browser_cookies()
 
-    config = load_config()
-    if not config:
+async def collect_in_profile(playwright, profiles, job, block_resources=True):
+    """在账号专属的持久化 profile 中采集，登录态和 HTTP 缓存跨运行保留"""
+    context = await profiles.open_persistent(playwright, job)
+    arm_deadline(job)
+    success = False
+    try:
+        if profiles.needs_cookie_injection(job):
+            await inject_cookies(context, job)
+        else:
+            log(f"[{job['label']}] 复用 profile 登录态，跳过 Cookie 注入")
+        page = context.pages[0] if context.pages else await context.new_page()
+        job["open_page"] = context.new_page
+        result = await run_collector(page, job, block_resources)
+        if not job["cookie"]:
+            # 没有配置 Cookie 时，作品详情等直连请求使用 profile 中的登录态
+            job["cookie"] = await cookie_header(context, job["platform"])
+        success = bool(result) and result.get("status", "success") == "success"
+        return result
+    finally:
+        await profiles.close_persistent(context, job, success=success)
+
+
+async def collect_in_browser(playwright, pool, job, block_resources=True, profiles=None):
+    """借用池中的上下文，通过浏览器抓包采集"""
+    if profiles and profiles.mode == "persistent":
+        return await collect_in_profile(playwright, profiles, job, block_resources)
+
+    use_state = profiles is not None and profiles.mode == "storage_state"
+    context = await pool.acquire(owner=(job["platform"], job["account_key"]))
+    arm_deadline(job)  # 排队等上下文的时间不计入账号预算
+    page = None
+    broken = False
+
+    try:
+        if job.get("cdp") or job.get("replay"):
+            pass  # 运营者的 Chrome 已登录 / 回放不需要 Cookie
+        elif use_state and not profiles.needs_cookie_injection(job) and await profiles.load_state(context, job):
+            log(f"[{job['label']}] 加载 storage_state 快照，跳过 Cookie 注入")
+        else:
+            await inject_cookies(context, job)
+        page = await pool.new_page(context)
+        job["open_page"] = lambda: pool.new_page(context)
+        result = await run_collector(page, job, block_resources)
+        await page.close()
+        if use_state and result and result.get("status", "success") == "success":
+            await profiles.save_state(context, job)
+        return result
+    except Exception:
+        broken = True
+        if page and not page.is_closed():
+            await page.close()
+        raise
+    finally:
+        await pool.release(context, broken=broken)
+
+
+def arm_deadline(job):
+    """从现在起为账号划出时间预算，不超过本次运行的采集窗口"""
+    job["deadline"] = job.get("collect_deadline", NO_DEADLINE).child(job.get("budget"))
+    return job["deadline"]
+
+
+async def collect_work_details(job, result):
+    """作品详情阶段：并发获取本次采集到的作品中详情已过期的部分，失败不影响账号数据"""
+    options = job.get("work_details") or {}
+    account_id = result["account"].get("account_id", "")
+    if not options.get("enabled", False) or job.get("replay") or not account_id or not result.get("work_ids"):
+        return
+    platform, label = job["platform"], job["label"]
+    refresh_hours = safe_int(options.get("refresh_hours", DEFAULT_REFRESH_HOURS))
+    max_works = safe_int(options.get("max_works", DEFAULT_MAX_WORKS)) or DEFAULT_MAX_WORKS
+    workers = safe_int(options.get("workers", DEFAULT_WORKERS)) or DEFAULT_WORKERS
+
+    collected = set(result["work_ids"])
+    stale = [work_id for work_id in get_stale_work_ids(platform, account_id, refresh_cutoff(refresh_hours))
+             if work_id in collected]
+    fresh = len(collected) - len(stale)
+    if not stale:
+        log(f"[{label}] 作品详情均在 {refresh_hours} 小时内刷新过，跳过")
         return
 
-    # 采集器映射
-    collectors = {
-        "xiaohongshu": collect_xiaohongshu,
-        "douyin": collect_douyin,
-        "shipinhao": collect_shipinhao
-    }
+    session = SESSION_POOL.get(platform, job["cookie"])
+    with timer.stage("work_details", platform, job["account_key"]) as stage:
+        try:
+            details = await asyncio.to_thread(fetch_details, session, platform, stale[:max_works], workers,
+                                              job.get("deadline", NO_DEADLINE), log)
+            save_work_details(details)
+        except Exception as e:
+            stage.status = "failed"
+            log(f"[{label}] 作品详情获取异常: {e}")
+            return
+        stage.items = len(details)
+    log(f"[{label}] 作品详情: 获取 {len(details)}/{min(len(stale), max_works)} 个"
+        f"（{fresh} 个近期已刷新，{max(0, len(stale) - max_works)} 个留待下次）")
 
-    platforms_to_collect = [target_platform] if target_platform else ["xiaohongshu", "douyin", "shipinhao"]
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
+def expired_result(job, message):
+    """登录失效的采集结果；视频号在允许时启动独立的扫码登录进程，本次记为 pending_login"""
+    if job["platform"] == "shipinhao" and job.get("start_login"):
+        login_flow.spawn(Path(__file__).resolve(), job["account_key"], LOGIN_LOCK_DIR, logger=log)
+        return {"status": "pending_login", "message": message}
+    log(f"[{job['label']}] 请更新 Cookie")
+    return {"status": "session_expired", "message": message}
 
-        for platform in platforms_to_collect:
-            platform_config = config.get(platform, {})
 
+def is_empty_result(result):
+    """没有账号 ID 也没有作品：接口全部失败，通常是登录失效"""
+    return not result["account"].get("account_id") and not result.get("works_count")
+
+
+def needs_preflight(job, profiles=None):
+    """只有用配置 Cookie 登录时才预检；浏览器沿用 profile 登录态时，配置 Cookie 过期不代表账号已掉线"""
+    if job.get("replay") or not job["cookie"]:
+        return False
+    return not (profiles and profiles.enabled and not profiles.needs_cookie_injection(job))
+
+
+async def preflight(job):
+    """采集前用 Cookie 请求一次用户信息接口，登录明确失效时返回 False"""
+    label = job["label"]
+    session = SESSION_POOL.get(job["platform"], job["cookie"])
+    with timer.stage("session_probe", job["platform"], job["account_key"]) as stage:
+        state, detail = await asyncio.to_thread(probe_session, job["platform"], session,
+                                                job.get("deadline", NO_DEADLINE))
+        stage.status = state
+        stage.detail = detail
+    if state == DEAD:
+        log(f"[{label}] 登录已失效（{detail}），跳过")
+        return False
+    if state != ALIVE:
+        log(f"[{label}] 登录态预检无法判断（{detail}），继续采集")
+    return True
+
+
+async def run_job(playwright, pool, job, block_resources=True, profiles=None):
+    """采集单个账号：优先直连接口，被拦截时回退到浏览器；失败不影响其他任务"""
+    platform, label = job["platform"], job["label"]
+    mode = job["collect_mode"]
+    started = time.monotonic()
+    via = "http"
+    result = None
+
+    with bind(platform=platform, account=job["account_key"]):
+        try:
+            arm_deadline(job)
+            if job.get("run_id"):
+                save_checkpoint(job["run_id"], platform, job["account_key"], status="running")
+            if needs_preflight(job, profiles) and not await preflight(job):
+                result = expired_result(job, "登录已失效")
+                return result
+
+            if mode in ("auto", "http"):
+                try:
+                    result = await asyncio.to_thread(collect_via_http, job)
+                    log(f"[{label}] HTTP 直连采集完成: {result['account']['account_name']}, "
+                        f"{result['works_count']} 个作品")
+                except ApiBlockedError as e:
+                    if mode == "http":
+                        log(f"[{label}] HTTP 直连采集失败: {e}")
+                        return None
+                    log(f"[{label}] HTTP 直连被拦截（{e}），回退到浏览器采集")
+
+            if result is None:
+                via = "browser"
+                result = await collect_in_browser(playwright, pool, job, block_resources, profiles)
+
+            if result and result.get("status", "success") == "success" and is_empty_result(result):
+                # 登录失效但没有跳转时接口全部失败，不能用零值覆盖已有数据
+                result = {**result, "status": "session_expired", "message": "未获取到账号信息和作品"}
+            if result:
+                status = result.get("status", "success")
+                if status == "success":
+                    save_platform_data(platform, result)
+                    if result.get("truncated"):
+                        log(f"[{label}] 时间预算不足，本次只采集了部分作品（{result['works_count']} 个）")
+                    await collect_work_details(job, result)
+                else:
+                    log(f"[{label}] 状态: {status}，不保存数据")
+            return result
+
+        except SessionExpiredError as e:
+            log(f"[{label}] {e}，中止采集")
+            result = expired_result(job, str(e))
+            return result
+        except DeadlineExceeded as e:
+            log(f"[{label}] {e}，中止采集")
+            result = {"status": "timeout", "message": str(e)}
+            return result
+        except Exception as e:
+            log(f"[{label}] 采集异常: {e}")
+            return None
+        finally:
+            if job.get("recorder") and job["recorder"].save():
+                log(f"[{label}] 已录制 {len(job['recorder'].responses)} 个响应: {job['recorder'].path}")
+            if job.get("run_id"):
+                save_checkpoint(job["run_id"], platform, job["account_key"], status=job_status(result))
+            policy = job.get("resource_policy")
+            timer.record("collect", time.monotonic() - started, platform, job["account_key"],
+                         status=job_status(result), detail=via,
+                         items=result.get("works_count", 0) if result else 0,
+                         bytes=policy.allowed_bytes if policy else 0)
+            log(f"[{label}] 耗时 {time.monotonic() - started:.1f}s")
+            if job.get("resource_policy"):
+                log(f"[{label}] 资源: {job['resource_policy'].summary()}")
+
+
+def job_status(result):
+    """账号采集结果的状态（记录耗时用），时间不足只采集了部分作品时为 truncated"""
+    if not result:
+        return "failed"
+    if result.get("truncated"):
+        return "truncated"
+    return result.get("status", "success")
+
+
+async def run_until_deadline(jobs, coros, collect_deadline):
+    """并发运行采集任务；采集窗口结束后再等 CANCEL_GRACE 秒，仍未结束的任务取消并记为 timeout"""
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    timeout = collect_deadline.remaining() + CANCEL_GRACE if collect_deadline.limited else None
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending)  # 等待被取消的任务执行完 finally（归还上下文等）
+
+    results = []
+    for job, task in zip(jobs, tasks):
+        if task.cancelled():
+            log(f"[{job['label']}] 超过运行截止时间，任务已取消")
+            results.append({"status": "timeout", "message": "超过运行截止时间"})
+        elif task.exception():
+            results.append(task.exception())
+        else:
+            results.append(task.result())
+    return results
+
+
+def apply_resume(jobs, run_id):
+    """断点续采：沿用今天最近一次中断运行的断点，跳过已完成的账号，未完成的账号从记录的游标继续翻页"""
+    previous = find_resumable_run(exclude_run_id=run_id)
+    if not previous:
+        log("断点续采: 今天没有中断的运行，从头采集")
+        return jobs
+    copy_checkpoints(previous, run_id)
+    checkpoints = get_checkpoints(run_id)
+
+    ready = []
+    for job in jobs:
+        checkpoint = checkpoints.get((job["platform"], job["account_key"]))
+        if checkpoint and checkpoint["status"] == "success":
+            log(f"[{job['label']}] 上次运行已完成，跳过")
+            continue
+        if checkpoint and checkpoint["cursor"] is not None:
+            job["resume"] = checkpoint
+            log(f"[{job['label']}] 从第 {checkpoint['pages'] + 1} 页继续（已采集 {checkpoint['works']} 个作品）")
+        ready.append(job)
+
+    finished = sorted({job["platform"] for job in jobs} - {job["platform"] for job in ready})
+    log(f"断点续采: 运行 {previous}，{len(jobs) - len(ready)} 个账号已完成"
+        f"{'（' + '、'.join(finished) + ' 全部完成）' if finished else ''}，{len(ready)} 个待采集")
+    return ready
+
+
+def log_resource_summary(jobs):
+    """按平台汇总资源拦截统计"""
+    by_platform = {}
+    for job in jobs:
+        policy = job.get("resource_policy")
+        if not policy:
+            continue
+        if job["platform"] in by_platform:
+            by_platform[job["platform"]].merge(policy)
+        else:
+            by_platform[job["platform"]] = ResourcePolicy(job["platform"]).merge(policy)
+
+    for platform, policy in by_platform.items():
+        log(f"[{platform}] 资源汇总: {policy.summary()}")
+
+
+def log_network_profile(jobs, top_n):
+    """写入本次运行的网络瀑布文件，并输出各平台最重、最慢的资源"""
+    profilers = [job["network_profiler"] for job in jobs if job.get("network_profiler")]
+    path = write_profile(profilers, NETWORK_PROFILE_DIR, run_id=timer.run_id)
+    if not path:
+        log("网络记录: 没有记录到请求")
+        return
+    summary = summarize(profilers, top_n=top_n)
+    with open(path.with_suffix(".summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    for line in format_summary(summary):
+        log(line)
+    log(f"网络记录已保存: {path}")
+
+
+async def get_browser(playwright, settings):
+    """优先连接常驻浏览器服务，不可用时本地启动 Chromium"""
+    server_settings = settings.get("browser_server", {})
+    if server_settings.get("enabled", False):
+        with timer.stage("browser_connect") as stage:
+            browser = await connect_browser_server(playwright, server_settings, logger=log)
+            stage.status = "ok" if browser else "unavailable"
+        if browser:
+            return browser
+        log("浏览器服务不可用，改为本地启动浏览器")
+
+    with timer.stage("browser_launch") as stage:
+        browser = await playwright.chromium.launch(headless=True)
+    log(f"浏览器已启动（{stage.duration:.1f}s）")
+    return browser
+
+
+async def attach_cdp_jobs(browser, jobs):
+    """用运营者 Chrome 中的 Cookie 填充任务，未登录的平台跳过"""
+    context = browser.contexts[0]
+    ready = []
+    for job in jobs:
+        job["cookie"] = await cookie_header(context, job["platform"])
+        if job["cookie"]:
+            ready.append(job)
+        else:
+            log(f"[{job['label']}] Chrome 中未登录，跳过")
+    return ready
+
+
+def attach_fixtures(jobs, record_dir=None, replay_dir=None, record_har=False):
+    """录制模式为每个任务挂上录制器；回放模式加载夹具，没有夹具的账号跳过"""
+    if record_dir:
+        for job in jobs:
+            job["recorder"] = Recorder(record_dir, job, har=record_har)
+    if not replay_dir:
+        return jobs
+
+    ready = []
+    for job in jobs:
+        job["replay"] = Fixture.load(replay_dir, job)
+        if job["replay"]:
+            log(f"[{job['label']}] 回放 {job['replay'].path}（录制于 {job['replay'].recorded_at}）")
+            ready.append(job)
+        else:
+            log(f"[{job['label']}] 没有录制的夹具，跳过")
+    return ready
+
+
+async def collect_platforms(platforms, config, concurrency=DEFAULT_CONCURRENCY, max_pages=None,
+                            force_full=False, cdp_endpoint=None, record_dir=None, replay_dir=None,
+                            record_har=False, profile_network=0, start_login=True, run_deadline=None,
+                            resume=False, target_account=None):
+    """在一个浏览器内并发采集所有账号，返回 {label: result}
+
+    profile_network 大于 0 时记录每个请求的网络瀑布，并输出各平台前 N 个最重、最慢的资源。
+    start_login 为 True 时，视频号登录失效会启动独立的扫码登录进程（附加 Chrome、回放时不启动）。
+    run_deadline 为整次运行的截止时间：采集在截止前 FINALIZE_RESERVE 秒结束，各账号平分剩余时间（见 deadline.py）。
+    各账号的完成状态和翻页进度记入本次运行的断点；resume 为 True 时从今天中断的运行继续（回放时不记录断点）。
+    target_account 不为空时只采集该名称的账号（扫码登录后的补采）。
+    """
+    settings = config.get("settings", {})
+    pages_per_context = (safe_int(settings.get("context_max_pages", DEFAULT_PAGES_PER_CONTEXT))
+                         or DEFAULT_PAGES_PER_CONTEXT)
+    block_resources = settings.get("block_resources", True)
+
+    async with async_playwright() as p:
+        cdp_browser = await connect_cdp(p, cdp_endpoint, logger=log) if cdp_endpoint else None
+        if cdp_endpoint and not cdp_browser:
+            log("改为启动独立浏览器，使用配置中的 Cookie")
+
+        jobs = build_jobs(platforms, config, max_pages=max_pages, force_full=force_full,
+                          cdp=cdp_browser is not None, replay=bool(replay_dir))
+        if target_account:
+            jobs = [job for job in jobs if job["account_key"] == target_account]
+        if cdp_browser:
+            jobs = await attach_cdp_jobs(cdp_browser, jobs)
+        jobs = attach_fixtures(jobs, record_dir, replay_dir, record_har)
+        if timer.run_id and not replay_dir:
+            for job in jobs:
+                job["run_id"] = timer.run_id
+            if resume:
+                jobs = apply_resume(jobs, timer.run_id)
+        if not jobs:
+            return {}
+        collect_deadline = (run_deadline or NO_DEADLINE).child(reserve=FINALIZE_RESERVE)
+        budget = job_budget(collect_deadline.remaining(), len(jobs), concurrency)
+        if budget:
+            log(f"时间预算: 采集窗口 {collect_deadline}，每个账号最多 {budget:.0f}s")
+        for job in jobs:
+            job["start_login"] = start_login and not job["cdp"] and not replay_dir
+            job["collect_deadline"] = collect_deadline
+            job["budget"] = budget
+            if profile_network:
+                job["network_profiler"] = NetworkProfiler(job["platform"], job["account_key"])
+
+        if cdp_browser:
+            pool = CdpTabs(cdp_browser, size=concurrency)
+            profiles = ProfileStore({})  # 登录态由运营者的 Chrome 维护
+        elif replay_dir:
+            pool = ContextPool(lambda: get_browser(p, settings),
+                               size=concurrency, max_pages=pages_per_context, user_agent=USER_AGENT)
+            profiles = ProfileStore({})  # 回放不需要登录态
+        else:
+            pool = ContextPool(lambda: get_browser(p, settings),
+                               size=concurrency, max_pages=pages_per_context, user_agent=USER_AGENT)
+            profiles = ProfileStore(settings.get("profiles", {}), size=concurrency,
+                                    user_agent=USER_AGENT, logger=log)
+        try:
+            results = await run_until_deadline(
+                jobs,
+                [run_job(p, pool, job, block_resources, profiles if profiles.enabled else None)
+                 for job in jobs],
+                collect_deadline,
+            )
+        finally:
+            await pool.close()
+            SESSION_POOL.close()
+            if profiles.enabled:
+                profiles.cleanup_stale(jobs)
+
+    if cdp_browser:
+        log(f"Chrome 后台标签页: 共打开 {pool.created} 个")
+    else:
+        log(f"上下文池: 共创建 {pool.created} 个，回收 {pool.recycled} 个")
+    log_resource_summary(jobs)
+    if profile_network:
+        log_network_profile(jobs, top_n=profile_network)
+
+    collected = {}
+    for job, result in zip(jobs, results):
+        if isinstance(result, BaseException):
+            log(f"[{job['label']}] 采集异常: {result}")
+            result = None
+        collected[job["label"]] = result
+    return collected
+
+
+# ============================================================
+# 历史数据回填
+# ============================================================
+def backfill_account(platform, cookie, days, today, created_at):
+    """拉取单个账号的趋势序列，返回待写入 daily_accounts 的行"""
+    session = SESSION_POOL.get(platform, cookie)
+    account = ACCOUNT_PARSERS[platform](FETCHERS[platform](session))
+    account_id = account["account_id"]
+    if not account_id:
+        raise ApiBlockedError("未获取到账号信息")
+
+    # 锚点：数据库中最近一天的快照；新账号没有快照时用当前账号信息和已入库作品的汇总
+    snapshots = get_account_snapshots(platform, account_id)
+    anchor = snapshots[-1] if snapshots else {**account, **get_account_work_totals(platform, account_id),
+                                              "date": today}
+    series = fetch_trend(session, platform, days)
+    return backfill_rows(platform, anchor, snapshots, series, days, today, created_at)
+
+
+def backfill_main(days, target_platform=None, overwrite=False):
+    """从各平台趋势接口回填最近 days 天的每日账号数据，所有账号的行在一个事务中写入
+
+    默认只补缺失的日期；overwrite 为 True 时用趋势数据覆盖已有的每日快照。
+    """
+    log("=" * 50)
+    log(f"开始回填{'所有平台' if not target_platform else target_platform}最近 {days} 天的账号数据")
+    log("=" * 50)
+
+    init_db()
+    timer.start("collect_all --backfill")
+    status = "failed"
+
+    try:
+        config = load_config()
+        if not config:
+            return
+
+        now = datetime.now()
+        today, created_at = now.strftime("%Y-%m-%d"), now.isoformat()
+        rows, accounts = [], 0
+        for platform in [target_platform] if target_platform else ["xiaohongshu", "douyin", "shipinhao"]:
+            platform_config = config.get(platform, {})
             if not platform_config.get("enabled", False):
                 log(f"[{platform}] 已禁用，跳过")
                 continue
 
-            cookie = platform_config.get("cookie", "")
-            if not cookie or cookie.startswith("在这里"):
-                log(f"[{platform}] Cookie 未配置，跳过")
-                continue
+            entries = iter_accounts(platform_config)
+            for entry in entries:
+                label = platform if len(entries) == 1 else f"{platform}/{entry['name']}"
+                cookie = entry.get("cookie", "")
+                if not cookie or cookie.startswith("在这里"):
+                    log(f"[{label}] Cookie 未配置，跳过")
+                    continue
+
+                with bind(platform=platform, account=entry["name"]):
+                    with timer.stage("backfill", platform, entry["name"]) as stage:
+                        try:
+                            account_rows = backfill_account(platform, cookie, days, today, created_at)
+                        except ApiBlockedError as e:
+                            stage.status = "failed"
+                            log(f"[{label}] 趋势数据获取失败: {e}")
+                            continue
+                        stage.items = len(account_rows)
+                rows.extend(account_rows)
+                accounts += 1
+                log(f"[{label}] 趋势数据: {len(account_rows)} 天")
+
+        with timer.stage("save_daily_accounts_bulk") as stage:
+            written = save_daily_accounts_bulk(rows, overwrite=overwrite) if rows else 0
+            stage.items = written
+        log(f"回填完成: {accounts} 个账号，{len(rows)} 行，"
+            f"{'覆盖写入' if overwrite else '新增'} {written} 行")
+
+        if written:
+            save_frontend_json()
+        status = "success" if accounts else "empty"
+    finally:
+        SESSION_POOL.close()
+        timer.finish(status)
 
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-            )
-            page = context.new_page()
-
-            try:
-                if platform == "shipinhao":
-                    # 视频号：总是允许弹窗登录，因为 Cookie 可能随时失效
-                    result = collectors[platform](page, cookie, p, allow_interactive_login=True)
-                    if result:
-                        status = result.get("status", "success")
-                        if status == "success":
-                            save_platform_data(platform, result)
-                        else:
-                            log(f"[{platform}] 状态: {status}")
-                else:
-                    result = collectors[platform](page, cookie)
-                    if result:
-                        save_platform_data(platform, result)
 
-            except Exception as e:
-                log(f"[{platform}] 采集异常: {e}")
-            finally:
-                context.close()
+# ============================================================
+# 主函数
+# ============================================================
+def run_status(results):
+    """根据各账号的采集结果给出本次运行的状态"""
+    statuses = [(r or {}).get("status", "success") if r else "failed" for r in results.values()]
+    if not statuses:
+        return "empty"
+    if all(st == "success" for st in statuses):
+        return "success"
+    if any(st == "success" for st in statuses):
+        return "partial"
+    return "failed"
+
+
+def main(target_platform=None, concurrency=None, max_pages=None, force_full=False, cdp_endpoint=None,
+         record_dir=None, replay_dir=None, record_har=False, profile_network=0,
+         sync_cookies=True, start_login=True, deadline=None, resume=False, target_account=None):
+    """主函数
+
+    deadline 为整次运行的时间上限（秒），未指定时读取 settings.run_deadline，都没有则不限时。
+    resume 为 True 时从今天中断的运行继续：跳过已完成的账号，未完成的账号从断点继续翻页。
+    target_account 不为空时只采集 target_platform 下该名称的账号。
+    """
+    log("=" * 50)
+    log(f"开始采集{'所有平台' if not target_platform else target_platform}数据")
+    log("=" * 50)
+    started = time.monotonic()
 
-        browser.close()
+    if replay_dir:
+        # 回放写入夹具目录下的独立数据库，不影响正式数据
+        use_db_path(Path(replay_dir) / "replay.db")
+        log(f"回放模式: 夹具 {replay_dir}，数据库 {Path(replay_dir) / 'replay.db'}")
 
-    # 生成前端 JSON
-    save_frontend_json()
+    # 初始化数据库
+    init_db()
+    timer.start("collect_all" if not replay_dir else "collect_all --replay")
+    status = "failed"
 
-    # 推送 GitHub
-    if config.get("settings", {}).get("auto_push_to_github", False):
-        push_to_github()
+    try:
+        if replay_dir:
+            config = load_config() if CONFIG_FILE.exists() else {}
+        else:
+            config = load_config()
+            if not config:
+                return
+
+        cdp_endpoint = cdp_endpoint or config.get("settings", {}).get("cdp_endpoint") or None
+        if replay_dir:
+            cdp_endpoint = None
+        elif cdp_endpoint:
+            log(f"附加到运营者的 Chrome（{cdp_endpoint}），跳过 Cookie 同步")
+        elif sync_cookies:
+            # 同步视频号 Cookie（会写回配置文件，之后重新读取）
+            with timer.stage("sync_browser_cookies"):
+                sync_browser_cookies()
+            config = load_config()
+
+        settings = config.get("settings", {})
+        if concurrency is None:
+            concurrency = safe_int(settings.get("concurrency", DEFAULT_CONCURRENCY)) or DEFAULT_CONCURRENCY
+        deadline = deadline or safe_int(settings.get("run_deadline", 0))
+        run_deadline = Deadline(expires=started + deadline) if deadline else NO_DEADLINE
+        if deadline:
+            log(f"运行截止时间: {deadline}s（{run_deadline}）")
+
+        platforms_to_collect = [target_platform] if target_platform else ["xiaohongshu", "douyin", "shipinhao"]
+
+        results = asyncio.run(collect_platforms(platforms_to_collect, config,
+                                                concurrency=concurrency, max_pages=max_pages,
+                                                force_full=force_full, cdp_endpoint=cdp_endpoint,
+                                                record_dir=record_dir, replay_dir=replay_dir,
+                                                record_har=record_har,
+                                                profile_network=profile_network,
+                                                start_login=start_login,
+                                                run_deadline=run_deadline,
+                                                resume=resume, target_account=target_account))
+        status = run_status(results)
+
+        if not replay_dir:
+            # 生成前端 JSON
+            save_frontend_json()
+
+            # 推送 GitHub
+            if settings.get("auto_push_to_github", False):
+                push_to_github()
+    finally:
+        timer.finish(status)
 
     log("=" * 50)
-    log("采集完成!")
+    log(f"采集完成! 总耗时 {time.monotonic() - started:.1f}s")
     log("=" * 50)
 
 
@@ -650,5 +1649,87 @@ if __name__ == "__main__":
         choices=["douyin", "xiaohongshu", "shipinhao"],
         help="指定采集的平台，不指定则采集所有平台"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help=f"同时采集的账号数量，即上下文池大小（默认读取 settings.concurrency，未配置为 {DEFAULT_CONCURRENCY}）"
+    )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        help=f"每个账号最多翻多少页作品列表（默认读取 settings.max_pages，未配置为 {DEFAULT_MAX_PAGES}）"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="忽略增量水位线，强制全量刷新所有作品"
+    )
+    parser.add_argument(
+        "--cdp-endpoint",
+        help="附加到已登录的 Chrome（如 http://localhost:9222），不启动浏览器、不同步 Cookie"
+    )
+    fixtures = parser.add_mutually_exclusive_group()
+    fixtures.add_argument(
+        "--record",
+        metavar="DIR",
+        help="正常采集，同时把接口响应录制到 DIR/<平台>/<账号>.json"
+    )
+    fixtures.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="从 DIR 中的录制响应离线回放，写入 DIR/replay.db，不生成前端数据、不推送"
+    )
+    parser.add_argument(
+        "--record-har",
+        action="store_true",
+        help="配合 --record，同时保存浏览器页面的 HAR"
+    )
+    parser.add_argument(
+        "--profile-network",
+        type=int,
+        nargs="?",
+        const=DEFAULT_TOP_N,
+        default=0,
+        metavar="N",
+        help=f"记录采集页面每个请求的耗时与大小，写入 logs/network/，并输出各平台前 N 个最重、最慢的资源（默认 {DEFAULT_TOP_N}）"
+    )
+    parser.add_argument(
+        "--deadline",
+        type=int,
+        metavar="SECONDS",
+        help="整次运行的时间上限：各账号按剩余时间分配预算，时间不足时停止翻页，"
+             f"并在截止前 {FINALIZE_RESERVE} 秒结束采集，保存已采集的数据并生成前端数据（默认读取 settings.run_deadline）"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="从今天中断的运行继续：跳过已完成的账号，未完成的账号从记录的翻页游标继续"
+    )
+    parser.add_argument(
+        "--backfill",
+        type=int,
+        choices=BACKFILL_DAYS,
+        metavar="DAYS",
+        help=f"不采集作品，从各平台趋势接口补齐最近 DAYS 天（{' 或 '.join(map(str, BACKFILL_DAYS))}）缺失的每日账号数据"
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="配合 --backfill，用趋势数据覆盖已有的每日快照（默认只补缺失的日期）"
+    )
+    parser.add_argument(
+        "--login-shipinhao",
+        metavar="ACCOUNT",
+        help="打开浏览器等待视频号扫码登录，成功后保存 Cookie 并单独采集视频号（采集时自动在后台启动）"
+    )
     args = parser.parse_args()
-    main(target_platform=args.platform)
+    if args.login_shipinhao:
+        login_main(args.login_shipinhao)
+        sys.exit(0)
+    if args.backfill:
+        backfill_main(args.backfill, target_platform=args.platform, overwrite=args.overwrite)
+        sys.exit(0)
+    main(target_platform=args.platform, concurrency=args.concurrency,
+         max_pages=args.max_pages, force_full=args.full, cdp_endpoint=args.cdp_endpoint,
+         record_dir=args.record, replay_dir=args.replay, record_har=args.record_har,
+         profile_network=args.profile_network, deadline=args.deadline, resume=args.resume)
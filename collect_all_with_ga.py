@@ -6,16 +6,24 @@ import subprocess
 import sys
 import json
 from pathlib import Path
-from datetime import datetime
 
 ROOT_DIR = Path(__file__).parent
 GA_DATA_FILE = ROOT_DIR / "data" / "ga_data.json"
+COMMAND_TIMEOUT = 300  # 秒，子进程超时即被终止
+DEADLINE_MARGIN = 30   # 秒，平台采集的截止时间比超时提前，留给浏览器关闭和进程退出
+
+sys.path.insert(0, str(ROOT_DIR / "data"))
+sys.path.insert(0, str(ROOT_DIR / "collector"))
+from database import init_db
+from timing import timer
+from runlog import get_logger
+
+LOGGER = get_logger("pipeline", ROOT_DIR / "logs" / "pipeline.jsonl")
 
 
 def log(message: str):
-    """带时间戳的日志"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {message}")
+    """带时间戳的日志（写入 logs/pipeline.jsonl，同时输出到终端）"""
+    LOGGER.info(message)
 
 
 def get_ga_data_timestamp() -> str | None:
@@ -30,44 +38,63 @@ def get_ga_data_timestamp() -> str | None:
     return None
 
 
-def run_command(cmd: list, description: str, cwd=None) -> bool:
-    """运行命令并返回是否成功"""
+def run_command(cmd: list, description: str, cwd=None, stage: str = "", timeout: int = COMMAND_TIMEOUT) -> bool:
+    """运行命令并返回是否成功；指定 stage 时记录耗时"""
     log(f"执行: {description}")
-    try:
-        result = subprocess.run(
-            cmd,
-            cwd=cwd or ROOT_DIR,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5分钟超时
-        )
-        if result.returncode != 0:
-            log(f"❌ {description} 失败 (返回码: {result.returncode})")
-            if result.stderr:
-                log(f"   错误: {result.stderr[:500]}")
+    with timer.stage(stage or description) as timed:
+        try:
+            result = subprocess.run(
+                cmd,
+                cwd=cwd or ROOT_DIR,
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
+            if result.returncode != 0:
+                log(f"❌ {description} 失败 (返回码: {result.returncode})")
+                if result.stderr:
+                    log(f"   错误: {result.stderr[:500]}")
+                timed.status = "failed"
+                return False
+            log(f"✅ {description} 成功")
+            return True
+        except subprocess.TimeoutExpired:
+            log(f"❌ {description} 超时")
+            timed.status = "timeout"
+            return False
+        except Exception as e:
+            log(f"❌ {description} 异常: {e}")
+            timed.status = "failed"
             return False
-        log(f"✅ {description} 成功")
-        return True
-    except subprocess.TimeoutExpired:
-        log(f"❌ {description} 超时")
-        return False
-    except Exception as e:
-        log(f"❌ {description} 异常: {e}")
-        return False
 
 
 def main():
+    init_db()
+    timer.start("collect_all_with_ga")
+    status = "failed"
+    try:
+        status = run_all()
+    finally:
+        timer.finish(status)
+    if status != "success":
+        sys.exit(1)
+
+
+def run_all() -> str:
+    """依次运行各采集步骤，返回本次运行的状态"""
     python = sys.executable
     log("=" * 50)
     log("开始数据采集任务")
     log("=" * 50)
 
     # 1. 采集平台数据（抖音、小红书、视频号）
+    # collect_all.py 按截止时间分配各账号的预算，超时前保存已采集的数据并生成前端数据
     log("")
     log("【步骤 1/3】采集平台数据...")
     platform_success = run_command(
-        [python, str(ROOT_DIR / "collect_all.py")],
-        "平台数据采集"
+        [python, str(ROOT_DIR / "collect_all.py"), "--deadline", str(COMMAND_TIMEOUT - DEADLINE_MARGIN)],
+        "平台数据采集",
+        stage="collect_all"
     )
 
     # 2. 采集 Google Analytics 数据
@@ -79,7 +106,8 @@ def main():
 
     ga_success = run_command(
         [python, str(ROOT_DIR / "scripts" / "collect_ga.py")],
-        "GA 数据采集"
+        "GA 数据采集",
+        stage="collect_ga"
     )
 
     # 验证 GA 数据是否真正更新
@@ -104,7 +132,8 @@ def main():
         # 添加文件
         add_success = run_command(
             ["git", "add", "data/ga_data.json", "data/tracker.db"],
-            "Git add"
+            "Git add",
+            stage="git_add"
         )
 
         if add_success:
@@ -117,11 +146,12 @@ def main():
             if diff_result.returncode != 0:  # 有变更
                 commit_success = run_command(
                     ["git", "commit", "-m", f"Auto update GA data ({new_timestamp})"],
-                    "Git commit"
+                    "Git commit",
+                    stage="git_commit"
                 )
 
                 if commit_success:
-                    run_command(["git", "push"], "Git push")
+                    run_command(["git", "push"], "Git push", stage="git_push")
             else:
                 log("没有新的变更需要提交")
     else:
@@ -138,9 +168,9 @@ def main():
     if ga_data_updated:
         log(f"  GA 更新时间: {new_timestamp}")
 
-    # 返回退出码
-    if not platform_success or not ga_data_updated:
-        sys.exit(1)
+    if platform_success and ga_data_updated:
+        return "success"
+    return "partial" if platform_success or ga_data_updated else "failed"
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+"""
+常驻浏览器服务
+
+Playwright Python 没有 launch_server，这里用驱动自带的 `playwright launch-server`
+命令在后台启动 Chromium 服务，采集时通过 websocket connect 复用，省去每次冷启动。
+服务状态记录在 ~/.creator-data-tracker/browser-server.json，
+进程崩溃、连接失败或运行超过 N 小时后自动重启。
+"""
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+STATE_DIR = Path.home() / ".creator-data-tracker"
+STATE_FILE = STATE_DIR / "browser-server.json"
+CONFIG_FILE = STATE_DIR / "browser-server.config.json"
+LOG_FILE = STATE_DIR / "browser-server.log"
+
+DEFAULT_PORT = 9323
+DEFAULT_MAX_AGE_HOURS = 12
+START_TIMEOUT = 30   # 秒
+CONNECT_TIMEOUT = 5000  # 毫秒
+
+
+def read_state():
+    """读取服务状态，不存在时返回 None"""
+    if not STATE_FILE.exists():
+        return None
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except (OSError, TypeError):
+        return False
+
+
+def _age_hours(state):
+    started = datetime.fromisoformat(state["started_at"])
+    return (datetime.now() - started).total_seconds() / 3600
+
+
+def server_status(state=None, max_age_hours=DEFAULT_MAX_AGE_HOURS):
+    """返回 running / expired / dead / absent"""
+    state = state or read_state()
+    if not state:
+        return "absent"
+    if not _pid_alive(state.get("pid")):
+        return "dead"
+    if _age_hours(state) >= max_age_hours:
+        return "expired"
+    return "running"
+
+
+def start_server(port=DEFAULT_PORT, headless=True):
+    """在后台启动浏览器服务，返回状态字典"""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump({"port": port, "headless": headless, "wsPath": "/creator-collector"}, f)
+
+    log_file = open(LOG_FILE, "w", encoding="utf-8")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "playwright", "launch-server",
+         "--browser", "chromium", "--config", str(CONFIG_FILE)],
+        stdout=log_file, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+        start_new_session=True,  # 采集进程退出后服务继续运行
+    )
+    log_file.close()
+
+    # 服务启动后会在输出中打印 websocket 地址
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"浏览器服务启动失败，详见 {LOG_FILE}")
+        ws_endpoint = next((line.strip() for line in LOG_FILE.read_text(encoding="utf-8").splitlines()
+                            if line.startswith("ws://")), None)
+        if ws_endpoint:
+            state = {
+                "pid": process.pid,
+                "ws_endpoint": ws_endpoint,
+                "started_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            with open(STATE_FILE, "w", encoding="utf-8") as f:
+                json.dump(state, f, indent=2)
+            return state
+        time.sleep(0.2)
+
+    stop_server({"pid": process.pid})
+    raise RuntimeError(f"浏览器服务启动超时（{START_TIMEOUT}s）")
+
+
+def stop_server(state=None):
+    """停止浏览器服务并清除状态"""
+    state = state or read_state()
+    if state and _pid_alive(state.get("pid")):
+        try:
+            os.killpg(state["pid"], signal.SIGTERM)
+        except OSError:
+            os.kill(state["pid"], signal.SIGTERM)
+    if STATE_FILE.exists():
+        STATE_FILE.unlink()
+
+
+def ensure_server(port=DEFAULT_PORT, max_age_hours=DEFAULT_MAX_AGE_HOURS, restart=False):
+    """确保有一个可用的服务：进程退出或超过最长运行时间时重启"""
+    state = read_state()
+    status = server_status(state, max_age_hours)
+    if status == "running" and not restart:
+        return state, False
+    if status in ("running", "expired", "dead"):
+        stop_server(state)
+    return start_server(port=port), True
+
+
+async def connect_browser_server(playwright, settings, logger=print):
+    """连接常驻浏览器服务；服务不可用时重启一次，仍失败则返回 None"""
+    port = settings.get("port", DEFAULT_PORT)
+    max_age_hours = settings.get("max_age_hours", DEFAULT_MAX_AGE_HOURS)
+    auto_start = settings.get("auto_start", True)
+
+    for attempt in range(2):
+        if auto_start:
+            try:
+                state, started = await asyncio.to_thread(
+                    ensure_server, port, max_age_hours, attempt > 0)
+            except (OSError, RuntimeError) as e:
+                logger(f"浏览器服务启动失败: {e}")
+                return None
+            if started:
+                logger(f"浏览器服务已启动: {state['ws_endpoint']}")
+        else:
+            state = read_state()
+            if server_status(state, max_age_hours) != "running":
+                return None
+
+        try:
+            started_at = time.monotonic()
+            browser = await playwright.chromium.connect(state["ws_endpoint"], timeout=CONNECT_TIMEOUT)
+            logger(f"已连接浏览器服务（{(time.monotonic() - started_at) * 1000:.0f}ms）")
+            return browser
+        except Exception as e:
+            logger(f"连接浏览器服务失败: {e}")
+            if not auto_start:
+                return None
+    return None
@@ -0,0 +1,239 @@
+"""
+API 响应捕获与等待
+
+各平台在 CAPTURES 中声明需要的接口：精确的域名+路径、资源类型、内容类型和成功条件。
+只有匹配的响应才会读取并解析 body，其余响应直接跳过；
+采集器声明需要哪些数据，全部到达即结束等待，超时时间只作为上限。
+同一个捕获器可以监听多个标签页：每个接口以最先送达的标签页为准（owners），
+其他标签页的同名响应忽略，并行打开的备用页面不会重复计入数据。
+"""
+import asyncio
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+from deadline import NO_DEADLINE
+from http_client import ENDPOINTS, SHIPINHAO_LOGIN_REQUIRED
+from projection import project_works
+from timing import timer
+
+DEFAULT_WAIT_TIMEOUT = 15000  # 毫秒
+DEFAULT_RESOURCE_TYPES = ("xhr", "fetch")
+DEFAULT_CONTENT_TYPES = ("json",)
+
+
+class ApiWaiter:
+    """按名称等待采集器声明的 API 数据"""
+
+    def __init__(self, names, tag="", logger=None, platform="", account="", guard=None, deadline=None):
+        self.tag = tag
+        self.logger = logger
+        self.platform = platform
+        self.account = account
+        self.guard = guard  # session_check.LoginGuard，跳转到登录页时立即结束等待
+        self.deadline = deadline or NO_DEADLINE  # 超时不超过账号剩余的时间预算
+        self._events = {name: asyncio.Event() for name in names}
+        self.timings = []
+
+    def mark(self, name):
+        """响应处理完毕后标记数据已到达"""
+        self._events[name].set()
+
+    def reset(self, name):
+        """重新等待同一个 API（例如滚动加载下一页）"""
+        self._events[name].clear()
+
+    def arrived(self, name):
+        return self._events[name].is_set()
+
+    async def wait(self, names, timeout_ms=DEFAULT_WAIT_TIMEOUT):
+        """等待所有指定数据到达，返回是否全部到达
+
+        页面跳转到登录页时抛出 SessionExpiredError，时间预算已用完时抛出 DeadlineExceeded。
+        """
+        timeout_ms = self.deadline.timeout_ms(timeout_ms)
+        started = time.monotonic()
+        pending = [asyncio.ensure_future(self._events[name].wait()) for name in names]
+        arrived = asyncio.ensure_future(asyncio.wait(pending))
+        watchers = [arrived]
+        if self.guard:
+            watchers.append(asyncio.ensure_future(self.guard.event.wait()))
+        try:
+            await asyncio.wait(watchers, timeout=timeout_ms / 1000, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for future in pending + watchers:
+                future.cancel()
+
+        elapsed = time.monotonic() - started
+        missing = [name for name in names if not self._events[name].is_set()]
+        self.timings.append({"names": list(names), "elapsed": elapsed, "missing": missing})
+        timer.record("capture_wait", elapsed, self.platform, self.account,
+                     status="timeout" if missing else "ok", detail=",".join(names))
+
+        if self.logger:
+            status = f"未到达 {', '.join(missing)}" if missing else "全部到达"
+            self.logger(f"{self.tag} 等待 {', '.join(names)}: {elapsed:.2f}s"
+                        f"（上限 {timeout_ms / 1000:.0f}s，{status}）")
+        if self.guard:
+            self.guard.check()
+        return not missing
+
+
+# ============================================================
+# 各平台需要捕获的接口
+# ============================================================
+def _code_ok(data):
+    return data.get("code") == 0
+
+
+CAPTURES = {
+    "xiaohongshu": {
+        "user": {
+            "url": ENDPOINTS["xiaohongshu"]["user"],
+            "ok": _code_ok,
+            "extract": lambda data: data.get("data", {}),
+        },
+        "overview": {
+            "url": ENDPOINTS["xiaohongshu"]["overview"],
+            "ok": lambda data: _code_ok(data) and bool(data.get("data")),
+            "extract": lambda data: data.get("data", {}),
+        },
+        "notes": {
+            "url": ENDPOINTS["xiaohongshu"]["notes"],
+            "ok": _code_ok,
+            "extract": lambda data: project_works("xiaohongshu", data.get("data", {}).get("note_infos")),
+        },
+    },
+    "douyin": {
+        # 滚动加载的每一页都保留（只保留裁剪后的作品和翻页标记）
+        "works": {
+            "url": ENDPOINTS["douyin"]["works"],
+            "ok": lambda data: data.get("status_code") == 0,
+            "extract": lambda data: {
+                "aweme_list": project_works("douyin", data.get("aweme_list")),
+                "has_more": data.get("has_more"),
+                "max_cursor": data.get("max_cursor"),
+            },
+            "multiple": True,
+        },
+    },
+    "shipinhao": {
+        "auth": {
+            "url": ENDPOINTS["shipinhao"]["auth"],
+            "ok": lambda data: data.get("errCode") == 0,
+            "login_required": lambda data: data.get("errCode") == SHIPINHAO_LOGIN_REQUIRED,
+            "extract": lambda data: data.get("data", {}),
+        },
+        "posts": {
+            "url": ENDPOINTS["shipinhao"]["posts"],
+            "ok": lambda data: data.get("errCode") == 0,
+            "extract": lambda data: project_works("shipinhao", data.get("data", {}).get("list")),
+            "multiple": True,
+        },
+    },
+}
+
+
+def _url_key(url):
+    parsed = urlparse(url)
+    return parsed.hostname or "", parsed.path.rstrip("/")
+
+
+def _page_of(response):
+    try:
+        return response.frame.page
+    except Exception:
+        return None  # Service Worker 等没有所属页面的响应
+
+
+class ResponseCapture(ApiWaiter):
+    """按平台声明捕获接口响应：先按 URL、资源类型和内容类型过滤，再解析 JSON"""
+
+    def __init__(self, platform, tag="", logger=None, recorder=None, account="", guard=None, deadline=None):
+        self.specs = CAPTURES[platform]
+        self.recorder = recorder
+        super().__init__(self.specs.keys(), tag=tag, logger=logger, platform=platform, account=account,
+                         guard=guard, deadline=deadline)
+        self._routes = {_url_key(spec["url"]): name for name, spec in self.specs.items()}
+        self.results = {name: [] if spec.get("multiple") else None for name, spec in self.specs.items()}
+        self.login_required = False
+        self.stats = Counter()
+        self.owners = {}  # 接口名 -> 最先送达该接口数据的页面
+        self._pages = []
+
+    def attach(self, page):
+        """开始监听页面响应（可同时监听同一采集任务的多个标签页）"""
+        self._pages.append(page)
+        page.on("response", self._on_response)
+
+    def detach(self):
+        while self._pages:
+            self._pages.pop().remove_listener("response", self._on_response)
+
+    def _match(self, response):
+        name = self._routes.get(_url_key(response.url))
+        if name is None:
+            return None
+        spec = self.specs[name]
+        if response.request.resource_type not in spec.get("resource_types", DEFAULT_RESOURCE_TYPES):
+            self.stats["skipped"] += 1
+            return None
+        content_type = response.headers.get("content-type", "")
+        if not any(t in content_type for t in spec.get("content_types", DEFAULT_CONTENT_TYPES)):
+            self.stats["skipped"] += 1
+            return None
+        return name
+
+    async def _on_response(self, response):
+        name = self._match(response)
+        if name is None:
+            return
+        spec = self.specs[name]
+        page = _page_of(response)
+        if self.owners.get(name, page) is not page:
+            self.stats["skipped"] += 1  # 另一个标签页已经送达了这个接口
+            return
+        try:
+            data = await response.json()
+        except Exception:
+            # 页面跳转后 body 可能已不可读，或者返回了验证页
+            self.stats["undecodable"] += 1
+            return
+        self.stats["decoded"] += 1
+        if self.owners.get(name, page) is not page:
+            self.stats["skipped"] += 1  # 解析期间另一个标签页先送达
+            return
+        if self.recorder:
+            self.recorder.add("capture", response.request.method, response.url, data)
+
+        if not isinstance(data, dict):
+            self.stats["rejected"] += 1
+            return
+        if spec.get("login_required") and spec["login_required"](data):
+            self.owners.setdefault(name, page)
+            self.login_required = True
+            self.mark(name)
+            return
+        if not spec["ok"](data):
+            self.stats["rejected"] += 1
+            return
+
+        value = spec["extract"](data)
+        self.owners.setdefault(name, page)
+        if spec.get("multiple"):
+            self.results[name].append(value)
+        else:
+            self.results[name] = value
+        self.mark(name)
+
+    def report(self):
+        """返回各接口是否捕获完成，并输出汇总"""
+        completed = {name: self.arrived(name) for name in self.specs}
+        if self.logger:
+            done = [name for name, ok in completed.items() if ok]
+            missing = [name for name, ok in completed.items() if not ok]
+            self.logger(f"{self.tag} 捕获完成: {', '.join(done) or '无'}"
+                        f"{'；未完成: ' + ', '.join(missing) if missing else ''}"
+                        f"（解析 {self.stats['decoded']} 个响应，跳过 {self.stats['skipped']} 个，"
+                        f"无法解析 {self.stats['undecodable']} 个，业务失败 {self.stats['rejected']} 个）")
+        return completed
@@ -0,0 +1,59 @@
+"""
+连接运营者日常使用的 Chrome
+
+Chrome 以 --remote-debugging-port 启动后，通过 connect_over_cdp 附加到它，
+在已登录的默认上下文中打开后台标签页采集，不启动浏览器，也不需要同步或注入 Cookie。
+运营者的上下文和已有标签页不会被关闭或清空。
+"""
+import asyncio
+
+from http_client import PLATFORM_HEADERS
+
+CONNECT_TIMEOUT = 10000  # 毫秒
+
+
+async def connect_cdp(playwright, endpoint, logger=print):
+    """附加到已运行的 Chrome，失败时返回 None"""
+    try:
+        browser = await playwright.chromium.connect_over_cdp(endpoint, timeout=CONNECT_TIMEOUT)
+    except Exception as e:
+        logger(f"无法连接 Chrome（{endpoint}）: {e}")
+        return None
+    if not browser.contexts:
+        logger(f"Chrome（{endpoint}）没有可用的浏览器上下文")
+        return None
+    logger(f"已附加到 Chrome {browser.version}，当前 {len(browser.contexts[0].pages)} 个标签页")
+    return browser
+
+
+async def cookie_header(context, platform):
+    """从运营者的上下文中读取平台 Cookie，拼成请求头格式"""
+    cookies = await context.cookies([PLATFORM_HEADERS[platform]["Origin"]])
+    return "; ".join(f"{c['name']}={c['value']}" for c in cookies)
+
+
+class CdpTabs:
+    """与 ContextPool 接口一致的标签页来源：所有任务共用运营者的默认上下文"""
+
+    def __init__(self, browser, size):
+        self.browser = browser
+        self.context = browser.contexts[0]
+        self._slots = asyncio.Semaphore(max(1, size))
+        self.created = 0
+        self.recycled = 0
+
+    async def acquire(self, owner=None):
+        await self._slots.acquire()
+        return self.context
+
+    async def release(self, context, broken=False):
+        # 不清空 Cookie、不关闭上下文：那是运营者自己的登录态
+        self._slots.release()
+
+    async def new_page(self, context):
+        self.created += 1
+        return await context.new_page()
+
+    async def close(self):
+        """只断开连接，不关闭运营者的浏览器"""
+        self.browser = None
@@ -0,0 +1,111 @@
+"""
+BrowserContext 复用池
+
+在同一个 Chromium 进程内维护有限数量的 BrowserContext，
+多个任务轮流借用；每个上下文打开 N 个页面后回收重建，避免内存持续增长。
+上下文只借给同一个账号（owner）的任务：Cookie 可以清空，但 localStorage / sessionStorage 等
+页面存储无法在归还时清理，换账号时关闭空闲上下文重新创建，避免上一个账号的客户端状态带到下一个账号。
+浏览器在第一次借用上下文时才启动，全部走直连接口的运行不会启动浏览器。
+"""
+import asyncio
+
+from timing import timer
+
+DEFAULT_PAGES_PER_CONTEXT = 20
+
+
+class ContextPool:
+    """有界的 BrowserContext 池"""
+
+    def __init__(self, launch_browser, size, max_pages=DEFAULT_PAGES_PER_CONTEXT, **context_options):
+        self.launch_browser = launch_browser
+        self.browser = None
+        self._launch_lock = asyncio.Lock()
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.context_options = context_options
+        self._slots = asyncio.Semaphore(self.size)
+        self._idle = []
+        self._owners = {}
+        self._page_counts = {}
+        self._closed = set()
+        self.created = 0
+        self.recycled = 0
+
+    async def _get_browser(self):
+        async with self._launch_lock:
+            if self.browser is None:
+                self.browser = await self.launch_browser()
+            return self.browser
+
+    async def _new_context(self, owner):
+        browser = await self._get_browser()
+        with timer.stage("context_create"):
+            context = await browser.new_context(**self.context_options)
+        context.on("close", lambda ctx: self._closed.add(id(ctx)))
+        self._page_counts[id(context)] = 0
+        self._owners[id(context)] = owner
+        self.created += 1
+        return context
+
+    async def acquire(self, owner=None):
+        """借出一个 owner 用过的空闲上下文，没有时新建；池满时等待"""
+        await self._slots.acquire()
+        try:
+            for context in list(reversed(self._idle)):
+                if id(context) in self._closed:
+                    self._idle.remove(context)
+                    self._forget(context)
+                elif self._owners.get(id(context)) == owner:
+                    self._idle.remove(context)
+                    return context
+            if self._idle and len(self._page_counts) >= self.size:
+                # 空闲上下文都属于其他账号：关闭最久未用的一个，保持上下文总数不超过 size
+                await self._discard(self._idle.pop(0))
+            return await self._new_context(owner)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, context, broken=False):
+        """归还上下文；已关闭、出错或达到页面上限的上下文直接回收"""
+        try:
+            if id(context) in self._closed:
+                self._forget(context)
+                return
+            if broken or self._page_counts.get(id(context), 0) >= self.max_pages:
+                await self._discard(context)
+                return
+            # 下次借用时重新注入或加载 Cookie，归还前清空
+            await context.clear_cookies()
+            self._idle.append(context)
+        except Exception:
+            await self._discard(context)
+        finally:
+            self._slots.release()
+
+    async def new_page(self, context):
+        """在上下文中打开页面并计数"""
+        self._page_counts[id(context)] = self._page_counts.get(id(context), 0) + 1
+        return await context.new_page()
+
+    async def close(self):
+        """关闭池中所有空闲上下文以及浏览器"""
+        while self._idle:
+            await self._discard(self._idle.pop())
+        if self.browser is not None:
+            await self.browser.close()
+            self.browser = None
+
+    async def _discard(self, context):
+        self._forget(context)
+        self.recycled += 1
+        try:
+            await context.close()
+        except Exception:
+            pass  # 上下文可能已随浏览器一起关闭
+
+    def _forget(self, context):
+        self._page_counts.pop(id(context), None)
+        self._owners.pop(id(context), None)
+        self._closed.discard(id(context))
@@ -0,0 +1,81 @@
+"""
+运行截止时间
+
+整次运行有一个截止时间（--deadline 或 settings.run_deadline，秒）：
+- 采集阶段在截止前 FINALIZE_RESERVE 秒结束，留出生成前端数据和推送的时间；
+- 每个账号在采集窗口内分到一份预算（按并发数分批平摊），从拿到浏览器上下文时开始计时；
+- goto、接口等待和直连请求的超时取"请求的超时"和"剩余预算"中较小的一个，预算用完抛出 DeadlineExceeded；
+- 翻页等可选步骤在剩余时间不足 OPTIONAL_RESERVE 秒时停止，已采集的数据照常保存；
+- 采集窗口结束 CANCEL_GRACE 秒后仍未结束的任务被取消，已完成账号的结果照常生成前端数据。
+
+未设置截止时间时 Deadline 不做任何限制。
+"""
+import math
+import time
+
+FINALIZE_RESERVE = 20   # 秒，留给 save_frontend_json 和 git push
+OPTIONAL_RESERVE = 10   # 秒，剩余时间少于此值时跳过翻页等可选步骤
+CANCEL_GRACE = 5        # 秒，采集窗口结束后等待任务收尾，之后取消仍未结束的任务
+MIN_TIMEOUT_MS = 1000
+
+
+class DeadlineExceeded(Exception):
+    """预算已用完"""
+
+
+class Deadline:
+    """一个截止时间点；expires 为 None 表示不限时"""
+
+    def __init__(self, seconds=None, expires=None):
+        if expires is None and seconds:
+            expires = time.monotonic() + seconds
+        self.expires = expires
+
+    @property
+    def limited(self):
+        return self.expires is not None
+
+    def remaining(self):
+        """剩余秒数，不限时为 inf"""
+        if self.expires is None:
+            return math.inf
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self, reserve=0):
+        return self.remaining() <= reserve
+
+    def child(self, seconds=None, reserve=0):
+        """在本截止时间内再划出一段预算（提前 reserve 秒结束，最多 seconds 秒）"""
+        if self.expires is None:
+            return Deadline(seconds)
+        expires = self.expires - reserve
+        if seconds:
+            expires = min(expires, time.monotonic() + seconds)
+        return Deadline(expires=expires)
+
+    def timeout_ms(self, requested_ms):
+        """把请求的超时裁剪到剩余预算内；预算已用完时抛出 DeadlineExceeded"""
+        if self.expires is None:
+            return requested_ms
+        remaining_ms = self.remaining() * 1000
+        if remaining_ms < MIN_TIMEOUT_MS:
+            raise DeadlineExceeded("运行时间预算已用完")
+        return min(requested_ms, remaining_ms)
+
+    def timeout_s(self, requested_s):
+        """同 timeout_ms，单位为秒（requests 的 timeout 参数）"""
+        return self.timeout_ms(requested_s * 1000) / 1000
+
+    def __str__(self):
+        return "不限时" if self.expires is None else f"剩余 {self.remaining():.0f}s"
+
+
+NO_DEADLINE = Deadline()
+
+
+def job_budget(window, jobs, concurrency):
+    """采集窗口内每个账号的预算：按并发数分批，每批平摊窗口时间"""
+    if not math.isfinite(window):
+        return None
+    waves = max(1, math.ceil(jobs / max(1, concurrency)))
+    return window / waves
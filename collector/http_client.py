@@ -0,0 +1,156 @@
+"""
+直连 HTTP 采集
+
+用带连接池的 requests.Session 直接调用创作者中心接口，返回与浏览器抓包相同结构的数据；
+作品列表的翻页见 pagination.py。
+遇到签名校验、风控或登录失效时抛出 ApiBlockedError，由调用方回退到浏览器采集。
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from deadline import NO_DEADLINE
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+REQUEST_TIMEOUT = 15  # 秒
+DEFAULT_POOL_SIZE = 8
+
+PLATFORM_HEADERS = {
+    "douyin": {
+        "Referer": "https://creator.douyin.com/creator-micro/content/manage",
+        "Origin": "https://creator.douyin.com",
+    },
+    "xiaohongshu": {
+        "Referer": "https://creator.xiaohongshu.com/statistics/data-analysis",
+        "Origin": "https://creator.xiaohongshu.com",
+    },
+    "shipinhao": {
+        "Referer": "https://channels.weixin.qq.com/platform/post/list",
+        "Origin": "https://channels.weixin.qq.com",
+        "Content-Type": "application/json",
+    },
+}
+
+ENDPOINTS = {
+    "douyin": {
+        "user": "https://creator.douyin.com/web/api/media/user/info/",
+        "works": "https://creator.douyin.com/janus/douyin/creator/pc/work_list",
+        "work_detail": "https://creator.douyin.com/janus/douyin/creator/data/item_analysis/item_overview",
+        "trend": "https://creator.douyin.com/janus/douyin/creator/data/overview/trend",
+    },
+    "xiaohongshu": {
+        "user": "https://creator.xiaohongshu.com/api/galaxy/user/info",
+        "overview": "https://creator.xiaohongshu.com/api/galaxy/creator/data/fans/overall",
+        "notes": "https://creator.xiaohongshu.com/api/galaxy/creator/datacenter/note/analyze/list",
+        "work_detail": "https://creator.xiaohongshu.com/api/galaxy/creator/datacenter/note/base",
+    },
+    "shipinhao": {
+        "auth": "https://channels.weixin.qq.com/cgi-bin/mmfinderassistant-bin/auth/auth_data",
+        "posts": "https://channels.weixin.qq.com/cgi-bin/mmfinderassistant-bin/post/post_list",
+        "work_detail": "https://channels.weixin.qq.com/cgi-bin/mmfinderassistant-bin/statistic/post_data",
+        "trend": "https://channels.weixin.qq.com/cgi-bin/mmfinderassistant-bin/statistic/new_fans_trend",
+    },
+}
+
+# 这些状态码通常意味着签名校验失败或触发风控
+BLOCKED_STATUS_CODES = {403, 406, 412, 429, 461, 471}
+
+# 视频号登录失效
+SHIPINHAO_LOGIN_REQUIRED = 300334
+
+
+class ApiBlockedError(Exception):
+    """接口被签名校验、风控或登录失效拦截，需要回退到浏览器采集"""
+
+
+class SessionPool:
+    """按 (平台, Cookie) 复用 requests.Session，保持长连接"""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE):
+        self.pool_size = pool_size
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, platform, cookie):
+        key = (platform, cookie)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.headers.update({
+                    "User-Agent": USER_AGENT,
+                    "Cookie": cookie,
+                    "Accept": "application/json, text/plain, */*",
+                    **PLATFORM_HEADERS.get(platform, {}),
+                })
+                self._sessions[key] = session
+            return session
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+SESSION_POOL = SessionPool()
+
+
+def request_json(session, method, url, ok, deadline=NO_DEADLINE, **kwargs):
+    """请求接口并校验业务状态，失败时抛出 ApiBlockedError
+
+    超时不超过 deadline 的剩余预算，预算已用完时抛出 DeadlineExceeded。
+    """
+    try:
+        resp = session.request(method, url, timeout=deadline.timeout_s(REQUEST_TIMEOUT), **kwargs)
+    except requests.RequestException as e:
+        raise ApiBlockedError(f"请求失败: {e}") from e
+
+    if resp.status_code in BLOCKED_STATUS_CODES or resp.status_code >= 400:
+        raise ApiBlockedError(f"HTTP {resp.status_code}: {url}")
+    try:
+        data = resp.json()
+    except ValueError:
+        raise ApiBlockedError(f"非 JSON 响应（可能是验证页）: {url}")
+    if not isinstance(data, dict) or not ok(data):
+        raise ApiBlockedError(f"接口返回异常: {str(data)[:200]}")
+    return data
+
+
+def shipinhao_ok(data):
+    if data.get("errCode") == SHIPINHAO_LOGIN_REQUIRED:
+        raise ApiBlockedError("视频号需要登录")
+    return data.get("errCode") == 0
+
+
+def fetch_douyin(session, deadline=NO_DEADLINE):
+    """抖音：用户信息（作品列表见 pagination.iter_pages）"""
+    user = request_json(session, "GET", ENDPOINTS["douyin"]["user"],
+                        lambda data: data.get("status_code") == 0, deadline)
+    return {"user": user.get("user")}
+
+
+def fetch_xiaohongshu(session, deadline=NO_DEADLINE):
+    """小红书：用户信息 + 粉丝总览"""
+    urls = ENDPOINTS["xiaohongshu"]
+    ok = lambda data: data.get("code") == 0
+
+    user = request_json(session, "GET", urls["user"], ok, deadline)
+    overview = request_json(session, "GET", urls["overview"], ok, deadline)
+    return {"user": user.get("data", {}), "overview": overview.get("data", {})}
+
+
+def fetch_shipinhao(session, deadline=NO_DEADLINE):
+    """视频号：账号信息"""
+    auth = request_json(session, "POST", ENDPOINTS["shipinhao"]["auth"], shipinhao_ok, deadline, json={})
+    return {"auth": auth.get("data", {})}
+
+
+FETCHERS = {
+    "douyin": fetch_douyin,
+    "xiaohongshu": fetch_xiaohongshu,
+    "shipinhao": fetch_shipinhao,
+}
@@ -0,0 +1,72 @@
+"""
+视频号扫码登录（独立进程）
+
+采集时发现视频号需要登录，不再在本次运行中弹窗等待扫码，而是：
+1. 本次运行记录 pending_login 并继续，前端数据生成和推送照常进行；
+2. 另起一个脱离父进程的 `collect_all.py --login-shipinhao <账号>` 打开有界面的浏览器等待扫码，
+   扫码成功后保存 Cookie，再单独采集一次视频号。
+
+锁文件保证同一账号同一时间只有一个登录窗口；锁文件超过 LOCK_TTL 视为残留（登录进程异常退出）。
+子进程的输出丢弃（日志写入 logs/collect.jsonl），避免父进程的 capture_output 等待它结束。
+"""
+import os
+import subprocess
+import sys
+import time
+
+from timing import RUN_ID_ENV
+
+LOGIN_TIMEOUT = 600  # 秒，等待扫码的上限
+LOCK_TTL = LOGIN_TIMEOUT + 60
+
+
+def lock_path(lock_dir, account_key):
+    return lock_dir / f"shipinhao_login.{account_key.replace('/', '_')}.lock"
+
+
+def is_running(lock_dir, account_key):
+    """该账号是否已有登录进程在等待扫码"""
+    path = lock_path(lock_dir, account_key)
+    try:
+        return time.time() - path.stat().st_mtime < LOCK_TTL
+    except FileNotFoundError:
+        return False
+
+
+def acquire(lock_dir, account_key):
+    """登录进程启动时写入锁文件"""
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    lock_path(lock_dir, account_key).write_text(str(os.getpid()), encoding="utf-8")
+
+
+def release(lock_dir, account_key):
+    try:
+        lock_path(lock_dir, account_key).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def spawn(script, account_key, lock_dir, logger=print):
+    """启动独立的扫码登录进程，已有进程在等待时不重复启动；返回是否启动"""
+    if is_running(lock_dir, account_key):
+        logger(f"[视频号] 账号 {account_key} 已有扫码登录窗口在等待")
+        return False
+
+    acquire(lock_dir, account_key)  # 子进程启动前先占住，避免并发任务重复启动
+    env = dict(os.environ)
+    env.pop(RUN_ID_ENV, None)  # 登录后的补采是一次独立的运行
+    kwargs = {"start_new_session": True} if os.name == "posix" else {
+        "creationflags": subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS}
+    try:
+        subprocess.Popen(
+            [sys.executable, str(script), "--login-shipinhao", account_key],
+            cwd=str(script.parent), env=env,
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            **kwargs,
+        )
+    except OSError as e:
+        release(lock_dir, account_key)
+        logger(f"[视频号] 无法启动扫码登录进程: {e}")
+        return False
+    logger(f"[视频号] 已在独立进程中打开扫码登录窗口（最长等待 {LOGIN_TIMEOUT // 60} 分钟），本次运行继续")
+    return True
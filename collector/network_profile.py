@@ -0,0 +1,148 @@
+"""
+采集页面的网络瀑布记录（--profile-network）
+
+记录采集页面发出的每个请求：URL、资源类型、状态码、Playwright request.timing 的各阶段耗时和传输字节数。
+每次运行写一个 JSON Lines 文件（logs/network/<时间>_<run_id>.jsonl），每行一个请求，字段用短名以保持紧凑；
+运行结束时按平台输出最重（字节数）和最慢（总耗时）的前 N 个资源，以及各资源类型的汇总。
+
+timing 各字段是相对 startTime 的毫秒数，不可用时为 -1（如复用连接时没有 DNS / 建连阶段）。
+"""
+import json
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_TOP_N = 10
+
+# 被 ResourcePolicy / 回放路由中止的请求，只计数不计时
+BLOCKED_FAILURE = "net::ERR_BLOCKED_BY_CLIENT"
+
+
+def _phase(timing, start, end):
+    """两个时间点之间的耗时（毫秒），任一端不可用时返回 -1"""
+    a, b = timing.get(start, -1), timing.get(end, -1)
+    if a < 0 or b < 0:
+        return -1
+    return round(b - a, 1)
+
+
+def _short_url(url, width=90):
+    return url if len(url) <= width else url[:width - 3] + "..."
+
+
+class NetworkProfiler:
+    """记录单个账号采集页面的全部请求"""
+
+    def __init__(self, platform, account=""):
+        self.platform = platform
+        self.account = account
+        self.entries = []
+        self.blocked = 0
+
+    def attach(self, page):
+        page.on("requestfinished", self._on_finished)
+        page.on("requestfailed", self._on_failed)
+
+    def _entry(self, request):
+        timing = request.timing or {}
+        return {
+            "p": self.platform,
+            "a": self.account,
+            "url": request.url,
+            "type": request.resource_type,
+            "method": request.method,
+            "start": round(timing.get("startTime", 0)),
+            "dns": _phase(timing, "domainLookupStart", "domainLookupEnd"),
+            "connect": _phase(timing, "connectStart", "connectEnd"),
+            "tls": _phase(timing, "secureConnectionStart", "connectEnd"),
+            "wait": _phase(timing, "requestStart", "responseStart"),
+            "download": _phase(timing, "responseStart", "responseEnd"),
+            "total": round(timing.get("responseEnd", -1), 1),
+        }
+
+    async def _on_finished(self, request):
+        entry = self._entry(request)
+        try:
+            sizes = await request.sizes()
+            response = await request.response()
+        except Exception:
+            return  # 页面关闭时请求可能已不可访问
+        entry["status"] = response.status if response else 0
+        entry["bytes"] = sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        if request.redirected_from:
+            entry["redirect_from"] = request.redirected_from.url
+        self.entries.append(entry)
+
+    def _on_failed(self, request):
+        failure = request.failure or ""
+        if failure == BLOCKED_FAILURE:
+            self.blocked += 1
+            return
+        entry = self._entry(request)
+        entry.update(status=0, bytes=0, failure=failure)
+        self.entries.append(entry)
+
+
+# ============================================================
+# 输出
+# ============================================================
+def write_profile(profilers, directory, run_id=None):
+    """把所有账号的记录写入一个 JSON Lines 文件，返回文件路径"""
+    entries = [entry for profiler in profilers for entry in profiler.entries]
+    if not entries:
+        return None
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = directory / (f"{name}_{run_id}.jsonl" if run_id else f"{name}.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+    return path
+
+
+def summarize(profilers, top_n=DEFAULT_TOP_N):
+    """按平台汇总，返回 {平台: {requests, bytes, blocked, failed, by_type, heaviest, slowest}}"""
+    grouped = defaultdict(list)
+    blocked = defaultdict(int)
+    for profiler in profilers:
+        grouped[profiler.platform].extend(profiler.entries)
+        blocked[profiler.platform] += profiler.blocked
+
+    summary = {}
+    for platform, entries in grouped.items():
+        by_type = defaultdict(lambda: {"count": 0, "bytes": 0, "time": 0.0})
+        for entry in entries:
+            stats = by_type[entry["type"]]
+            stats["count"] += 1
+            stats["bytes"] += entry["bytes"]
+            stats["time"] += max(entry["total"], 0)
+        summary[platform] = {
+            "requests": len(entries),
+            "bytes": sum(entry["bytes"] for entry in entries),
+            "blocked": blocked[platform],
+            "failed": sum(1 for entry in entries if entry.get("failure")),
+            "by_type": dict(by_type),
+            "heaviest": sorted(entries, key=lambda e: e["bytes"], reverse=True)[:top_n],
+            "slowest": sorted(entries, key=lambda e: e["total"], reverse=True)[:top_n],
+        }
+    return summary
+
+
+def format_summary(summary):
+    """把汇总格式化为日志行"""
+    lines = []
+    for platform, stats in summary.items():
+        lines.append(f"[{platform}] 网络: {stats['requests']} 个请求 / {stats['bytes'] / 1024:.0f} KB，"
+                     f"失败 {stats['failed']}，拦截 {stats['blocked']}")
+        for resource_type, t in sorted(stats["by_type"].items(), key=lambda kv: -kv[1]["bytes"]):
+            lines.append(f"  {resource_type:<10} {t['count']:>4} 个 {t['bytes'] / 1024:>9.0f} KB "
+                         f"{t['time']:>9.0f} ms")
+        lines.append("  最重:")
+        for e in stats["heaviest"]:
+            lines.append(f"    {e['bytes'] / 1024:>8.0f} KB  {e['type']:<10} {_short_url(e['url'])}")
+        lines.append("  最慢:")
+        for e in stats["slowest"]:
+            lines.append(f"    {e['total']:>8.0f} ms  等待 {e['wait']:>6.0f} 下载 {e['download']:>6.0f}  "
+                         f"{e['type']:<10} {_short_url(e['url'])}")
+    return lines
@@ -0,0 +1,121 @@
+"""
+作品列表分页
+
+每个平台声明作品列表接口的翻页方式（游标、页码），
+同一份声明既用于 requests 直连，也用于浏览器上下文里的 page.request。
+"""
+from deadline import NO_DEADLINE
+from http_client import ENDPOINTS, REQUEST_TIMEOUT, ApiBlockedError, request_json, shipinhao_ok
+from projection import project_works
+
+DEFAULT_MAX_PAGES = 50
+
+
+def _read_douyin(data, cursor, page_size):
+    items = data.get("aweme_list") or []
+    return items, data.get("max_cursor", 0), bool(data.get("has_more")) and bool(items)
+
+
+def _read_xiaohongshu(data, cursor, page_size):
+    payload = data.get("data") or {}
+    items = payload.get("note_infos") or []
+    total = payload.get("total")
+    if total is not None:
+        has_more = cursor * page_size < int(total)
+    else:
+        has_more = len(items) >= page_size
+    return items, cursor + 1, has_more and bool(items)
+
+
+def _read_shipinhao(data, cursor, page_size):
+    payload = data.get("data") or {}
+    items = payload.get("list") or []
+    total = payload.get("totalCount")
+    if total is not None:
+        has_more = (cursor + 1) * page_size < int(total)
+    else:
+        has_more = len(items) >= page_size
+    return items, cursor + 1, has_more and bool(items)
+
+
+PAGINATION = {
+    "douyin": {
+        "method": "GET",
+        "url": ENDPOINTS["douyin"]["works"],
+        "first_cursor": 0,
+        "page_size": 12,
+        "request": lambda cursor, size: {"params": {
+            "status": 0, "count": size, "max_cursor": cursor, "scene": "star_atlas",
+            "device_platform": "android", "aid": 1128,
+        }},
+        "ok": lambda data: data.get("status_code") == 0,
+        "read": _read_douyin,
+    },
+    "xiaohongshu": {
+        "method": "GET",
+        "url": ENDPOINTS["xiaohongshu"]["notes"],
+        "first_cursor": 1,
+        "page_size": 10,
+        "request": lambda cursor, size: {"params": {"type": 0, "page_size": size, "page_num": cursor}},
+        "ok": lambda data: data.get("code") == 0,
+        "read": _read_xiaohongshu,
+    },
+    "shipinhao": {
+        "method": "POST",
+        "url": ENDPOINTS["shipinhao"]["posts"],
+        "first_cursor": 0,
+        "page_size": 20,
+        "request": lambda cursor, size: {"json": {"pageIndex": cursor, "pageSize": size, "status": 0}},
+        "ok": shipinhao_ok,
+        "read": _read_shipinhao,
+    },
+}
+
+
+def read_page(platform, data, cursor):
+    """解析一页响应，返回 (裁剪后的作品列表, 下一页游标, 是否还有下一页)"""
+    spec = PAGINATION[platform]
+    items, cursor, has_more = spec["read"](data, cursor, spec["page_size"])
+    return project_works(platform, items), cursor, has_more
+
+
+def iter_pages(session, platform, max_pages=DEFAULT_MAX_PAGES, cursor=None, deadline=NO_DEADLINE):
+    """requests 直连逐页获取作品，产出 (作品列表, 下一页游标, 是否还有下一页)；每个请求的超时不超过 deadline 的剩余预算"""
+    spec = PAGINATION[platform]
+    cursor = spec["first_cursor"] if cursor is None else cursor
+
+    for _ in range(max_pages):
+        data = request_json(session, spec["method"], spec["url"], spec["ok"], deadline,
+                            **spec["request"](cursor, spec["page_size"]))
+        items, cursor, has_more = read_page(platform, data, cursor)
+        yield items, cursor, has_more
+        if not has_more:
+            return
+
+
+async def iter_pages_async(request_context, platform, max_pages=DEFAULT_MAX_PAGES, cursor=None,
+                           deadline=NO_DEADLINE):
+    """通过浏览器上下文的 APIRequestContext 逐页获取（共用页面 Cookie），产出和超时同 iter_pages"""
+    spec = PAGINATION[platform]
+    cursor = spec["first_cursor"] if cursor is None else cursor
+
+    for _ in range(max_pages):
+        kwargs = spec["request"](cursor, spec["page_size"])
+        resp = await request_context.fetch(
+            spec["url"], method=spec["method"],
+            params=kwargs.get("params"), data=kwargs.get("json"),
+            timeout=deadline.timeout_ms(REQUEST_TIMEOUT * 1000),
+        )
+        if not resp.ok:
+            raise ApiBlockedError(f"HTTP {resp.status}: {spec['url']}")
+        try:
+            data = await resp.json()
+        except ValueError:
+            raise ApiBlockedError(f"非 JSON 响应（可能是验证页）: {spec['url']}")
+        if not spec["ok"](data):
+            raise ApiBlockedError(f"接口返回异常: {str(data)[:200]}")
+
+        items, cursor, has_more = read_page(platform, data, cursor)
+        yield items, cursor, has_more
+        if not has_more:
+            return
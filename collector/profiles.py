@@ -0,0 +1,186 @@
+"""
+浏览器登录态持久化
+
+两种模式（config.json 中 settings.profiles.mode）：
+- persistent：每个平台/账号使用独立的 launch_persistent_context 目录，
+  Cookie、localStorage 和磁盘 HTTP 缓存都跨运行保留，重复采集不必重新下载前端资源包；
+- storage_state：上下文仍来自上下文池，采集后保存 storage_state 快照，下次直接加载其中的 Cookie。
+
+配置中的 Cookie 没有变化时跳过注入，沿用 profile 里平台刷新过的登录态；
+persistent 模式下可以先用 scripts/login_xiaohongshu.py 扫码登录一次，之后不配置 Cookie 也能采集。
+"""
+import asyncio
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+
+PROFILE_ROOT = Path.home() / ".creator-data-tracker" / "browser-data"
+STATE_ROOT = PROFILE_ROOT / "states"
+META_FILE = ".collector.json"
+LOGIN_FLAG_FILE = ".logged_in"  # scripts/login_xiaohongshu.py 扫码登录成功后写入
+
+DEFAULT_MAX_PROFILE_MB = 300
+DEFAULT_STALE_DAYS = 30
+
+# 超出大小上限时优先清理的缓存目录（不影响登录态）
+CACHE_DIRS = (
+    "Default/Cache", "Default/Code Cache", "Default/GPUCache",
+    "Default/Service Worker/CacheStorage", "GrShaderCache", "ShaderCache",
+)
+
+
+def _profile_name(platform, account_key):
+    # 默认账号与 scripts/login_xiaohongshu.py 使用同一个目录，扫码登录后可直接复用
+    return platform if account_key == "default" else f"{platform}@{account_key}"
+
+
+def cookie_fingerprint(cookie):
+    return hashlib.sha256(cookie.encode("utf-8")).hexdigest()[:16]
+
+
+def dir_size_mb(path):
+    total = 0
+    for f in Path(path).rglob("*"):
+        try:
+            if f.is_file() and not f.is_symlink():
+                total += f.stat().st_size
+        except OSError:
+            pass
+    return total / 1024 / 1024
+
+
+class ProfileStore:
+    """管理各账号的持久化 profile 或 storage_state 快照"""
+
+    def __init__(self, settings, size=1, user_agent=None, logger=print):
+        self.mode = settings.get("mode", "off")
+        self.max_mb = settings.get("max_profile_mb", DEFAULT_MAX_PROFILE_MB)
+        self.stale_days = settings.get("stale_days", DEFAULT_STALE_DAYS)
+        self.user_agent = user_agent
+        self.logger = logger
+        self._slots = asyncio.Semaphore(max(1, size))
+
+    @property
+    def enabled(self):
+        return self.mode in ("persistent", "storage_state")
+
+    def profile_dir(self, job):
+        return PROFILE_ROOT / _profile_name(job["platform"], job["account_key"])
+
+    def state_file(self, job):
+        return STATE_ROOT / f"{_profile_name(job['platform'], job['account_key'])}.json"
+
+    def _meta_path(self, job):
+        if self.mode == "persistent":
+            return self.profile_dir(job) / META_FILE
+        return self.state_file(job).with_suffix(".meta.json")
+
+    def needs_cookie_injection(self, job):
+        """profile 中已有同一份配置 Cookie 的登录态时返回 False
+
+        persistent 模式下，没有元数据但有登录脚本写入的扫码标记时视为已登录；
+        只有目录没有标记（open_persistent 刚创建、或上次采集失败留下的）仍需注入。
+        没有配置 Cookie 的账号只能使用 profile 里的登录态。
+        """
+        if not job["cookie"]:
+            return False
+        meta_path = self._meta_path(job)
+        if not meta_path.exists():
+            return not (self.mode == "persistent" and (self.profile_dir(job) / LOGIN_FLAG_FILE).exists())
+        if self.mode == "storage_state" and not self.state_file(job).exists():
+            return True
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return True
+        return meta.get("cookie") != cookie_fingerprint(job["cookie"])
+
+    def _write_meta(self, job):
+        meta_path = self._meta_path(job)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"cookie": cookie_fingerprint(job["cookie"]), "saved_at": time.time()}, f)
+
+    # ---------- persistent ----------
+
+    async def open_persistent(self, playwright, job):
+        """启动账号专属的持久化上下文（占用一个并发名额）"""
+        await self._slots.acquire()
+        try:
+            profile_dir = self.profile_dir(job)
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            return await playwright.chromium.launch_persistent_context(
+                str(profile_dir),
+                headless=True,
+                user_agent=self.user_agent,
+                args=[f"--disk-cache-size={int(self.max_mb * 1024 * 1024 * 0.8)}"],
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def close_persistent(self, context, job, success=True):
+        try:
+            await context.close()
+            if success:
+                self._write_meta(job)
+            # 遍历和清理整个 profile 目录是阻塞的磁盘操作，放到线程中，不阻塞其他账号的采集
+            await asyncio.to_thread(self.enforce_size_cap, self.profile_dir(job))
+        finally:
+            self._slots.release()
+
+    # ---------- storage_state ----------
+
+    async def load_state(self, context, job):
+        """把快照中的 Cookie 加载到上下文，返回是否加载成功"""
+        try:
+            with open(self.state_file(job), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        await context.add_cookies(state.get("cookies", []))
+        return True
+
+    async def save_state(self, context, job):
+        self.state_file(job).parent.mkdir(parents=True, exist_ok=True)
+        try:
+            await context.storage_state(path=str(self.state_file(job)))
+        except Exception as e:
+            # 视频号弹窗登录后原上下文已关闭，下次按配置中的新 Cookie 注入
+            self.logger(f"[{job['platform']}] 保存 storage_state 失败: {e}")
+            return
+        self._write_meta(job)
+
+    # ---------- 清理 ----------
+
+    def enforce_size_cap(self, profile_dir):
+        """profile 超过大小上限时清理缓存目录"""
+        size = dir_size_mb(profile_dir)
+        if size <= self.max_mb:
+            return
+        for name in CACHE_DIRS:
+            shutil.rmtree(Path(profile_dir) / name, ignore_errors=True)
+        self.logger(f"profile {Path(profile_dir).name} 占用 {size:.0f} MB，已清理缓存，"
+                    f"现为 {dir_size_mb(profile_dir):.0f} MB")
+
+    def cleanup_stale(self, active_jobs=()):
+        """删除长期未使用的 profile 和快照（只清理采集器创建的）"""
+        if not PROFILE_ROOT.exists():
+            return
+        active = {_profile_name(job["platform"], job["account_key"]) for job in active_jobs}
+        cutoff = time.time() - self.stale_days * 86400
+
+        for meta_path in list(PROFILE_ROOT.glob(f"*/{META_FILE}")) + list(STATE_ROOT.glob("*.meta.json")):
+            is_state = meta_path.parent == STATE_ROOT
+            name = meta_path.name[:-len(".meta.json")] if is_state else meta_path.parent.name
+            if name in active or meta_path.stat().st_mtime > cutoff:
+                continue
+            if is_state:
+                (STATE_ROOT / f"{name}.json").unlink(missing_ok=True)
+                meta_path.unlink(missing_ok=True)
+            else:
+                shutil.rmtree(meta_path.parent, ignore_errors=True)
+            self.logger(f"已清理 {self.stale_days} 天未使用的 profile: {name}")
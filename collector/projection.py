@@ -0,0 +1,74 @@
+"""
+接口数据字段裁剪
+
+作品列表接口返回的对象包含作者详情、音乐、视频地址列表等大量用不到的字段，
+抓包和翻页时立即裁剪为解析器实际读取的字段，避免整页原始 JSON 在内存中堆积。
+"""
+
+# 字段声明：True 表示原样保留，dict 表示继续裁剪子对象（列表逐项裁剪）
+DOUYIN_AUTHOR_FIELDS = {
+    "nickname": True,
+    "uid": True,
+    "unique_id": True,
+    "follower_count": True,
+    "mplatform_followers_count": True,
+    "avatar_thumb": {"url_list": True},
+    "avatar_medium": {"url_list": True},
+    "avatar_larger": {"url_list": True},
+}
+
+WORK_FIELDS = {
+    "douyin": {
+        "aweme_id": True,
+        "desc": True,
+        "create_time": True,
+        "cover": {"url_list": True},
+        "statistics": {
+            "play_count": True, "digg_count": True, "comment_count": True,
+            "share_count": True, "collect_count": True,
+        },
+        # 没有用户信息接口时，账号信息取自作品作者
+        "author": DOUYIN_AUTHOR_FIELDS,
+    },
+    "xiaohongshu": {
+        "id": True,
+        "title": True,
+        "post_time": True,
+        "cover_url": True,
+        "read_count": True,
+        "like_count": True,
+        "comment_count": True,
+        "share_count": True,
+        "fav_count": True,
+    },
+    "shipinhao": {
+        "objectId": True,
+        "title": True,
+        "desc": True,
+        "createTime": True,
+        "coverUrl": True,
+        "readCount": True,
+        "likeCount": True,
+        "commentCount": True,
+        "forwardCount": True,
+        "favCount": True,
+    },
+}
+
+
+def project(value, fields):
+    """按字段声明裁剪对象"""
+    if isinstance(value, list):
+        return [project(item, fields) for item in value]
+    if not isinstance(value, dict):
+        return value
+    projected = {}
+    for key, sub_fields in fields.items():
+        if key in value:
+            projected[key] = value[key] if sub_fields is True else project(value[key], sub_fields)
+    return projected
+
+
+def project_works(platform, items):
+    """裁剪一页作品"""
+    return [project(item, WORK_FIELDS[platform]) for item in items or []]
@@ -0,0 +1,218 @@
+"""
+接口响应录制与回放
+
+--record：把采集过程中的接口 JSON 按平台/账号保存为夹具文件（可选同时保存 HAR）；
+--replay：从夹具文件提供接口响应，无需 Cookie 和网络即可重复运行解析与入库，用于计时和回归对比。
+
+夹具文件位于 <目录>/<平台>/<账号>.json，同一接口按录制顺序依次返回：
+- 直连与页面内翻页（source=http）通过替身 Session / APIRequestContext 回放；
+- 页面抓包（source=capture）通过 page.route 提供：页面文档替换为只会依次请求已录制接口的空白页，
+  接口请求用录制的 JSON 响应，其余请求一律中止。
+"""
+import json
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+FIXTURE_VERSION = 1
+
+STUB_PAGE = """<!doctype html><html><body><script>
+(async () => {
+  for (const [method, url] of %s) {
+    try { await fetch(url, {method, body: method === "POST" ? "{}" : undefined}); } catch (e) {}
+  }
+})();
+</script></body></html>"""
+
+
+def fixture_path(root, platform, account_key):
+    return Path(root) / platform / f"{account_key.replace('/', '_')}.json"
+
+
+def _endpoint(url):
+    parsed = urlparse(url)
+    return f"{parsed.hostname or ''}{parsed.path}"
+
+
+# ============================================================
+# 录制
+# ============================================================
+class Recorder:
+    """收集单个账号采集过程中的接口响应"""
+
+    def __init__(self, root, job, har=False):
+        self.path = fixture_path(root, job["platform"], job["account_key"])
+        self.har_path = self.path.with_suffix(".har") if har else None
+        self.job = job
+        self.responses = []
+
+    def add(self, source, method, url, body):
+        self.responses.append({"source": source, "method": method.upper(), "url": url, "body": body})
+
+    def wrap_session(self, session):
+        return RecordingSession(session, self)
+
+    def wrap_request_context(self, request_context):
+        return RecordingRequestContext(request_context, self)
+
+    async def record_har(self, page):
+        """录制页面的 HAR（上下文关闭时写入文件）"""
+        if self.har_path:
+            self.har_path.parent.mkdir(parents=True, exist_ok=True)
+            await page.route_from_har(str(self.har_path), update=True)
+
+    def save(self):
+        if not self.responses:
+            return None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": FIXTURE_VERSION,
+                "platform": self.job["platform"],
+                "account_key": self.job["account_key"],
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                "responses": self.responses,
+            }, f, ensure_ascii=False)
+        return self.path
+
+
+class RecordingSession:
+    """包装 requests.Session，记录每个 JSON 响应"""
+
+    def __init__(self, session, recorder):
+        self.session = session
+        self.recorder = recorder
+
+    def request(self, method, url, **kwargs):
+        resp = self.session.request(method, url, **kwargs)
+        try:
+            self.recorder.add("http", method, resp.url, resp.json())
+        except ValueError:
+            pass
+        return resp
+
+
+class RecordingRequestContext:
+    """包装页面的 APIRequestContext，记录翻页响应"""
+
+    def __init__(self, request_context, recorder):
+        self.request_context = request_context
+        self.recorder = recorder
+
+    async def fetch(self, url, method="GET", **kwargs):
+        resp = await self.request_context.fetch(url, method=method, **kwargs)
+        try:
+            self.recorder.add("http", method, resp.url, await resp.json())
+        except ValueError:
+            pass
+        return resp
+
+
+# ============================================================
+# 回放
+# ============================================================
+class ReplayResponse:
+    """模拟 requests.Response 的最小接口（直连回放）"""
+
+    def __init__(self, url, body):
+        self.url = url
+        self._body = body
+        self.status_code = 200 if body is not None else 404
+        self.ok = body is not None
+
+    def json(self):
+        if self._body is None:
+            raise ValueError("没有录制的响应")
+        return self._body
+
+
+class ReplayAPIResponse:
+    """模拟 Playwright APIResponse 的最小接口（页面内翻页回放），json() 需要 await"""
+
+    def __init__(self, url, body):
+        self.url = url
+        self._body = body
+        self.status = 200 if body is not None else 404
+        self.ok = body is not None
+
+    async def json(self):
+        if self._body is None:
+            raise ValueError("没有录制的响应")
+        return self._body
+
+
+class Fixture:
+    """按 (来源, 方法, 接口) 排队的录制响应"""
+
+    def __init__(self, path, data):
+        self.path = path
+        self.recorded_at = data.get("recorded_at", "")
+        self._stub_served = False
+        self._queues = defaultdict(deque)
+        for item in data.get("responses", []):
+            key = (item["source"], item["method"], _endpoint(item["url"]))
+            self._queues[key].append(item)
+
+    @classmethod
+    def load(cls, root, job):
+        path = fixture_path(root, job["platform"], job["account_key"])
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(path, json.load(f))
+
+    def next(self, source, method, url):
+        """取出下一个录制的响应，用完后返回 None"""
+        queue = self._queues.get((source, method.upper(), _endpoint(url)))
+        return queue.popleft()["body"] if queue else None
+
+    def pending(self, source):
+        """尚未回放的 (方法, URL)"""
+        return [(item["method"], item["url"])
+                for (src, _, _), queue in self._queues.items() if src == source
+                for item in queue]
+
+    def session(self):
+        return ReplaySession(self)
+
+    def request_context(self):
+        return ReplayRequestContext(self)
+
+    async def attach(self, page):
+        """接管页面的全部请求"""
+        await page.route("**/*", self._handle_route)
+
+    async def _handle_route(self, route, request):
+        if request.resource_type == "document":
+            # 采集器并行打开多个标签页时，只由第一个页面请求录制的接口，避免同一接口的响应被分到多个页面
+            pending = [] if self._stub_served else self.pending("capture")
+            self._stub_served = True
+            await route.fulfill(status=200, content_type="text/html", body=STUB_PAGE % json.dumps(pending))
+            return
+        body = self.next("capture", request.method, request.url)
+        if body is None:
+            await route.abort("blockedbyclient")
+        else:
+            await route.fulfill(status=200, content_type="application/json",
+                                body=json.dumps(body, ensure_ascii=False))
+
+
+class ReplaySession:
+    """替代 requests.Session"""
+
+    def __init__(self, fixture):
+        self.fixture = fixture
+
+    def request(self, method, url, **kwargs):
+        return ReplayResponse(url, self.fixture.next("http", method, url))
+
+
+class ReplayRequestContext:
+    """替代页面的 APIRequestContext"""
+
+    def __init__(self, fixture):
+        self.fixture = fixture
+
+    async def fetch(self, url, method="GET", **kwargs):
+        return ReplayAPIResponse(url, self.fixture.next("http", method, url))
@@ -0,0 +1,97 @@
+"""
+采集页面的资源拦截策略
+
+采集器只需要少量 JSON 接口，封面图、视频、字体和统计埋点都在路由层直接中止；
+第三方域名默认拦截，可在 config.json 中按平台配置 resource_allowlist 放行。
+"""
+from collections import Counter
+from urllib.parse import urlparse
+
+# 默认拦截的资源类型
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# 统计、埋点、监控类域名（始终拦截，除非加入白名单）
+TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "hm.baidu.com", "cnzz.com", "umeng.com",
+    "mcs.snssdk.com", "mon.snssdk.com", "mon.zijieapi.com", "mssdk.bytedance.com",
+    "apmplus.volces.com", "sentry.io",
+    "t2.xiaohongshu.com", "apm-fe.xiaohongshu.com", "lng.xiaohongshu.com",
+    "badjs.weixinbridge.com", "report.url.cn", "beacon.qq.com",
+)
+
+# 各平台的第一方域名（页面本身、接口与前端资源 CDN）
+FIRST_PARTY_HOSTS = {
+    "douyin": (
+        "douyin.com", "douyinstatic.com", "douyinpic.com", "douyinvod.com",
+        "bytedance.com", "byteimg.com", "bytescm.com", "bytecdn.cn", "zijieapi.com",
+        "snssdk.com", "pstatp.com", "yhgfb-cn-static.com",
+    ),
+    "xiaohongshu": ("xiaohongshu.com", "xhscdn.com", "xhslink.com"),
+    "shipinhao": ("weixin.qq.com", "qq.com", "qpic.cn", "qlogo.cn", "wechat.com"),
+}
+
+
+def _host_matches(host, suffixes):
+    return any(host == s or host.endswith("." + s) for s in suffixes)
+
+
+class ResourcePolicy:
+    """基于 page.route 的资源拦截，并统计拦截与放行的流量"""
+
+    def __init__(self, platform, allowlist=None):
+        self.platform = platform
+        self.first_party = FIRST_PARTY_HOSTS.get(platform, ())
+        allowlist = allowlist or []
+        # 白名单条目既可以是资源类型（如 "font"），也可以是域名后缀
+        self.allowed_types = {item for item in allowlist if "." not in item}
+        self.allowed_hosts = tuple(item.lstrip("*.") for item in allowlist if "." in item)
+        self.blocked = Counter()
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+
+    def block_reason(self, resource_type, url):
+        """返回拦截原因，放行时返回 None"""
+        host = urlparse(url).hostname or ""
+        if not host or _host_matches(host, self.allowed_hosts):
+            return None
+        if _host_matches(host, TRACKER_HOSTS):
+            return "tracker"
+        if resource_type in BLOCKED_RESOURCE_TYPES and resource_type not in self.allowed_types:
+            return resource_type
+        if not _host_matches(host, self.first_party):
+            return "third_party"
+        return None
+
+    async def attach(self, page):
+        """对采集页面启用拦截"""
+        await page.route("**/*", self._handle_route)
+        page.on("requestfinished", self._on_request_finished)
+
+    async def _handle_route(self, route, request):
+        reason = self.block_reason(request.resource_type, request.url)
+        if reason:
+            self.blocked[reason] += 1
+            await route.abort("blockedbyclient")
+        else:
+            await route.fallback()
+
+    async def _on_request_finished(self, request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return  # 页面关闭时请求可能已不可访问
+        self.allowed_requests += 1
+        self.allowed_bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+
+    def merge(self, other):
+        """合并同一平台多个账号的统计"""
+        self.blocked.update(other.blocked)
+        self.allowed_requests += other.allowed_requests
+        self.allowed_bytes += other.allowed_bytes
+        return self
+
+    def summary(self):
+        blocked = ", ".join(f"{reason} {count}" for reason, count in self.blocked.most_common())
+        return (f"拦截 {sum(self.blocked.values())} 个请求（{blocked or '无'}），"
+                f"放行 {self.allowed_requests} 个 / {self.allowed_bytes / 1024 / 1024:.2f} MB")
@@ -0,0 +1,173 @@
+"""
+统一日志
+
+用法：
+    log = get_logger("collect", LOG_DIR / "collect.jsonl")
+    log.info("开始采集")
+    with bind(platform="douyin", account="main"):
+        log.info("翻页完成")          # 自动带上 platform / account
+
+- 调用方只把日志记录放进内存队列，由后台线程统一写文件，采集循环中没有文件打开/写入的系统调用；
+- 文件为 JSON Lines，每行带 run_id（来自 timing 的运行 ID）、platform、account、stage 字段，
+  可以和 collection_stages 表按 run_id 关联分析；
+- 文件超过 max_bytes 时轮转，旧文件 gzip 压缩，保留 backups 个；多个进程写同一个文件时
+  （采集进程和它启动的视频号扫码登录进程）写入和轮转在文件锁内进行，不会丢行或写进已轮转的旧文件；
+- 同时以原来的 "[时间] 消息" 格式输出到 stdout（Native Messaging 宿主等占用 stdout 的进程可关闭）。
+
+bind() 基于 contextvars，asyncio.gather 中的每个采集任务各自持有自己的字段；timer.stage() 会自动绑定 stage。
+"""
+import atexit
+import contextvars
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from timing import RUN_ID_ENV
+
+try:
+    import fcntl
+except ImportError:  # Windows：没有 fcntl，不做跨进程加锁
+    fcntl = None
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+CONTEXT_FIELDS = ("platform", "account", "stage")
+
+_context = contextvars.ContextVar("log_context", default={})
+_listeners = {}
+
+
+@contextmanager
+def bind(**fields):
+    """在 with 块内为日志附加字段（可嵌套，内层覆盖外层）"""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """在调用方线程里补上 run_id 和绑定的字段（后台线程看不到调用方的上下文）"""
+
+    def filter(self, record):
+        fields = _context.get()
+        record.run_id = os.environ.get(RUN_ID_ENV, "")
+        for name in CONTEXT_FIELDS:
+            if not getattr(record, name, ""):
+                setattr(record, name, fields.get(name, ""))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志一行 JSON，空字段省略"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "run_id": getattr(record, "run_id", ""),
+        }
+        for name in CONTEXT_FIELDS:
+            entry[name] = getattr(record, name, "")
+        entry["msg"] = record.getMessage()
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps({k: v for k, v in entry.items() if v != ""}, ensure_ascii=False)
+
+
+class GzipRotatingFileHandler(RotatingFileHandler):
+    """按大小轮转，轮转出的旧文件压缩为 .gz
+
+    每条日志在 <文件>.lock 的排他锁内写入；写入前发现文件已被其他进程轮转（inode 变化）时重新打开。
+    """
+
+    def __init__(self, filename, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+        # 第一条日志写入时才打开文件：只导入模块、不记日志的脚本不会创建日志文件
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self._compress
+        self._lock_file = None
+
+    def emit(self, record):
+        if fcntl is None:
+            super().emit(record)
+            return
+        if self._lock_file is None:
+            self._lock_file = open(self.baseFilename + ".lock", "a")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            self._reopen_if_rotated()
+            super().emit(record)
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _reopen_if_rotated(self):
+        if self.stream is None:
+            return
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self.stream.fileno())
+        if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+            self.stream.close()
+            self.stream = None  # emit 时重新打开
+
+    def close(self):
+        super().close()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    @staticmethod
+    def _compress(source, dest):
+        with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+
+def get_logger(name, path, stdout=True, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+    """返回写入 path 的日志器；同名日志器只配置一次，进程退出时写完队列中的剩余日志"""
+    logger = logging.getLogger(f"creator_tracker.{name}")
+    if name in _listeners:
+        return logger
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = GzipRotatingFileHandler(str(path), max_bytes=max_bytes, backups=backups)
+    file_handler.setFormatter(JsonFormatter())
+    handlers = [file_handler]
+    if stdout:
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
+        handlers.append(console)
+
+    records = queue.SimpleQueue()
+    queue_handler = QueueHandler(records)
+    queue_handler.addFilter(ContextFilter())
+    logger.addHandler(queue_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
+    return logger
+
+
+def shutdown():
+    """写完队列中的剩余日志并停止后台线程（进程退出时自动调用）"""
+    while _listeners:
+        _, listener = _listeners.popitem()
+        listener.stop()
+
+
+atexit.register(shutdown)
+
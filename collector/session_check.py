@@ -0,0 +1,122 @@
+"""
+登录态检查
+
+1. 预检：采集前用账号 Cookie 请求一次平台的用户信息接口（短超时），明确返回"未登录"的账号直接跳过，
+   不启动浏览器；网络错误、风控拦截等无法判断的情况按"未知"处理，照常采集。
+2. 页面内检测：LoginGuard 监听主框架导航，一旦被跳转到登录页，goto 和接口等待立即以 SessionExpiredError 结束。
+
+登录失效的账号不写入任何数据：不保存零值账号，不推进增量水位线。
+"""
+import asyncio
+import re
+
+import requests
+
+from deadline import NO_DEADLINE
+from http_client import ENDPOINTS, SHIPINHAO_LOGIN_REQUIRED
+
+PROBE_TIMEOUT = 5  # 秒
+
+ALIVE = "alive"
+DEAD = "dead"
+UNKNOWN = "unknown"
+
+# 各平台的登录页（抖音创作者中心未登录时回到首页）
+LOGIN_PAGES = {
+    "douyin": re.compile(r"^https?://(creator\.douyin\.com/(login|\?|$)|(passport|sso)\.douyin\.com/)"),
+    "xiaohongshu": re.compile(r"^https?://(creator|customer)\.xiaohongshu\.com/login"),
+    "shipinhao": re.compile(r"^https?://channels\.weixin\.qq\.com/login"),
+}
+
+# 预检接口：alive / dead 分别判断已登录和明确未登录，其余响应视为未知
+PROBES = {
+    "douyin": {
+        "method": "GET",
+        "url": ENDPOINTS["douyin"]["user"],
+        "alive": lambda data: data.get("status_code") == 0 and bool(data.get("user")),
+        "dead": lambda data: data.get("status_code") == 8,  # 用户未登录
+    },
+    "xiaohongshu": {
+        "method": "GET",
+        "url": ENDPOINTS["xiaohongshu"]["user"],
+        "alive": lambda data: data.get("code") == 0 and bool(data.get("data")),
+        "dead": lambda data: data.get("code") in (-100, -101),  # 登录已过期 / 无登录信息
+    },
+    "shipinhao": {
+        "method": "POST",
+        "url": ENDPOINTS["shipinhao"]["auth"],
+        "request": {"json": {}},
+        "alive": lambda data: data.get("errCode") == 0,
+        "dead": lambda data: data.get("errCode") == SHIPINHAO_LOGIN_REQUIRED,
+    },
+}
+
+
+class SessionExpiredError(Exception):
+    """采集过程中被跳转到登录页"""
+
+
+def is_login_url(platform, url):
+    """URL 是否为平台的登录页"""
+    pattern = LOGIN_PAGES.get(platform)
+    return bool(pattern and url and pattern.match(url))
+
+
+def probe_session(platform, session, deadline=NO_DEADLINE):
+    """用 Cookie 请求用户信息接口，返回 (ALIVE / DEAD / UNKNOWN, 说明)
+
+    超时不超过 deadline 的剩余预算，预算已用完时抛出 DeadlineExceeded。
+    """
+    spec = PROBES.get(platform)
+    if not spec:
+        return UNKNOWN, "没有预检接口"
+    try:
+        resp = session.request(spec["method"], spec["url"], timeout=deadline.timeout_s(PROBE_TIMEOUT),
+                               **spec.get("request", {}))
+    except requests.RequestException as e:
+        return UNKNOWN, f"请求失败: {e}"
+
+    if resp.status_code == 401 or is_login_url(platform, resp.url):
+        return DEAD, f"HTTP {resp.status_code}，跳转到 {resp.url}"
+    if resp.status_code >= 400:
+        return UNKNOWN, f"HTTP {resp.status_code}"
+    try:
+        data = resp.json()
+    except ValueError:
+        return UNKNOWN, "非 JSON 响应（可能是验证页）"
+    if not isinstance(data, dict):
+        return UNKNOWN, "响应格式异常"
+    if spec["dead"](data):
+        return DEAD, f"接口返回未登录: {str(data)[:100]}"
+    if spec["alive"](data):
+        return ALIVE, ""
+    return UNKNOWN, f"无法判断: {str(data)[:100]}"
+
+
+class LoginGuard:
+    """监听页面导航，被跳转到登录页时记录并通知正在等待的采集步骤"""
+
+    def __init__(self, platform):
+        self.platform = platform
+        self.login_url = None
+        self.event = asyncio.Event()
+        self._pages = []
+
+    def attach(self, page):
+        """监听页面（同一采集任务的多个标签页共用一个 LoginGuard）"""
+        self._pages.append(page)
+        page.on("framenavigated", self._on_navigated)
+
+    def detach(self):
+        while self._pages:
+            self._pages.pop().remove_listener("framenavigated", self._on_navigated)
+
+    def _on_navigated(self, frame):
+        if frame.parent_frame is None and is_login_url(self.platform, frame.url):
+            self.login_url = frame.url
+            self.event.set()
+
+    def check(self):
+        """已被跳转到登录页时抛出 SessionExpiredError"""
+        if self.login_url:
+            raise SessionExpiredError(f"登录已失效，页面跳转到 {self.login_url}")
@@ -0,0 +1,125 @@
+"""
+分阶段计时与运行记录
+
+用法：
+    timer.start("collect_all")
+    with timer.stage("goto", platform="douyin", detail=url) as stage:
+        ...
+        stage.items = 10
+    timer.finish("success")
+
+每个阶段记录耗时、字节数、条目数和状态，运行结束时写入 tracker.db 的
+collection_runs / collection_stages 表，用 `python query_db.py --runs` 查看 p50/p95。
+父进程（collect_all_with_ga.py）通过环境变量把 run_id 传给子进程，子进程的阶段记在同一次运行下。
+未调用 start() 时只计时不落库（基准测试、脚本导入时）。
+"""
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+RUN_ID_ENV = "CREATOR_TRACKER_RUN_ID"
+
+
+class Stage:
+    """一个阶段的计时结果，可在 with 块内补充字节数、条目数等"""
+
+    __slots__ = ("name", "platform", "account", "started_at", "duration",
+                 "bytes", "items", "status", "detail")
+
+    def __init__(self, name, platform="", account="", detail=""):
+        self.name = name
+        self.platform = platform
+        self.account = account
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self.duration = 0.0
+        self.bytes = 0
+        self.items = 0
+        self.status = "ok"
+        self.detail = detail
+
+    def as_row(self, run_id):
+        return (run_id, self.name, self.platform, self.account, self.started_at,
+                self.duration, self.bytes, self.items, self.status, self.detail[:200])
+
+
+class RunTimer:
+    """记录一次采集运行的各阶段耗时"""
+
+    def __init__(self):
+        self.run_id = None
+        self.command = ""
+        self.owns_run = False
+        self.stages = []
+        self._started = None
+
+    @property
+    def active(self):
+        return self.run_id is not None
+
+    def start(self, command):
+        """开始记录；父进程已开始的运行直接沿用其 run_id"""
+        from database import start_run
+
+        self.command = command
+        self._started = time.monotonic()
+        parent_run = os.environ.get(RUN_ID_ENV)
+        if parent_run:
+            self.run_id, self.owns_run = parent_run, False
+        else:
+            self.run_id, self.owns_run = uuid.uuid4().hex[:12], True
+            start_run(self.run_id, command)
+        os.environ[RUN_ID_ENV] = self.run_id  # 传给子进程
+        return self.run_id
+
+    @contextmanager
+    def stage(self, name, platform="", account="", detail=""):
+        """计时一个阶段；块内抛出异常时状态记为 error，块内的日志带上阶段名"""
+        from runlog import bind
+
+        stage = Stage(name, platform, account, detail)
+        started = time.monotonic()
+        try:
+            with bind(stage=name):
+                yield stage
+        except BaseException as e:
+            stage.status = "error"
+            stage.detail = stage.detail or str(e)
+            raise
+        finally:
+            stage.duration = time.monotonic() - started
+            if self.active:
+                self.stages.append(stage)
+
+    def record(self, name, duration, platform="", account="", status="ok", detail="",
+               items=0, bytes=0):
+        """记录在别处测得的耗时"""
+        if not self.active:
+            return
+        stage = Stage(name, platform, account, detail)
+        stage.duration, stage.status, stage.items, stage.bytes = duration, status, items, bytes
+        self.stages.append(stage)
+
+    def flush(self):
+        """把已记录的阶段写入数据库"""
+        from database import save_stages
+
+        if self.active and self.stages:
+            save_stages([stage.as_row(self.run_id) for stage in self.stages])
+            self.stages = []
+
+    def finish(self, status="success"):
+        """写入所有阶段；本进程开始的运行同时写入总耗时和状态"""
+        from database import finish_run
+
+        if not self.active:
+            return
+        self.flush()
+        if self.owns_run:
+            finish_run(self.run_id, status, time.monotonic() - self._started)
+            os.environ.pop(RUN_ID_ENV, None)
+        self.run_id = None
+
+
+timer = RunTimer()
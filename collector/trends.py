@@ -0,0 +1,147 @@
+"""
+账号历史趋势回填
+
+各平台的数据中心接口一次返回最近 7 / 30 / 90 天的逐日序列，用于补齐 daily_accounts 中缺失的日期
+（漏跑的日子、新加入的账号）：
+- level 序列是每天的累计值（如粉丝数），直接使用；
+- delta 序列是每天的新增值（如新增播放），以账号最近一天的快照为锚点换算为累计值：
+  锚点之前的某天 = 锚点累计值 - 该天之后到锚点日期的新增之和，锚点之后的某天 = 锚点累计值 + 其间的新增之和；
+- 接口没有的字段（如小红书的播放量、作品数）沿用当天或之前最近一份真实快照的值，
+  比账号第一份快照还早的日期留空（NULL），不用今天的累计值冒充历史数据。
+"""
+from datetime import datetime, timedelta
+
+from http_client import ENDPOINTS, request_json, shipinhao_ok
+
+BACKFILL_DAYS = (30, 90)
+SERIES_FIELDS = ("followers", "total_views", "total_likes", "total_comments", "total_shares",
+                 "total_collects", "total_works")
+
+
+def _int(value):
+    try:
+        return int(float(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _date(value):
+    """接口中的日期（毫秒 / 秒时间戳、YYYYMMDD、YYYY-MM-DD）统一为 YYYY-MM-DD"""
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit() and len(value) > 8):
+        ts = float(value)
+        return datetime.fromtimestamp(ts / 1000 if ts > 1e11 else ts).strftime("%Y-%m-%d")
+    value = str(value or "")
+    if len(value) == 8 and value.isdigit():
+        return f"{value[:4]}-{value[4:6]}-{value[6:]}"
+    return value[:10]
+
+
+def _points(items, date_key, value_key):
+    return {_date(item.get(date_key)): _int(item.get(value_key)) for item in items or [] if item.get(date_key)}
+
+
+def _read_xiaohongshu(data, days):
+    payload = data.get("data") or {}
+    window = payload.get({30: "thirty", 90: "ninety"}.get(days, "thirty")) or payload.get("thirty") or {}
+    return {"followers": _points(window.get("fans_list"), "date", "count")}
+
+
+def _read_douyin(data, days):
+    trends = (data.get("data") or {}).get("trend_map") or {}
+    return {field: _points(trends.get(metric), "date", "value") for field, metric in (
+        ("followers", "total_fans_cnt"), ("total_views", "play_cnt"), ("total_likes", "digg_cnt"),
+        ("total_comments", "comment_cnt"), ("total_shares", "share_cnt"),
+    )}
+
+
+def _read_shipinhao(data, days):
+    items = (data.get("data") or {}).get("list") or []
+    return {field: _points(items, "date", key) for field, key in (
+        ("followers", "totalFansCount"), ("total_views", "readCount"), ("total_likes", "likeCount"),
+        ("total_comments", "commentCount"), ("total_shares", "forwardCount"), ("total_collects", "favCount"),
+    )}
+
+
+# 各平台的趋势接口：kinds 声明每个字段是累计值（level）还是每日新增（delta）
+TRENDS = {
+    "xiaohongshu": {
+        "method": "GET",
+        "url": ENDPOINTS["xiaohongshu"]["overview"],
+        "request": lambda days: {},
+        "ok": lambda data: data.get("code") == 0,
+        "read": _read_xiaohongshu,
+        "kinds": {"followers": "level"},
+    },
+    "douyin": {
+        "method": "GET",
+        "url": ENDPOINTS["douyin"]["trend"],
+        "request": lambda days: {"params": {"days": days}},
+        "ok": lambda data: data.get("status_code") == 0,
+        "read": _read_douyin,
+        "kinds": {"followers": "level", "total_views": "delta", "total_likes": "delta",
+                  "total_comments": "delta", "total_shares": "delta"},
+    },
+    "shipinhao": {
+        "method": "POST",
+        "url": ENDPOINTS["shipinhao"]["trend"],
+        "request": lambda days: {"json": {
+            "startTs": int((datetime.now() - timedelta(days=days)).timestamp()),
+            "endTs": int(datetime.now().timestamp()),
+        }},
+        "ok": shipinhao_ok,
+        "read": _read_shipinhao,
+        "kinds": {"followers": "level", "total_views": "delta", "total_likes": "delta",
+                  "total_comments": "delta", "total_shares": "delta", "total_collects": "delta"},
+    },
+}
+
+
+def fetch_trend(session, platform, days):
+    """请求账号的趋势序列，返回 {字段: {日期: 值}}；被拦截时抛出 ApiBlockedError"""
+    spec = TRENDS[platform]
+    data = request_json(session, spec["method"], spec["url"], spec["ok"], **spec["request"](days))
+    return {field: points for field, points in spec["read"](data, days).items() if points}
+
+
+def _carried(snapshots, date, field):
+    """date 当天或之前最近一份真实快照中的值（snapshots 按日期升序），没有时为 None"""
+    value = None
+    for snapshot in snapshots:
+        if snapshot["date"] > date:
+            break
+        value = snapshot[field]
+    return value
+
+
+def backfill_rows(platform, anchor, snapshots, series, days, today, created_at):
+    """由趋势序列生成 today 之前 days 天内的 daily_accounts 行（列顺序同 DAILY_ACCOUNT_COLUMNS）
+
+    anchor 为账号的一份快照（含 date 和各累计字段），delta 序列从锚点日期向前倒推、向后累加；
+    snapshots 为数据库中该账号的真实快照，用于填充没有趋势序列的字段。
+    不生成 today 和锚点日期的行（分别由当天采集和已有快照提供）。
+    """
+    kinds = TRENDS[platform]["kinds"]
+    anchor_date = anchor["date"]
+    first_date = (datetime.strptime(today, "%Y-%m-%d") - timedelta(days=days)).strftime("%Y-%m-%d")
+    dates = sorted({date for points in series.values() for date in points
+                    if first_date <= date < today and date != anchor_date})
+
+    values = {date: {} for date in dates}
+    for field, points in series.items():
+        base = _int(anchor.get(field))
+        for date in dates:
+            if kinds.get(field) == "level":
+                if date in points:
+                    values[date][field] = points[date]
+            elif date < anchor_date:
+                values[date][field] = max(0, base - sum(v for d, v in points.items() if date < d <= anchor_date))
+            else:
+                values[date][field] = base + sum(v for d, v in points.items() if anchor_date < d <= date)
+
+    return [
+        (date, platform, anchor.get("account_name", ""), anchor.get("account_id", ""), anchor.get("avatar_url", ""),
+         *(values[date][field] if field in values[date] else _carried(snapshots, date, field)
+           for field in SERIES_FIELDS),
+         created_at)
+        for date in dates
+    ]
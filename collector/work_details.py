@@ -0,0 +1,146 @@
+"""
+作品详情数据
+
+作品列表接口只有播放、点赞等基础计数，曝光量、点击率、平均观看时长、带来的新粉丝
+只能逐个作品调用创作者中心的详情接口获取。
+
+- 作品列表采集完成后，从本次采集到的作品中挑出详情超过 refresh_hours 未刷新的，按发布时间从新到旧，
+  每个账号最多 max_works 个；
+- 用 workers 个线程并发请求，共用 SESSION_POOL 中该账号的 Session（连接池长连接），
+  线程数不超过连接池大小；
+- 连续 MAX_CONSECUTIVE_FAILURES 个请求被拦截时停止（多半触发了风控），
+  账号时间预算不足时不再发起新请求（每个请求的超时也不超过剩余预算），已取得的详情照常保存。
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from deadline import NO_DEADLINE, OPTIONAL_RESERVE, DeadlineExceeded
+from http_client import ENDPOINTS, ApiBlockedError, DEFAULT_POOL_SIZE, request_json, shipinhao_ok
+
+DEFAULT_WORKERS = 4
+DEFAULT_REFRESH_HOURS = 24
+DEFAULT_MAX_WORKS = 200
+MAX_CONSECUTIVE_FAILURES = 5
+
+
+def _int(value):
+    try:
+        return int(float(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _float(value):
+    try:
+        return round(float(value or 0), 4)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _read_douyin(data):
+    metrics = data.get("data") or {}
+    return {
+        "impressions": _int(metrics.get("impression_cnt")),
+        "click_rate": _float(metrics.get("cover_click_rate")),
+        "avg_view_time": _float(metrics.get("avg_play_duration")),
+        "new_followers": _int(metrics.get("fans_increase_cnt")),
+    }
+
+
+def _read_xiaohongshu(data):
+    metrics = data.get("data") or {}
+    return {
+        "impressions": _int(metrics.get("impl_count")),
+        "click_rate": _float(metrics.get("coverClickRate")),
+        "avg_view_time": _float(metrics.get("view_time_avg")),
+        "new_followers": _int(metrics.get("rise_fans_count")),
+    }
+
+
+def _read_shipinhao(data):
+    metrics = (data.get("data") or {}).get("totalData") or {}
+    return {
+        "impressions": _int(metrics.get("exposureCount")),
+        "click_rate": _float(metrics.get("clickRate")),
+        "avg_view_time": _float(metrics.get("avgPlayTime")),
+        "new_followers": _int(metrics.get("followCount")),
+    }
+
+
+# 各平台的作品详情接口：click_rate 为 0-1 的比例，avg_view_time 单位为秒
+DETAILS = {
+    "douyin": {
+        "method": "GET",
+        "url": ENDPOINTS["douyin"]["work_detail"],
+        "request": lambda work_id: {"params": {"item_id": work_id}},
+        "ok": lambda data: data.get("status_code") == 0,
+        "read": _read_douyin,
+    },
+    "xiaohongshu": {
+        "method": "GET",
+        "url": ENDPOINTS["xiaohongshu"]["work_detail"],
+        "request": lambda work_id: {"params": {"note_id": work_id}},
+        "ok": lambda data: data.get("code") == 0,
+        "read": _read_xiaohongshu,
+    },
+    "shipinhao": {
+        "method": "POST",
+        "url": ENDPOINTS["shipinhao"]["work_detail"],
+        "request": lambda work_id: {"json": {"exportId": work_id}},
+        "ok": shipinhao_ok,
+        "read": _read_shipinhao,
+    },
+}
+
+
+def refresh_cutoff(refresh_hours=DEFAULT_REFRESH_HOURS):
+    """详情更新时间早于该时间的作品需要刷新"""
+    return (datetime.now() - timedelta(hours=refresh_hours)).isoformat(timespec="seconds")
+
+
+def fetch_detail(session, platform, work_id, deadline=NO_DEADLINE):
+    """请求单个作品的详情，返回 works 表的详情字段；被拦截时抛出 ApiBlockedError"""
+    spec = DETAILS[platform]
+    data = request_json(session, spec["method"], spec["url"], spec["ok"], deadline, **spec["request"](work_id))
+    return spec["read"](data)
+
+
+def fetch_details(session, platform, work_ids, workers=DEFAULT_WORKERS, deadline=NO_DEADLINE, logger=None):
+    """并发获取作品详情，返回 (work_id, 详情字段) 列表（按 work_ids 顺序，跳过失败的作品）"""
+    stop = threading.Event()
+    lock = threading.Lock()
+    failures = {"consecutive": 0, "total": 0}
+
+    def fetch(work_id):
+        if stop.is_set():
+            return None
+        if deadline.expired(OPTIONAL_RESERVE):
+            stop.set()
+            if logger:
+                logger(f"[{platform}] 时间预算不足（{deadline}），停止获取作品详情")
+            return None
+        try:
+            detail = fetch_detail(session, platform, work_id, deadline)
+        except DeadlineExceeded:
+            stop.set()  # 请求发出前预算已用完，已取得的详情照常返回
+            return None
+        except ApiBlockedError as e:
+            with lock:
+                failures["consecutive"] += 1
+                failures["total"] += 1
+                if failures["consecutive"] >= MAX_CONSECUTIVE_FAILURES and not stop.is_set():
+                    stop.set()
+                    if logger:
+                        logger(f"[{platform}] 连续 {MAX_CONSECUTIVE_FAILURES} 个作品详情请求失败，停止（{e}）")
+            return None
+        with lock:
+            failures["consecutive"] = 0
+        return work_id, detail
+
+    workers = max(1, min(workers, DEFAULT_POOL_SIZE, len(work_ids)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"detail-{platform}") as pool:
+        results = [result for result in pool.map(fetch, work_ids) if result]
+    if logger and failures["total"]:
+        logger(f"[{platform}] 作品详情: {failures['total']} 个请求失败")
+    return results
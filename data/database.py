@@ -1,11 +1,106 @@
 """
 SQLite 数据库管理模块
 """
+import os
 import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 
-DB_PATH = Path(__file__).parent / "tracker.db"
+from records import WORK_COLUMNS, WORK_FIELDS, DETAIL_FIELDS
+
+# 导入时就会初始化数据库；需要在导入前换用其他数据库文件的脚本（如基准测试）设置该环境变量
+DB_PATH_ENV = "CREATOR_TRACKER_DB"
+DB_PATH = Path(os.environ.get(DB_PATH_ENV) or Path(__file__).parent / "tracker.db")
+
+# 同一平台可采集多个账号，按 (日期, 平台, 账号) 唯一
+DAILY_ACCOUNTS_DDL = """
+    CREATE TABLE IF NOT EXISTS daily_accounts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        account_name TEXT DEFAULT '',
+        account_id TEXT DEFAULT '',
+        avatar_url TEXT DEFAULT '',
+        followers INTEGER DEFAULT 0,
+        total_views INTEGER DEFAULT 0,
+        total_likes INTEGER DEFAULT 0,
+        total_comments INTEGER DEFAULT 0,
+        total_shares INTEGER DEFAULT 0,
+        total_collects INTEGER DEFAULT 0,
+        total_works INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(date, platform, account_id)
+    )
+"""
+
+DAILY_ACCOUNT_COLUMNS = (
+    "date, platform, account_name, account_id, avatar_url, followers, "
+    "total_views, total_likes, total_comments, total_shares, total_collects, "
+    "total_works, created_at"
+)
+
+# 作品列表只更新列表字段，保留详情字段
+WORKS_UPSERT = f"""
+    INSERT INTO works ({WORK_COLUMNS}, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(work_id) DO UPDATE SET
+        {", ".join(f"{column} = excluded.{column}" for column in WORK_FIELDS[1:] + ("account_id",))},
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# 作品详情字段及其类型
+DETAIL_COLUMNS = {
+    "impressions": "INTEGER DEFAULT 0",
+    "click_rate": "REAL DEFAULT 0",
+    "avg_view_time": "REAL DEFAULT 0",
+    "new_followers": "INTEGER DEFAULT 0",
+    "detail_updated_at": "TEXT DEFAULT ''",
+}
+
+# 按平台和日期汇总多个账号（单账号时与原始行一致）
+TOTAL_FIELDS = ("followers", "total_views", "total_likes", "total_comments", "total_shares",
+                "total_collects", "total_works")
+
+# 某个账号当天没有数据（采集失败或跳过）时沿用它之前最近一天的行，平台汇总不会因缺一个账号而骤降；
+# 回填的历史行中未知的字段为 NULL：只要有一个账号未知，平台汇总也为 NULL，避免只加总部分账号。
+# 多个账号时名称用 " / " 连接，账号 ID 和头像留空。调用方在后面接 WHERE ... GROUP BY date。
+DAILY_TOTALS_SELECT = f"""
+    WITH days AS (
+        SELECT DISTINCT date, platform FROM daily_accounts
+    ),
+    tracked AS (
+        SELECT platform, account_id, MIN(date) AS first_date
+        FROM daily_accounts GROUP BY platform, account_id
+    ),
+    latest AS (
+        SELECT d.date, d.platform, t.account_id,
+               (SELECT MAX(b.date) FROM daily_accounts b
+                WHERE b.platform = d.platform AND b.account_id = t.account_id AND b.date <= d.date) AS source_date
+        FROM days d JOIN tracked t ON t.platform = d.platform AND t.first_date <= d.date
+    ),
+    filled AS (
+        SELECT l.date, a.platform, a.account_name, a.account_id, a.avatar_url,
+               {", ".join(f"a.{field}" for field in TOTAL_FIELDS)}, a.created_at
+        FROM latest l
+        JOIN daily_accounts a
+          ON a.platform = l.platform AND a.account_id = l.account_id AND a.date = l.source_date
+    )
+    SELECT date, platform,
+           CASE WHEN COUNT(*) = 1 THEN MIN(account_name) ELSE GROUP_CONCAT(account_name, ' / ') END
+               AS account_name,
+           CASE WHEN COUNT(*) = 1 THEN MIN(account_id) ELSE '' END AS account_id,
+           CASE WHEN COUNT(*) = 1 THEN MIN(avatar_url) ELSE '' END AS avatar_url,
+           {", ".join(f"CASE WHEN COUNT({field}) = COUNT(*) THEN SUM({field}) END AS {field}"
+                      for field in TOTAL_FIELDS)},
+           MAX(created_at) AS created_at
+    FROM filled
+"""
+
+
+def use_db_path(path):
+    """切换数据库文件（回放、基准测试时使用独立的数据库）"""
+    global DB_PATH
+    DB_PATH = Path(path)
 
 
 def get_connection():
@@ -21,25 +116,8 @@ def init_db():
     cursor = conn.cursor()
 
     # 每日账号数据表
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS daily_accounts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            platform TEXT NOT NULL,
-            account_name TEXT DEFAULT '',
-            account_id TEXT DEFAULT '',
-            avatar_url TEXT DEFAULT '',
-            followers INTEGER DEFAULT 0,
-            total_views INTEGER DEFAULT 0,
-            total_likes INTEGER DEFAULT 0,
-            total_comments INTEGER DEFAULT 0,
-            total_shares INTEGER DEFAULT 0,
-            total_collects INTEGER DEFAULT 0,
-            total_works INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(date, platform)
-        )
-    """)
+    _migrate_daily_accounts(cursor)
+    cursor.execute(DAILY_ACCOUNTS_DDL)
 
     # 作品表（存储最新状态）
     cursor.execute("""
@@ -61,6 +139,64 @@ def init_db():
         )
     """)
 
+    # 增量采集水位线（每个账号最新作品及上次全量刷新时间）
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS account_watermarks (
+            platform TEXT NOT NULL,
+            account_key TEXT NOT NULL,
+            account_id TEXT DEFAULT '',
+            newest_publish_time TEXT DEFAULT '',
+            newest_work_id TEXT DEFAULT '',
+            last_full_refresh TEXT DEFAULT '',
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (platform, account_key)
+        )
+    """)
+
+    # 采集运行记录与分阶段耗时
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS collection_runs (
+            run_id TEXT PRIMARY KEY,
+            command TEXT DEFAULT '',
+            started_at TEXT NOT NULL,
+            finished_at TEXT DEFAULT '',
+            duration REAL DEFAULT 0,
+            status TEXT DEFAULT 'running'
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS collection_stages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            platform TEXT DEFAULT '',
+            account TEXT DEFAULT '',
+            started_at TEXT NOT NULL,
+            duration REAL DEFAULT 0,
+            bytes INTEGER DEFAULT 0,
+            items INTEGER DEFAULT 0,
+            status TEXT DEFAULT 'ok',
+            detail TEXT DEFAULT ''
+        )
+    """)
+
+    # 断点续采：每次运行中各账号的完成状态和翻页进度
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS run_checkpoints (
+            run_id TEXT NOT NULL,
+            platform TEXT NOT NULL,
+            account_key TEXT NOT NULL,
+            status TEXT DEFAULT 'running',
+            cursor INTEGER,
+            pages INTEGER DEFAULT 0,
+            works INTEGER DEFAULT 0,
+            newest_publish_time TEXT DEFAULT '',
+            newest_work_id TEXT DEFAULT '',
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (run_id, platform, account_key)
+        )
+    """)
+
     # GA 每日数据表
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS daily_ga (
@@ -80,13 +216,44 @@ def init_db():
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_date ON daily_accounts(date)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_platform ON daily_accounts(platform)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_platform_date ON daily_accounts(platform, date DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_account_date "
+                   "ON daily_accounts(platform, account_id, date)")
+    _ensure_column(cursor, "works", "account_id", "TEXT DEFAULT ''")
+    for column, definition in DETAIL_COLUMNS.items():
+        _ensure_column(cursor, "works", column, definition)
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_works_platform ON works(platform)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_works_platform_time ON works(platform, publish_time DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_works_account ON works(platform, account_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stages_run ON collection_stages(run_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stages_stage_time ON collection_stages(stage, started_at)")
 
     conn.commit()
     conn.close()
 
 
+def _ensure_column(cursor, table, column, definition):
+    """为旧数据库补充新增的列"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _migrate_daily_accounts(cursor):
+    """旧版 daily_accounts 以 (date, platform) 唯一，重建为按账号唯一"""
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'daily_accounts'")
+    row = cursor.fetchone()
+    if not row or "UNIQUE(date, platform)" not in row[0]:
+        return
+
+    cursor.execute("ALTER TABLE daily_accounts RENAME TO daily_accounts_old")
+    cursor.execute(DAILY_ACCOUNTS_DDL)
+    cursor.execute(f"""
+        INSERT INTO daily_accounts ({DAILY_ACCOUNT_COLUMNS})
+        SELECT {DAILY_ACCOUNT_COLUMNS} FROM daily_accounts_old
+    """)
+    cursor.execute("DROP TABLE daily_accounts_old")
+
+
 def save_daily_account(platform, account_data):
     """保存每日账号数据"""
     today = datetime.now().strftime("%Y-%m-%d")
@@ -120,35 +287,277 @@ def save_daily_account(platform, account_data):
     conn.close()
 
 
-def save_works(platform, works_list):
-    """保存作品数据（更新或插入）"""
+def save_works(platform, works_list, account_id=""):
+    """保存作品数据（更新或插入），works_list 为 records.WorkBatch"""
+    conn = get_connection()
+    conn.executemany(WORKS_UPSERT, works_list.rows(account_id))
+    conn.commit()
+    conn.close()
+
+
+def get_stale_work_ids(platform, account_id, refreshed_before):
+    """账号下详情更新时间早于 refreshed_before（或从未获取）的作品，按发布时间从新到旧"""
     conn = get_connection()
     cursor = conn.cursor()
 
-    for work in works_list:
-        cursor.execute("""
-            INSERT OR REPLACE INTO works
-            (work_id, platform, title, publish_time, cover_url, url,
-             views, likes, comments, shares, collects, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        """, (
-            work.get("work_id", ""),
-            platform,
-            work.get("title", ""),
-            work.get("publish_time", ""),
-            work.get("cover_url", ""),
-            work.get("url", ""),
-            work.get("views", 0),
-            work.get("likes", 0),
-            work.get("comments", 0),
-            work.get("shares", 0),
-            work.get("collects", 0)
-        ))
+    cursor.execute("""
+        SELECT work_id FROM works
+        WHERE platform = ? AND account_id = ? AND detail_updated_at < ?
+        ORDER BY publish_time DESC
+    """, (platform, account_id, refreshed_before))
+
+    work_ids = [row["work_id"] for row in cursor.fetchall()]
+    conn.close()
+    return work_ids
+
+
+def save_work_details(details):
+    """写入作品详情，details 为 (work_id, {详情字段}) 列表"""
+    updated_at = datetime.now().isoformat(timespec="seconds")
+    conn = get_connection()
+    conn.executemany(f"""
+        UPDATE works SET {", ".join(f"{field} = ?" for field in DETAIL_FIELDS)}, detail_updated_at = ?
+        WHERE work_id = ?
+    """, (
+        tuple(detail[field] for field in DETAIL_FIELDS) + (updated_at, work_id)
+        for work_id, detail in details
+    ))
+    conn.commit()
+    conn.close()
+
+
+def get_account_work_totals(platform, account_id):
+    """从作品表汇总账号数据（增量采集时只拉取了部分作品）"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT COUNT(*) AS total_works,
+               COALESCE(SUM(views), 0) AS total_views,
+               COALESCE(SUM(likes), 0) AS total_likes,
+               COALESCE(SUM(comments), 0) AS total_comments,
+               COALESCE(SUM(shares), 0) AS total_shares,
+               COALESCE(SUM(collects), 0) AS total_collects
+        FROM works
+        WHERE platform = ? AND account_id = ?
+    """, (platform, account_id))
+
+    row = dict(cursor.fetchone())
+    conn.close()
+    return row
+
+
+def get_watermark(platform, account_key):
+    """获取账号的增量采集水位线"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT * FROM account_watermarks
+        WHERE platform = ? AND account_key = ?
+    """, (platform, account_key))
+
+    row = cursor.fetchone()
+    conn.close()
+
+    if row:
+        return dict(row)
+    return None
+
+
+def save_watermark(platform, account_key, account_id, newest_publish_time, newest_work_id,
+                   full_refresh=False):
+    """更新水位线：只向前推进最新作品；全量刷新时记录刷新日期"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        INSERT INTO account_watermarks
+        (platform, account_key, account_id, newest_publish_time, newest_work_id,
+         last_full_refresh, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(platform, account_key) DO UPDATE SET
+            account_id = excluded.account_id,
+            newest_work_id = CASE
+                WHEN excluded.newest_publish_time >= newest_publish_time THEN excluded.newest_work_id
+                ELSE newest_work_id END,
+            newest_publish_time = MAX(newest_publish_time, excluded.newest_publish_time),
+            last_full_refresh = CASE
+                WHEN excluded.last_full_refresh != '' THEN excluded.last_full_refresh
+                ELSE last_full_refresh END,
+            updated_at = CURRENT_TIMESTAMP
+    """, (
+        platform,
+        account_key,
+        account_id,
+        newest_publish_time,
+        newest_work_id,
+        today if full_refresh else ""
+    ))
+
+    conn.commit()
+    conn.close()
+
+
+def start_run(run_id, command):
+    """记录一次采集运行的开始"""
+    conn = get_connection()
+    conn.execute("""
+        INSERT OR REPLACE INTO collection_runs (run_id, command, started_at, status)
+        VALUES (?, ?, ?, 'running')
+    """, (run_id, command, datetime.now().isoformat(timespec="seconds")))
+    conn.commit()
+    conn.close()
+
+
+def finish_run(run_id, status, duration):
+    """记录运行结束时间、总耗时和状态"""
+    conn = get_connection()
+    conn.execute("""
+        UPDATE collection_runs SET finished_at = ?, duration = ?, status = ?
+        WHERE run_id = ?
+    """, (datetime.now().isoformat(timespec="seconds"), duration, status, run_id))
+    conn.commit()
+    conn.close()
+
+
+def save_stages(rows):
+    """批量写入阶段耗时，rows 为 (run_id, stage, platform, account, started_at,
+    duration, bytes, items, status, detail) 元组"""
+    conn = get_connection()
+    conn.executemany("""
+        INSERT INTO collection_stages
+        (run_id, stage, platform, account, started_at, duration, bytes, items, status, detail)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+
 
+def save_checkpoint(run_id, platform, account_key, status=None, cursor=None, pages=None, works=None,
+                    newest=None):
+    """写入账号的断点：只更新传入的字段（status 为 'success' 表示该账号已完成）"""
+    conn = get_connection()
+    conn.execute("""
+        INSERT INTO run_checkpoints (run_id, platform, account_key, status, cursor, pages, works,
+                                     newest_publish_time, newest_work_id, updated_at)
+        VALUES (:run_id, :platform, :account_key, COALESCE(:status, 'running'), :cursor,
+                COALESCE(:pages, 0), COALESCE(:works, 0),
+                COALESCE(:newest_time, ''), COALESCE(:newest_id, ''), :now)
+        ON CONFLICT(run_id, platform, account_key) DO UPDATE SET
+            status = COALESCE(:status, status),
+            cursor = COALESCE(:cursor, cursor),
+            pages = COALESCE(:pages, pages),
+            works = COALESCE(:works, works),
+            newest_publish_time = COALESCE(:newest_time, newest_publish_time),
+            newest_work_id = COALESCE(:newest_id, newest_work_id),
+            updated_at = :now
+    """, {
+        "run_id": run_id, "platform": platform, "account_key": account_key,
+        "status": status, "cursor": cursor, "pages": pages, "works": works,
+        "newest_time": newest[0] if newest else None,
+        "newest_id": newest[1] if newest else None,
+        "now": datetime.now().isoformat(timespec="seconds"),
+    })
     conn.commit()
     conn.close()
 
 
+def get_checkpoints(run_id):
+    """运行中各账号的断点，返回 {(平台, 账号): 断点}"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT * FROM run_checkpoints WHERE run_id = ?", (run_id,))
+
+    checkpoints = {(row["platform"], row["account_key"]): dict(row) for row in cursor.fetchall()}
+    conn.close()
+    return checkpoints
+
+
+def find_resumable_run(exclude_run_id=None):
+    """今天最近一次记录了断点的运行；它未正常结束且有账号未完成时返回其运行 ID，否则返回 None"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT c.run_id, COALESCE(MAX(r.status), 'running') AS run_status,
+               SUM(CASE WHEN c.status != 'success' THEN 1 ELSE 0 END) AS unfinished
+        FROM run_checkpoints c
+        LEFT JOIN collection_runs r ON r.run_id = c.run_id
+        WHERE c.updated_at >= ? AND c.run_id != ?
+        GROUP BY c.run_id
+        ORDER BY COALESCE(MAX(r.started_at), MAX(c.updated_at)) DESC
+        LIMIT 1
+    """, (today, exclude_run_id or ""))
+
+    row = cursor.fetchone()
+    conn.close()
+    if not row or row["run_status"] == "success" or not row["unfinished"]:
+        return None
+    return row["run_id"]
+
+
+def copy_checkpoints(from_run_id, to_run_id):
+    """把上次运行的断点带到本次运行，本次再次中断时仍能继续；返回复制的账号数"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        INSERT OR REPLACE INTO run_checkpoints
+        (run_id, platform, account_key, status, cursor, pages, works,
+         newest_publish_time, newest_work_id, updated_at)
+        SELECT ?, platform, account_key, status, cursor, pages, works,
+               newest_publish_time, newest_work_id, updated_at
+        FROM run_checkpoints WHERE run_id = ?
+    """, (to_run_id, from_run_id))
+
+    copied = cursor.rowcount
+    conn.commit()
+    conn.close()
+    return copied
+
+
+def get_recent_runs(limit=20):
+    """最近的运行记录（附带阶段数和失败阶段数）"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT r.*, COUNT(s.id) AS stage_count,
+               SUM(CASE WHEN s.status NOT IN ('ok', 'success') THEN 1 ELSE 0 END) AS failed_stages
+        FROM collection_runs r
+        LEFT JOIN collection_stages s ON s.run_id = r.run_id
+        GROUP BY r.run_id
+        ORDER BY r.started_at DESC
+        LIMIT ?
+    """, (limit,))
+
+    rows = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+
+def get_stage_durations(since, until=None):
+    """指定时间段内各阶段的耗时，返回 {(阶段, 平台): [耗时, ...]}"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT stage, platform, duration FROM collection_stages
+        WHERE started_at >= ? AND (? IS NULL OR started_at < ?)
+        ORDER BY stage, platform
+    """, (since, until, until))
+
+    durations = {}
+    for row in cursor.fetchall():
+        durations.setdefault((row["stage"], row["platform"]), []).append(row["duration"])
+    conn.close()
+    return durations
+
+
 def save_daily_ga(ga_data, target_date=None):
     """保存每日 GA 数据
 
@@ -217,14 +626,54 @@ def get_ga_history(days=30):
     return rows
 
 
-def get_latest_account(platform):
-    """获取平台最新账号数据"""
+def get_account_snapshots(platform, account_id):
+    """单个账号的全部每日快照（按日期升序，不按平台汇总）"""
     conn = get_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
         SELECT * FROM daily_accounts
+        WHERE platform = ? AND account_id = ?
+        ORDER BY date ASC
+    """, (platform, account_id))
+
+    rows = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+
+def save_daily_accounts_bulk(rows, overwrite=False):
+    """在一个事务中批量写入 daily_accounts（列顺序同 DAILY_ACCOUNT_COLUMNS），返回写入的行数
+
+    overwrite=False 时只补缺失的日期，已有的每日快照保持不变。
+    """
+    if overwrite:
+        columns = [column for column in DAILY_ACCOUNT_COLUMNS.split(", ")
+                   if column not in ("date", "platform", "account_id")]
+        conflict = "DO UPDATE SET " + ", ".join(f"{column} = excluded.{column}" for column in columns)
+    else:
+        conflict = "DO NOTHING"
+
+    conn = get_connection()
+    with conn:
+        cursor = conn.executemany(f"""
+            INSERT INTO daily_accounts ({DAILY_ACCOUNT_COLUMNS})
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(date, platform, account_id) {conflict}
+        """, rows)
+        written = cursor.rowcount
+    conn.close()
+    return written
+
+
+def get_latest_account(platform):
+    """获取平台最新账号数据"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(DAILY_TOTALS_SELECT + """
         WHERE platform = ?
+        GROUP BY date
         ORDER BY date DESC
         LIMIT 1
     """, (platform,))
@@ -242,9 +691,9 @@ def get_previous_account(platform, before_date):
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT * FROM daily_accounts
+    cursor.execute(DAILY_TOTALS_SELECT + """
         WHERE platform = ? AND date < ?
+        GROUP BY date
         ORDER BY date DESC
         LIMIT 1
     """, (platform, before_date))
@@ -301,11 +750,9 @@ def get_platform_trend(platform, days=30):
 
     cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
 
-    cursor.execute("""
-        SELECT date, followers, total_views, total_likes,
-               total_comments, total_shares, total_collects, total_works
-        FROM daily_accounts
+    cursor.execute(DAILY_TOTALS_SELECT + """
         WHERE platform = ? AND date >= ?
+        GROUP BY date
         ORDER BY date ASC
     """, (platform, cutoff))
 
@@ -325,16 +772,16 @@ def get_stats_summary():
 
     for platform in ["douyin", "xiaohongshu", "shipinhao"]:
         # 获取今日数据
-        cursor.execute("""
-            SELECT * FROM daily_accounts
+        cursor.execute(DAILY_TOTALS_SELECT + """
             WHERE platform = ? AND date = ?
+            GROUP BY date
         """, (platform, today))
         current = cursor.fetchone()
 
         # 获取昨日数据
-        cursor.execute("""
-            SELECT * FROM daily_accounts
+        cursor.execute(DAILY_TOTALS_SELECT + """
             WHERE platform = ? AND date < ?
+            GROUP BY date
             ORDER BY date DESC LIMIT 1
         """, (platform, today))
         previous = cursor.fetchone()
@@ -344,21 +791,24 @@ def get_stats_summary():
             if previous:
                 previous = dict(previous)
                 # 计算变化（如果前一天数据为0，表示缺失，不计算变化）
-                def calc_change(field):
-                    prev_val = previous.get(field, 0)
-                    curr_val = current.get(field, 0)
+                def calc_change(field, zero_is_missing=False):
+                    prev_val = previous.get(field)
+                    curr_val = current.get(field)
+                    # 回填的历史行中未知的字段为 NULL
+                    if prev_val is None or curr_val is None:
+                        return None
                     # 前一天为0可能是数据缺失，不显示变化
-                    if prev_val == 0 and curr_val > 0:
+                    if zero_is_missing and prev_val == 0 and curr_val > 0:
                         return None  # 表示数据缺失，不是真正的变化
                     return curr_val - prev_val
 
-                current["followers_change"] = current["followers"] - previous["followers"]
-                current["views_change"] = current["total_views"] - previous["total_views"]
-                current["likes_change"] = current["total_likes"] - previous["total_likes"]
-                current["comments_change"] = calc_change("total_comments")
-                current["shares_change"] = calc_change("total_shares")
-                current["collects_change"] = current["total_collects"] - previous["total_collects"]
-                current["works_change"] = current["total_works"] - previous["total_works"]
+                current["followers_change"] = calc_change("followers")
+                current["views_change"] = calc_change("total_views")
+                current["likes_change"] = calc_change("total_likes")
+                current["comments_change"] = calc_change("total_comments", zero_is_missing=True)
+                current["shares_change"] = calc_change("total_shares", zero_is_missing=True)
+                current["collects_change"] = calc_change("total_collects")
+                current["works_change"] = calc_change("total_works")
             else:
                 for key in ["followers", "views", "likes", "comments", "shares", "collects", "works"]:
                     current[f"{key}_change"] = 0
@@ -381,10 +831,10 @@ def export_for_frontend():
 
     cutoff = (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d")
 
-    # 一次性获取所有每日数据（按平台和日期排序）
-    cursor.execute("""
-        SELECT * FROM daily_accounts
+    # 一次性获取所有每日数据（多账号按平台汇总，按平台和日期排序）
+    cursor.execute(DAILY_TOTALS_SELECT + """
         WHERE date >= ?
+        GROUP BY platform, date
         ORDER BY platform, date ASC
     """, (cutoff,))
     all_daily = [dict(row) for row in cursor.fetchall()]
@@ -397,8 +847,12 @@ def export_for_frontend():
             by_platform[platform] = []
         by_platform[platform].append(row)
 
-    def calc_change(curr_val, prev_val, field):
-        """计算变化值，前一天为0时返回0（表示数据缺失）"""
+    def calc_change(row, prev, field):
+        """计算变化值，前一天为0时返回0（表示数据缺失）；回填行中未知（NULL）的字段不计算变化"""
+        curr_val = row[field]
+        prev_val = prev[field] if prev else 0
+        if curr_val is None or prev_val is None:
+            return 0
         if prev_val == 0 and curr_val > 0 and field in ["total_comments", "total_shares"]:
             return 0
         return curr_val - prev_val
@@ -411,19 +865,19 @@ def export_for_frontend():
                 "date": row["date"],
                 "platform": platform,
                 "followers": row["followers"],
-                "followers_change": row["followers"] - (prev["followers"] if prev else 0),
+                "followers_change": calc_change(row, prev, "followers"),
                 "total_views": row["total_views"],
-                "views_change": row["total_views"] - (prev["total_views"] if prev else 0),
+                "views_change": calc_change(row, prev, "total_views"),
                 "total_likes": row["total_likes"],
-                "likes_change": row["total_likes"] - (prev["total_likes"] if prev else 0),
+                "likes_change": calc_change(row, prev, "total_likes"),
                 "total_comments": row["total_comments"],
-                "comments_change": calc_change(row["total_comments"], prev["total_comments"] if prev else 0, "total_comments"),
+                "comments_change": calc_change(row, prev, "total_comments"),
                 "total_shares": row["total_shares"],
-                "shares_change": calc_change(row["total_shares"], prev["total_shares"] if prev else 0, "total_shares"),
+                "shares_change": calc_change(row, prev, "total_shares"),
                 "total_collects": row["total_collects"],
-                "collects_change": row["total_collects"] - (prev["total_collects"] if prev else 0),
+                "collects_change": calc_change(row, prev, "total_collects"),
                 "total_works": row["total_works"],
-                "works_change": row["total_works"] - (prev["total_works"] if prev else 0)
+                "works_change": calc_change(row, prev, "total_works")
             }
             data["daily_snapshots"].append(snapshot)
             prev = row
@@ -433,16 +887,25 @@ def export_for_frontend():
 
     # 一次性获取各平台最新数据
     for platform in ["douyin", "xiaohongshu", "shipinhao"]:
-        cursor.execute("""
-            SELECT * FROM daily_accounts
+        cursor.execute(DAILY_TOTALS_SELECT + """
             WHERE platform = ?
+            GROUP BY date
             ORDER BY date DESC LIMIT 1
         """, (platform,))
         latest = cursor.fetchone()
 
+        # 最新一天各账号的明细
         cursor.execute("""
-            SELECT work_id, platform, title, publish_time, cover_url, url,
-                   views, likes, comments, shares, collects
+            SELECT * FROM daily_accounts
+            WHERE platform = ? AND date = (
+                SELECT MAX(date) FROM daily_accounts WHERE platform = ?
+            )
+            ORDER BY followers DESC
+        """, (platform, platform))
+        accounts = [dict(row) for row in cursor.fetchall()]
+
+        cursor.execute(f"""
+            SELECT {", ".join(WORK_FIELDS + DETAIL_FIELDS)}
             FROM works WHERE platform = ?
             ORDER BY publish_time DESC LIMIT 50
         """, (platform,))
@@ -465,6 +928,19 @@ def export_for_frontend():
                     "total_works": latest["total_works"],
                     "last_updated": latest.get("created_at", "")
                 },
+                "accounts": [
+                    {
+                        "account_name": row["account_name"],
+                        "account_id": row["account_id"],
+                        "avatar_url": row["avatar_url"],
+                        "followers": row["followers"],
+                        "total_views": row["total_views"],
+                        "total_likes": row["total_likes"],
+                        "total_works": row["total_works"],
+                        "last_updated": row["created_at"]
+                    }
+                    for row in accounts
+                ],
                 "works": works
             }
 
@@ -553,6 +1029,7 @@ def cleanup_old_data(keep_days=90):
 
     cursor.execute("DELETE FROM daily_accounts WHERE date < ?", (cutoff,))
     deleted = cursor.rowcount
+    cursor.execute("DELETE FROM run_checkpoints WHERE updated_at < ?", (cutoff,))
 
     conn.commit()
     conn.close()
@@ -0,0 +1,97 @@
+"""
+作品记录与账号汇总
+
+作品列表动辄上万条，解析结果按页存为 WorkBatch（每个字段一个列表），而不是每个作品一个字典：
+- 列表里只有字符串和整数，不产生需要垃圾回收器跟踪的小对象，十万级作品不会拖慢分代回收；
+- WorkBatch.rows() 直接生成 works 表 executemany 的参数元组；
+- AccountTotals 对整列求和，不逐个访问作品。
+"""
+from itertools import repeat
+
+WORK_FIELDS = (
+    "work_id", "platform", "title", "publish_time", "cover_url", "url",
+    "views", "likes", "comments", "shares", "collects",
+)
+METRIC_FIELDS = ("views", "likes", "comments", "shares", "collects")
+# 作品详情接口的字段（不在作品列表中，见 collector/work_details.py）
+DETAIL_FIELDS = ("impressions", "click_rate", "avg_view_time", "new_followers")
+COLUMN_FIELDS = tuple(field for field in WORK_FIELDS if field != "platform")
+
+# works 表写入的列，顺序与 WorkBatch.rows() 一致
+WORK_COLUMNS = ", ".join(WORK_FIELDS + ("account_id",))
+
+
+class WorkBatch:
+    """同一平台的一批作品，按列存放（字段已由调用方规整为字符串 / 整数）"""
+
+    __slots__ = ("platform",) + COLUMN_FIELDS
+
+    def __init__(self, platform):
+        self.platform = platform
+        for field in COLUMN_FIELDS:
+            setattr(self, field, [])
+
+    def add(self, work_id, title, publish_time, cover_url, url,
+            views, likes, comments, shares, collects):
+        self.work_id.append(work_id)
+        self.title.append(title)
+        self.publish_time.append(publish_time)
+        self.cover_url.append(cover_url)
+        self.url.append(url)
+        self.views.append(views)
+        self.likes.append(likes)
+        self.comments.append(comments)
+        self.shares.append(shares)
+        self.collects.append(collects)
+
+    def extend(self, other):
+        """追加另一批同平台的作品"""
+        for field in COLUMN_FIELDS:
+            getattr(self, field).extend(getattr(other, field))
+        return self
+
+    def __len__(self):
+        return len(self.work_id)
+
+    def __getitem__(self, index):
+        """按切片取出一部分作品（分块写入时使用）"""
+        if not isinstance(index, slice):
+            raise TypeError(f"WorkBatch 只支持切片，不支持 {type(index).__name__} 下标")
+        batch = WorkBatch(self.platform)
+        for field in COLUMN_FIELDS:
+            setattr(batch, field, getattr(self, field)[index])
+        return batch
+
+    def rows(self, account_id=""):
+        """works 表的参数元组（列顺序见 WORK_COLUMNS）"""
+        count = len(self)
+        return zip(self.work_id, repeat(self.platform, count), self.title, self.publish_time,
+                   self.cover_url, self.url, self.views, self.likes, self.comments,
+                   self.shares, self.collects, repeat(account_id, count))
+
+
+class AccountTotals:
+    """账号的作品数与各项指标合计"""
+
+    __slots__ = ("works",) + METRIC_FIELDS
+
+    def __init__(self):
+        self.works = 0
+        self.views = self.likes = self.comments = self.shares = self.collects = 0
+
+    def add(self, batch):
+        """累加一批作品（WorkBatch）"""
+        self.works += len(batch)
+        self.views += sum(batch.views)
+        self.likes += sum(batch.likes)
+        self.comments += sum(batch.comments)
+        self.shares += sum(batch.shares)
+        self.collects += sum(batch.collects)
+        return self
+
+    def apply(self, account):
+        """写入账号数据的 total_* 字段"""
+        account["total_works"] = self.works
+        for field in METRIC_FIELDS:
+            account[f"total_{field}"] = getattr(self, field)
+        return account
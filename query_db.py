@@ -8,15 +8,19 @@ SQLite 数据库查询工具
   python query_db.py --platform douyin # 显示指定平台数据
   python query_db.py --stats          # 显示统计摘要
   python query_db.py --works          # 显示作品列表
+  python query_db.py --runs           # 显示最近的采集运行及各阶段耗时 p50/p95
 """
 import argparse
+import math
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent / "data"))
 from database import (
     get_daily_data, get_platform_trend, get_stats_summary,
-    get_works_by_platform, get_latest_account
+    get_works_by_platform, get_latest_account,
+    get_recent_runs, get_stage_durations
 )
 
 
@@ -35,6 +39,8 @@ def print_daily_data(days=7, platform=None):
     print("-" * 80)
 
     for row in data:
+        # 回填的历史行中未知的字段为 NULL，显示为 -
+        row = {key: "-" if value is None else value for key, value in row.items()}
         print(f"{row['date']:<12} {row['platform']:<12} "
               f"{row['followers']:>8} {row['total_views']:>10} "
               f"{row['total_likes']:>8} {row['total_comments']:>6} "
@@ -63,13 +69,10 @@ def print_stats():
         total_interactions = (data['followers'] + data['total_views'] +
                               data['total_likes'] + data['total_comments'] +
                               data['total_shares'] + data['total_collects'])
-        # 互动变化（如果评论或分享缺失历史数据则不计算）
-        if data.get('comments_change') is None or data.get('shares_change') is None:
-            interactions_change = None
-        else:
-            interactions_change = (data.get('followers_change', 0) + data.get('views_change', 0) +
-                                   data.get('likes_change', 0) + data.get('comments_change', 0) +
-                                   data.get('shares_change', 0) + data.get('collects_change', 0))
+        # 互动变化（任一指标缺失历史数据则不计算）
+        changes = [data.get(f"{key}_change", 0)
+                   for key in ("followers", "views", "likes", "comments", "shares", "collects")]
+        interactions_change = None if None in changes else sum(changes)
 
         print(f"\n【{platform}】")
         print(f"  总互动: {total_interactions:,} {fmt_change(interactions_change)}")
@@ -100,6 +103,48 @@ def print_works(platform=None):
                   f"分享:{w['shares']:,} 收藏:{w['collects']:,}")
 
 
+def percentile(values, pct):
+    """最近秩百分位数"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def print_runs(days=7, platform=None):
+    """打印最近的运行记录，以及各阶段耗时与上一周期的对比"""
+    runs = get_recent_runs(limit=10)
+    if not runs:
+        print("无运行记录")
+        return
+
+    print(f"\n{'开始时间':<20} {'命令':<24} {'状态':<8} {'耗时':>8} {'阶段':>5} {'失败':>5}")
+    print("-" * 80)
+    for run in runs:
+        print(f"{run['started_at']:<20} {run['command'][:24]:<24} {run['status']:<8} "
+              f"{run['duration']:>7.1f}s {run['stage_count']:>5} {run['failed_stages'] or 0:>5}")
+
+    now = datetime.now()
+    since = (now - timedelta(days=days)).isoformat(timespec="seconds")
+    previous_since = (now - timedelta(days=days * 2)).isoformat(timespec="seconds")
+    current = get_stage_durations(since)
+    previous = get_stage_durations(previous_since, since)
+
+    print(f"\n最近 {days} 天各阶段耗时（对比前 {days} 天 p50）:")
+    print(f"{'阶段':<22} {'平台':<12} {'次数':>6} {'p50':>9} {'p95':>9} {'最大':>9} {'p50 变化':>9}")
+    print("-" * 80)
+    for (stage, stage_platform), durations in sorted(current.items()):
+        if platform and stage_platform and stage_platform != platform:
+            continue
+        p50 = percentile(durations, 50)
+        change = ""
+        if previous.get((stage, stage_platform)):
+            previous_p50 = percentile(previous[(stage, stage_platform)], 50)
+            if previous_p50:
+                change = f"{(p50 - previous_p50) / previous_p50:+.0%}"
+        print(f"{stage:<22} {stage_platform or '-':<12} {len(durations):>6} "
+              f"{p50:>8.2f}s {percentile(durations, 95):>8.2f}s {max(durations):>8.2f}s {change:>9}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="SQLite 数据库查询工具")
     parser.add_argument("--days", type=int, default=7, help="查询天数（默认7天）")
@@ -107,6 +152,7 @@ def main():
                         help="指定平台")
     parser.add_argument("--stats", action="store_true", help="显示统计摘要")
     parser.add_argument("--works", action="store_true", help="显示作品列表")
+    parser.add_argument("--runs", action="store_true", help="显示采集运行记录和各阶段耗时 p50/p95")
 
     args = parser.parse_args()
 
@@ -114,6 +160,8 @@ def main():
         print_stats()
     elif args.works:
         print_works(args.platform)
+    elif args.runs:
+        print_runs(args.days, args.platform)
     else:
         print_daily_data(args.days, args.platform)
 
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+采集解析与入库热点路径基准测试
+
+用各平台真实接口结构（aweme_list / note_infos / post_list）生成合成数据，
+分别计时：字段裁剪、解析循环、calculate_account_totals、save_works、save_daily_account、export_for_frontend。
+每次重复都使用独立的临时数据库，不影响 data/tracker.db。
+
+使用方法：
+  python scripts/benchmark.py                         # 默认 100 / 10000 / 100000 个作品
+  python scripts/benchmark.py --sizes 100 10000       # 指定规模
+  python scripts/benchmark.py --save-baseline         # 把本次结果保存为基线
+  python scripts/benchmark.py --threshold 0.2         # 比基线慢 20% 以上视为退化（退出码 1）
+"""
+import argparse
+import json
+import os
+import platform as platform_info
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / "data"))
+sys.path.insert(0, str(ROOT_DIR / "collector"))
+
+# database 导入时会初始化数据库：先指向临时文件，导入 collect_all 也不会创建或迁移 data/tracker.db
+_IMPORT_DB_DIR = tempfile.TemporaryDirectory()
+os.environ["CREATOR_TRACKER_DB"] = str(Path(_IMPORT_DB_DIR.name) / "import.db")
+
+import database
+from collect_all import (
+    WORK_PARSERS, WRITE_CHUNK_SIZE, calculate_account_totals, create_empty_account
+)
+from pagination import PAGINATION
+from projection import project_works
+from records import WorkBatch
+
+BENCHMARK_DIR = ROOT_DIR / "benchmarks"
+DEFAULT_REPORT = BENCHMARK_DIR / "report.json"
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+DEFAULT_SIZES = (100, 10000, 100000)
+DEFAULT_THRESHOLD = 0.2
+MIN_DELTA = 0.005  # 秒，低于该差值的波动不算退化
+HISTORY_DAYS = 90
+
+PLATFORMS = ("douyin", "xiaohongshu", "shipinhao")
+STAGES = ("project", "parse", "calculate_account_totals", "save_works",
+          "save_daily_account", "export_for_frontend")
+
+
+# ============================================================
+# 合成数据
+# ============================================================
+def _douyin_item(i, rng, ts):
+    return {
+        "aweme_id": f"7{i:018d}",
+        "desc": f"作品 {i} #话题{rng.randint(1, 50)} " + "描述" * rng.randint(1, 20),
+        "create_time": ts,
+        "cover": {"url_list": [f"https://p3.douyinpic.com/cover/{i}.jpeg?x-expires={ts}"] * 3,
+                  "width": 720, "height": 1280},
+        "statistics": {
+            "play_count": rng.randint(0, 10 ** 6), "digg_count": rng.randint(0, 10 ** 5),
+            "comment_count": rng.randint(0, 10 ** 4), "share_count": rng.randint(0, 10 ** 4),
+            "collect_count": rng.randint(0, 10 ** 4), "download_count": 0,
+        },
+        "author": {
+            "uid": "100000001", "nickname": "基准账号", "unique_id": "bench",
+            "follower_count": 12345, "signature": "签名" * 30,
+            "avatar_thumb": {"uri": "avatar", "url_list": ["https://p3.douyinpic.com/avatar.jpeg"] * 3},
+        },
+        "music": {"id": i, "title": "原声", "play_url": {"url_list": ["https://sf3.douyinvod.com/m.mp3"] * 3}},
+        "video": {"duration": rng.randint(5000, 300000),
+                  "play_addr": {"url_list": [f"https://v3.douyinvod.com/{i}.mp4"] * 4}},
+    }
+
+
+def _xiaohongshu_item(i, rng, ts):
+    return {
+        "id": f"64{i:022x}",
+        "title": f"笔记 {i} " + "标题" * rng.randint(1, 10),
+        "post_time": ts * 1000,
+        "cover_url": f"https://sns-img.xhscdn.com/{i}.jpg",
+        "read_count": rng.randint(0, 10 ** 6), "like_count": rng.randint(0, 10 ** 5),
+        "comment_count": rng.randint(0, 10 ** 4), "share_count": rng.randint(0, 10 ** 4),
+        "fav_count": rng.randint(0, 10 ** 4),
+        "type": "normal", "audit_status": 1, "tags": [f"标签{n}" for n in range(5)],
+    }
+
+
+def _shipinhao_item(i, rng, ts):
+    return {
+        "objectId": f"export/{i:030d}",
+        "desc": {"description": "视频描述" * rng.randint(1, 10), "media": [{"url": "https://finder.video.qq.com/x"}]},
+        "title": f"视频 {i}",
+        "createTime": ts,
+        "coverUrl": f"https://finder.video.qq.com/cover/{i}",
+        "readCount": rng.randint(0, 10 ** 6), "likeCount": rng.randint(0, 10 ** 5),
+        "commentCount": rng.randint(0, 10 ** 4), "forwardCount": rng.randint(0, 10 ** 4),
+        "favCount": rng.randint(0, 10 ** 4),
+    }
+
+
+ITEM_FACTORIES = {
+    "douyin": _douyin_item,
+    "xiaohongshu": _xiaohongshu_item,
+    "shipinhao": _shipinhao_item,
+}
+
+
+def generate_pages(platform, count, seed=42):
+    """按平台的分页大小生成原始接口数据"""
+    rng = random.Random(seed)
+    page_size = PAGINATION[platform]["page_size"]
+    now = int(time.time())
+    factory = ITEM_FACTORIES[platform]
+    items = [factory(i, rng, now - i * 3600) for i in range(count)]
+    return [items[i:i + page_size] for i in range(0, count, page_size)]
+
+
+def seed_history(platforms):
+    """写入 90 天的每日账号数据，让 export_for_frontend 有真实的工作量"""
+    today = datetime.now()
+    rows = []
+    for platform in platforms:
+        for day in range(1, HISTORY_DAYS + 1):
+            date = (today - timedelta(days=day)).strftime("%Y-%m-%d")
+            rows.append((date, platform, "基准账号", "bench", "", 10000 + day,
+                         day * 1000, day * 100, day * 10, day, day, 100, f"{date} 09:00:00"))
+    conn = database.get_connection()
+    conn.executemany(f"INSERT INTO daily_accounts ({database.DAILY_ACCOUNT_COLUMNS}) "
+                     f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+# ============================================================
+# 计时
+# ============================================================
+def _timed(timings, stage, func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    timings[stage] = time.perf_counter() - started
+    return result
+
+
+def run_once(platform, raw_pages):
+    """在临时数据库中跑一遍完整流程，返回各阶段耗时（秒）"""
+    parse_works = WORK_PARSERS[platform]
+    timings = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.use_db_path(Path(tmp) / "bench.db")
+        database.init_db()
+        seed_history([platform])
+
+        pages = _timed(timings, "project", lambda: [project_works(platform, page) for page in raw_pages])
+        def parse_all():
+            works = WorkBatch(platform)
+            for page in pages:
+                works.extend(parse_works(page))
+            return works
+        works = _timed(timings, "parse", parse_all)
+
+        account = create_empty_account(platform)
+        account.update(account_name="基准账号", account_id="bench", followers=12345)
+        _timed(timings, "calculate_account_totals", calculate_account_totals, account, [works])
+
+        def save_in_chunks():
+            for i in range(0, len(works), WRITE_CHUNK_SIZE):
+                database.save_works(platform, works[i:i + WRITE_CHUNK_SIZE], account_id="bench")
+        _timed(timings, "save_works", save_in_chunks)
+        _timed(timings, "save_daily_account", database.save_daily_account, platform, account)
+        _timed(timings, "export_for_frontend", database.export_for_frontend)
+
+    return timings
+
+
+def run_benchmark(sizes, platforms, repeat):
+    """返回 {平台: {规模: {阶段: 中位数耗时}}}"""
+    results = {}
+    for platform in platforms:
+        results[platform] = {}
+        for size in sizes:
+            raw_pages = generate_pages(platform, size)
+            runs = [run_once(platform, raw_pages) for _ in range(repeat)]
+            results[platform][str(size)] = {
+                stage: statistics.median(run[stage] for run in runs) for stage in STAGES
+            }
+            summary = ", ".join(f"{stage} {results[platform][str(size)][stage] * 1000:.1f}ms"
+                                for stage in STAGES)
+            print(f"[{platform}] {size:>7} 个作品: {summary}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """与基线对比，返回退化列表"""
+    regressions = []
+    print(f"\n{'平台':<12} {'规模':>7} {'阶段':<26} {'基线':>10} {'本次':>10} {'变化':>8}")
+    print("-" * 80)
+    for platform, by_size in results.items():
+        for size, stages in by_size.items():
+            base_stages = baseline.get(platform, {}).get(size)
+            if not base_stages:
+                continue
+            for stage, current in stages.items():
+                base = base_stages.get(stage)
+                if not base:
+                    continue
+                change = (current - base) / base
+                regressed = change > threshold and current - base > MIN_DELTA
+                mark = " ⚠" if regressed else ""
+                print(f"{platform:<12} {size:>7} {stage:<26} {base * 1000:>8.1f}ms "
+                      f"{current * 1000:>8.1f}ms {change:>+7.0%}{mark}")
+                if regressed:
+                    regressions.append({"platform": platform, "size": int(size), "stage": stage,
+                                        "baseline": base, "current": current, "change": change})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="采集解析与入库基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="作品数量")
+    parser.add_argument("--platform", choices=PLATFORMS, help="只测试指定平台")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数，取中位数（默认 3）")
+    parser.add_argument("--report", type=Path, default=DEFAULT_REPORT, help="结果报告路径")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"比基线慢多少视为退化（默认 {DEFAULT_THRESHOLD * 100:.0f}%%）")
+    args = parser.parse_args()
+
+    platforms = [args.platform] if args.platform else list(PLATFORMS)
+    results = run_benchmark(args.sizes, platforms, max(1, args.repeat))
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform_info.python_version(),
+        "machine": platform_info.platform(),
+        "repeat": args.repeat,
+        "results": results,
+        "regressions": [],
+    }
+
+    if args.baseline.exists() and not args.save_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["baseline"] = str(args.baseline)
+        report["regressions"] = compare(results, baseline.get("results", {}), args.threshold)
+
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n报告已保存: {args.report}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存: {args.baseline}")
+
+    if report["regressions"]:
+        print(f"发现 {len(report['regressions'])} 项性能退化")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
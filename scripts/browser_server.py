@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+常驻浏览器服务管理
+
+使用方法：
+  python scripts/browser_server.py start     # 启动（已运行则跳过）
+  python scripts/browser_server.py status    # 查看状态并做一次连接检查
+  python scripts/browser_server.py restart   # 重启
+  python scripts/browser_server.py stop      # 停止
+
+开启 config.json 中 settings.browser_server.enabled 后，collect_all.py 会自动连接或启动该服务。
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR / "collector"))
+from browser_server import (
+    DEFAULT_MAX_AGE_HOURS, DEFAULT_PORT, CONNECT_TIMEOUT,
+    ensure_server, read_state, server_status, stop_server
+)
+
+
+def load_settings():
+    """读取 settings.browser_server 配置"""
+    config_file = ROOT_DIR / "config.json"
+    if not config_file.exists():
+        return {}
+    with open(config_file, "r", encoding="utf-8") as f:
+        return json.load(f).get("settings", {}).get("browser_server", {})
+
+
+async def health_check(ws_endpoint):
+    """连接服务并打开一个空白上下文，验证服务可用"""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        browser = await p.chromium.connect(ws_endpoint, timeout=CONNECT_TIMEOUT)
+        context = await browser.new_context()
+        await context.close()
+        version = browser.version
+        await browser.close()
+        return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="常驻浏览器服务管理")
+    parser.add_argument("action", choices=["start", "status", "restart", "stop"])
+    args = parser.parse_args()
+
+    settings = load_settings()
+    port = settings.get("port", DEFAULT_PORT)
+    max_age_hours = settings.get("max_age_hours", DEFAULT_MAX_AGE_HOURS)
+
+    if args.action == "stop":
+        stop_server()
+        print("浏览器服务已停止")
+        return
+
+    if args.action in ("start", "restart"):
+        state, started = ensure_server(port, max_age_hours, restart=args.action == "restart")
+        print(f"{'已启动' if started else '已在运行'}: {state['ws_endpoint']} (pid {state['pid']})")
+        return
+
+    state = read_state()
+    status = server_status(state, max_age_hours)
+    print(f"状态: {status}")
+    if status in ("running", "expired"):
+        print(f"  地址: {state['ws_endpoint']}")
+        print(f"  进程: {state['pid']}")
+        print(f"  启动于: {state['started_at']}")
+        try:
+            version = asyncio.run(health_check(state["ws_endpoint"]))
+            print(f"  连接检查: 正常（Chromium {version}）")
+        except Exception as e:
+            print(f"  连接检查: 失败 - {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,9 @@ from google.analytics.data_v1beta.types import (
 import sys
 ROOT_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT_DIR / "data"))
+sys.path.insert(0, str(ROOT_DIR / "collector"))
 from database import init_db, save_daily_ga, get_ga_history
+from timing import timer
 CREDENTIALS_FILE = ROOT_DIR / "config" / "ga_credentials.json"
 PROPERTY_ID = "485215519"  # 从你的 GA URL 提取
 
@@ -550,7 +552,9 @@ def collect_all():
         """安全地执行 fetch 操作，记录错误但不中断"""
         try:
             print(f"  采集 {name}...")
-            result = func(*args, **kwargs)
+            with timer.stage("ga_fetch", detail=name) as stage:
+                result = func(*args, **kwargs)
+                stage.items = len(result) if isinstance(result, (list, dict)) else 0
             print(f"  ✅ {name} 完成")
             return result
         except Exception as e:
@@ -654,4 +658,11 @@ def print_summary():
 
 
 if __name__ == "__main__":
-    print_summary()
+    init_db()
+    timer.start("collect_ga")
+    status = "failed"
+    try:
+        print_summary()
+        status = "success"
+    finally:
+        timer.finish(status)
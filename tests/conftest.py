@@ -0,0 +1,28 @@
+"""测试与脚本一样直接导入 collector/ 和 data/ 下的模块"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / "data"))
+sys.path.insert(0, str(ROOT_DIR / "collector"))
+
+# database 在导入时会初始化 data/tracker.db；测试前不存在的话，结束后删除
+DEFAULT_DB = ROOT_DIR / "data" / "tracker.db"
+_CREATED_DB = not DEFAULT_DB.exists()
+
+
+@pytest.fixture(autouse=True)
+def isolated_db(tmp_path):
+    """每个测试使用独立的临时数据库"""
+    import database
+    database.use_db_path(tmp_path / "tracker.db")
+    database.init_db()
+    yield
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if _CREATED_DB:
+        DEFAULT_DB.unlink(missing_ok=True)
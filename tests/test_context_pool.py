@@ -0,0 +1,43 @@
+import asyncio
+
+from context_pool import ContextPool
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    def on(self, event, handler):
+        pass
+
+    async def clear_cookies(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    async def new_context(self, **kwargs):
+        return FakeContext()
+
+
+async def _launch():
+    return FakeBrowser()
+
+
+def test_contexts_are_not_shared_between_accounts():
+    async def run():
+        pool = ContextPool(_launch, size=1)
+        first = await pool.acquire(owner=("douyin", "a"))
+        await pool.release(first)
+        same = await pool.acquire(owner=("douyin", "a"))
+        await pool.release(same)
+        other = await pool.acquire(owner=("douyin", "b"))
+        await pool.release(other)
+        return first, same, other, pool
+
+    first, same, other, pool = asyncio.run(run())
+    assert same is first
+    assert other is not first and first.closed
+    assert pool.created == 2 and pool.recycled == 1
@@ -0,0 +1,28 @@
+import database
+
+
+def _row(date, account_id, followers, total_views):
+    return (date, "douyin", f"账号{account_id}", account_id, "", followers, total_views, 0, 0, 0, 0, 1, "now")
+
+
+def test_missing_account_carries_forward_its_last_row():
+    database.save_daily_accounts_bulk([
+        _row("2026-10-14", "a", 10, 100),
+        _row("2026-10-14", "b", 10, 50),
+        _row("2026-10-15", "a", 10, 110),  # b 当天采集失败
+    ])
+
+    latest = database.get_latest_account("douyin")
+    previous = database.get_previous_account("douyin", "2026-10-15")
+    assert latest["date"] == "2026-10-15"
+    assert (latest["followers"], latest["total_views"]) == (20, 160)
+    assert (previous["followers"], previous["total_views"]) == (20, 150)
+    assert latest["account_id"] == ""
+    assert sorted(latest["account_name"].split(" / ")) == ["账号a", "账号b"]
+
+
+def test_single_account_keeps_its_identity():
+    database.save_daily_accounts_bulk([_row("2026-10-15", "a", 10, 110)])
+
+    latest = database.get_latest_account("douyin")
+    assert (latest["account_name"], latest["account_id"], latest["total_views"]) == ("账号a", "a", 110)
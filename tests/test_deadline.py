@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import pytest
+
+from deadline import Deadline, DeadlineExceeded
+from http_client import REQUEST_TIMEOUT, request_json
+from pagination import iter_pages_async
+from work_details import fetch_details
+
+
+class FakeResponse:
+    status_code = 200
+    url = ""
+
+    def json(self):
+        return {"code": 0, "data": {}}
+
+
+class FakeSession:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.timeouts = []
+
+    def request(self, method, url, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        return FakeResponse()
+
+
+def test_request_timeout_clamped_to_budget():
+    session = FakeSession()
+    request_json(session, "GET", "https://example.com", lambda data: True)
+    request_json(session, "GET", "https://example.com", lambda data: True, Deadline(3))
+    assert session.timeouts[0] == REQUEST_TIMEOUT
+    assert session.timeouts[1] <= 3
+
+
+def test_request_raises_when_budget_spent():
+    with pytest.raises(DeadlineExceeded):
+        request_json(FakeSession(), "GET", "https://example.com", lambda data: True, Deadline(0.5))
+
+
+class FakeAPIResponse:
+    ok = True
+    status = 200
+
+    async def json(self):
+        return {"code": 0, "data": {"total": 0, "note_infos": []}}
+
+
+class FakeRequestContext:
+    def __init__(self):
+        self.timeouts = []
+
+    async def fetch(self, url, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        return FakeAPIResponse()
+
+
+def test_in_page_request_timeout_clamped_to_budget():
+    request_context = FakeRequestContext()
+
+    async def collect(deadline):
+        return [page async for page in iter_pages_async(request_context, "xiaohongshu", deadline=deadline)]
+
+    asyncio.run(collect(Deadline(3)))
+    assert request_context.timeouts[0] <= 3000
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(collect(Deadline(0.5)))
+
+
+def test_details_stop_when_budget_spent():
+    session = FakeSession(delay=0.3)
+    started = time.monotonic()
+    details = fetch_details(session, "xiaohongshu", [f"n{i}" for i in range(50)], workers=2,
+                            deadline=Deadline(11))
+    # 剩余时间少于 OPTIONAL_RESERVE（10 秒）后不再发起新请求
+    assert time.monotonic() - started < 3
+    assert 0 < len(details) < 50
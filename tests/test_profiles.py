@@ -0,0 +1,59 @@
+import asyncio
+
+import profiles
+from profiles import ProfileStore
+
+
+def _job(cookie="a=1"):
+    return {"platform": "xiaohongshu", "account_key": "default", "cookie": cookie}
+
+
+def test_qr_login_profile_skips_injection(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiles, "PROFILE_ROOT", tmp_path)
+    store = ProfileStore({"mode": "persistent"})
+    assert store.needs_cookie_injection(_job())
+
+    # scripts/login_xiaohongshu.py 扫码登录后留下 profile 目录和登录标记，没有元数据
+    (tmp_path / "xiaohongshu").mkdir()
+    (tmp_path / "xiaohongshu" / profiles.LOGIN_FLAG_FILE).write_text("logged_in")
+    assert not store.needs_cookie_injection(_job())
+
+
+class _FakeChromium:
+    async def launch_persistent_context(self, user_data_dir, **kwargs):
+        return _FakeContext()
+
+
+class _FakeContext:
+    async def close(self):
+        pass
+
+
+class _FakePlaywright:
+    chromium = _FakeChromium()
+
+
+def test_first_persistent_run_injects_cookie(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiles, "PROFILE_ROOT", tmp_path)
+    store = ProfileStore({"mode": "persistent"})
+
+    async def run(success):
+        # 与 collect_in_profile 相同的顺序：先打开 profile，再判断是否注入
+        context = await store.open_persistent(_FakePlaywright(), _job())
+        needs = store.needs_cookie_injection(_job())
+        await store.close_persistent(context, _job(), success=success)
+        return needs
+
+    assert asyncio.run(run(success=False))
+    # 上次采集失败留下的目录没有元数据，仍要注入
+    assert asyncio.run(run(success=True))
+    assert not asyncio.run(run(success=True))
+
+
+def test_changed_config_cookie_is_injected(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiles, "PROFILE_ROOT", tmp_path)
+    store = ProfileStore({"mode": "persistent"})
+    store._write_meta(_job("a=1"))
+    assert not store.needs_cookie_injection(_job("a=1"))
+    assert store.needs_cookie_injection(_job("a=2"))
+    assert not store.needs_cookie_injection(_job(""))
@@ -0,0 +1,17 @@
+import pytest
+
+from query_db import percentile
+
+
+@pytest.mark.parametrize("n, pct, expected", [
+    (1, 50, 1),
+    (2, 50, 1),
+    (6, 50, 3),
+    (10, 50, 5),
+    (20, 95, 19),
+    (20, 100, 20),
+    (3, 95, 3),
+    (5, 0, 1),
+])
+def test_percentile_nearest_rank(n, pct, expected):
+    assert percentile(range(1, n + 1), pct) == expected
@@ -0,0 +1,22 @@
+import pytest
+
+from records import WorkBatch
+
+
+def _batch(count):
+    batch = WorkBatch("douyin")
+    for i in range(count):
+        batch.add(f"w{i}", "t", "2026-10-01 10:00", "", "", i, 0, 0, 0, 0)
+    return batch
+
+
+def test_slice_keeps_columns_aligned():
+    chunk = _batch(5)[1:3]
+    assert chunk.work_id == ["w1", "w2"]
+    assert chunk.views == [1, 2]
+    assert list(chunk.rows("a"))[0][:2] == ("w1", "douyin")
+
+
+def test_integer_index_rejected():
+    with pytest.raises(TypeError):
+        _batch(3)[0]
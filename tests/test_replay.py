@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+from http_client import ENDPOINTS
+from pagination import iter_pages, iter_pages_async
+from replay import Fixture
+
+NOTES_URL = ENDPOINTS["xiaohongshu"]["notes"]
+
+
+def _note(note_id):
+    return {"id": note_id, "title": note_id, "post_time": 1790000000000}
+
+
+def _fixture(tmp_path, pages):
+    job = {"platform": "xiaohongshu", "account_key": "default"}
+    path = tmp_path / "xiaohongshu" / "default.json"
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({"responses": [
+        {"source": "http", "method": "GET", "url": NOTES_URL, "body": body} for body in pages
+    ]}), encoding="utf-8")
+    return Fixture.load(tmp_path, job)
+
+
+PAGES = [
+    {"code": 0, "data": {"total": 11, "note_infos": [_note(f"n{i}") for i in range(10)]}},
+    {"code": 0, "data": {"total": 11, "note_infos": [_note("n10")]}},
+]
+
+
+def test_replay_in_page_pagination(tmp_path):
+    fixture = _fixture(tmp_path, PAGES)
+
+    async def collect():
+        return [page async for page in iter_pages_async(fixture.request_context(), "xiaohongshu")]
+
+    pages = asyncio.run(collect())
+    assert [len(items) for items, _, _ in pages] == [10, 1]
+    assert [cursor for _, cursor, _ in pages] == [2, 3]
+    assert [has_more for _, _, has_more in pages] == [True, False]
+
+
+def test_replay_http_pagination(tmp_path):
+    fixture = _fixture(tmp_path, PAGES)
+    pages = list(iter_pages(fixture.session(), "xiaohongshu"))
+    assert [len(items) for items, _, _ in pages] == [10, 1]
+
+
+def test_page_cap_reports_more_pages(tmp_path):
+    fixture = _fixture(tmp_path, PAGES)
+    pages = list(iter_pages(fixture.session(), "xiaohongshu", max_pages=1))
+    assert [has_more for _, _, has_more in pages] == [True]
@@ -0,0 +1,27 @@
+import gzip
+import json
+import logging
+
+from runlog import GzipRotatingFileHandler, JsonFormatter
+
+
+def _handler(path):
+    handler = GzipRotatingFileHandler(str(path), max_bytes=2000, backups=50)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def test_two_writers_share_a_rotating_file(tmp_path):
+    # 两个 handler 模拟两个进程写同一个日志文件
+    path = tmp_path / "collect.jsonl"
+    writers = [_handler(path), _handler(path)]
+    for i in range(200):
+        record = logging.LogRecord("t", logging.INFO, "", 0, f"line {i}", None, None)
+        writers[i % 2].handle(record)
+    for handler in writers:
+        handler.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    for backup in tmp_path.glob("collect.jsonl.*.gz"):
+        lines += gzip.decompress(backup.read_bytes()).decode("utf-8").splitlines()
+    assert sorted(json.loads(line)["msg"] for line in lines) == sorted(f"line {i}" for i in range(200))
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import database
+from trends import backfill_rows, SERIES_FIELDS
+
+TODAY = "2026-10-16"
+
+
+def _snapshot(date, **values):
+    return {"date": date, "account_name": "A", "account_id": "u1", "avatar_url": "",
+            **{field: values.get(field, 0) for field in SERIES_FIELDS}}
+
+
+def _by_date(rows):
+    columns = ("date", "platform", "account_name", "account_id", "avatar_url", *SERIES_FIELDS, "created_at")
+    return {row[0]: dict(zip(columns, row)) for row in rows}
+
+
+def test_non_series_fields_are_not_copied_from_anchor():
+    # 小红书只有粉丝趋势：播放量、作品数不能用今天的累计值填满历史
+    anchor = _snapshot("2026-10-15", followers=500, total_views=100000, total_works=50)
+    series = {"followers": {"2026-10-10": 450, "2026-10-12": 470}}
+    rows = _by_date(backfill_rows("xiaohongshu", anchor, [anchor], series, 30, TODAY, "now"))
+
+    assert rows["2026-10-10"]["followers"] == 450
+    assert rows["2026-10-10"]["total_views"] is None
+    assert rows["2026-10-10"]["total_works"] is None
+
+
+def test_non_series_fields_carry_forward_earlier_snapshot():
+    earlier = _snapshot("2026-10-05", total_views=80000, total_works=40)
+    anchor = _snapshot("2026-10-15", total_views=100000, total_works=50)
+    series = {"followers": {"2026-10-01": 400, "2026-10-08": 460}}
+    rows = _by_date(backfill_rows("xiaohongshu", anchor, [earlier, anchor], series, 30, TODAY, "now"))
+
+    assert rows["2026-10-01"]["total_views"] is None
+    assert rows["2026-10-08"]["total_views"] == 80000
+    assert rows["2026-10-08"]["total_works"] == 40
+
+
+def test_delta_series_accumulate_from_anchor():
+    anchor = _snapshot("2026-10-10", followers=100, total_views=1000, total_collects=7)
+    series = {"followers": {"2026-10-08": 90, "2026-10-11": 105},
+              "total_views": {"2026-10-08": 10, "2026-10-09": 20, "2026-10-10": 30, "2026-10-11": 40}}
+    rows = _by_date(backfill_rows("douyin", anchor, [anchor], series, 30, TODAY, "now"))
+
+    assert rows["2026-10-08"]["total_views"] == 1000 - 20 - 30
+    assert rows["2026-10-11"]["total_views"] == 1040
+    assert rows["2026-10-08"]["total_collects"] is None
+    assert rows["2026-10-11"]["total_collects"] == 7
+
+
+def _days_ago(days):
+    return (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def test_backfilled_rows_export():
+    anchor = _snapshot(_days_ago(1), followers=500, total_views=100000, total_works=50)
+    database.save_daily_accounts_bulk([
+        (_days_ago(1), "xiaohongshu", "A", "u1", "", 500, 100000, 0, 0, 0, 0, 50, "now"),
+    ])
+    rows = backfill_rows("xiaohongshu", anchor, [anchor], {"followers": {_days_ago(2): 490}},
+                         30, _days_ago(0), "now")
+    assert database.save_daily_accounts_bulk(rows) == 1
+
+    # 回填行的播放量未知：导出时不计算变化，汇总查询保留 NULL
+    data = database.export_for_frontend()
+    latest = next(s for s in data["daily_snapshots"] if s["date"] == _days_ago(1))
+    assert latest["followers_change"] == 10
+    assert latest["views_change"] == 0
+    assert database.get_platform_trend("xiaohongshu")[0]["total_views"] is None
@@ -12,18 +12,20 @@ from pathlib import Path
 # 项目根目录
 ROOT_DIR = Path(__file__).parent.parent
 CONFIG_FILE = ROOT_DIR / "config.json"
-LOG_FILE = ROOT_DIR / "data" / "cookie_sync.log"
+LOG_FILE = ROOT_DIR / "data" / "cookie_sync.jsonl"
+
+# 安装后位于 <项目>/native_host/，仓库中位于 <项目>/tools/native_host/
+for collector_dir in (ROOT_DIR / "collector", ROOT_DIR.parent / "collector"):
+    sys.path.insert(0, str(collector_dir))
+from runlog import get_logger
+
+# stdout 是与扩展通信的通道，日志只写文件
+LOGGER = get_logger("cookie_sync", LOG_FILE, stdout=False)
 
 
 def log(message: str):
-    """记录日志"""
-    try:
-        LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] {message}\n")
-    except Exception:
-        pass  # 日志写入失败不影响主流程
+    """记录日志（写入失败由 logging 处理，不影响主流程）"""
+    LOGGER.info(message)
 
 
 def read_message():